@@ -0,0 +1 @@
+"""Offline load-testing and benchmarking tools for PIM Auto."""
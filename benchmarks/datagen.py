@@ -0,0 +1,350 @@
+"""
+Seeded synthetic PIM activation and AzureActivity dataset generator.
+
+Generates activations with realistic reasons, roles, durations and
+overlapping windows, deactivation/expiry records, and AzureActivity
+records whose volume per user follows a power law: most users do a handful
+of operations while a few automation-heavy users produce most of the rows.
+The same seed and parameters always produce the same dataset.
+
+Datasets are written as JSON Lines files that the stand-in server and
+``ReplayLogAnalyticsClient`` load back. Run it standalone with
+``python -m benchmarks.datagen``.
+"""
+
+import json
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+
+from benchmarks.standin_server import StandinDataset
+
+logger = logging.getLogger(__name__)
+
+# Record files of a dataset directory, keyed by StandinDataset attribute
+DATASET_FILES = {
+    "activations": "activations.jsonl",
+    "endings": "endings.jsonl",
+    "activities": "activities.jsonl",
+}
+
+# Columns holding timestamps, converted to and from ISO 8601 strings
+DATETIME_FIELDS = ("TimeGenerated", "RequestedEnd", "EndedAt")
+
+ROLES: Tuple[Tuple[str, float], ...] = (
+    ("Contributor", 0.45),
+    ("Owner", 0.15),
+    ("Reader", 0.15),
+    ("User Access Administrator", 0.05),
+    ("Storage Account Contributor", 0.1),
+    ("Key Vault Administrator", 0.1),
+)
+
+# (provider, resource type, resource prefix, reason templates, operations)
+WORKLOADS: Tuple[Tuple[str, str, str, Tuple[str, ...], Tuple[str, ...]], ...] = (
+    (
+        "Microsoft.Storage",
+        "storageAccounts",
+        "st",
+        (
+            "{ticket}: create storage account for data export",
+            "Rotate storage keys per {ticket}",
+            "Blob lifecycle policy change {ticket}",
+        ),
+        ("write", "listKeys/action", "regenerateKey/action", "read"),
+    ),
+    (
+        "Microsoft.Compute",
+        "virtualMachines",
+        "vm",
+        (
+            "Restart VM after patching ({ticket})",
+            "{ticket} resize virtual machine for month-end load",
+            "Investigate VM boot failure {ticket}",
+        ),
+        ("restart/action", "write", "deallocate/action", "read"),
+    ),
+    (
+        "Microsoft.Network",
+        "networkSecurityGroups",
+        "nsg",
+        (
+            "Update network security group rules for {ticket}",
+            "{ticket}: open vnet peering to partner subscription",
+        ),
+        ("write", "securityRules/write", "read"),
+    ),
+    (
+        "Microsoft.KeyVault",
+        "vaults",
+        "kv",
+        (
+            "Rotate key vault secrets ({ticket})",
+            "{ticket} renew expiring certificate in keyvault",
+        ),
+        ("secrets/write", "certificates/write", "read"),
+    ),
+    (
+        "Microsoft.Sql",
+        "servers",
+        "sql",
+        (
+            "Database failover test {ticket}",
+            "{ticket}: scale sql database for reporting",
+        ),
+        ("databases/write", "firewallRules/write", "read"),
+    ),
+    (
+        "Microsoft.Authorization",
+        "roleAssignments",
+        "ra",
+        (
+            "Grant access for new team member ({ticket})",
+            "Emergency production fix {ticket}",
+        ),
+        ("write", "delete"),
+    ),
+)
+
+DURATION_HOURS: Tuple[Tuple[float, float], ...] = (
+    (0.5, 0.15),
+    (1, 0.3),
+    (2, 0.2),
+    (4, 0.2),
+    (8, 0.15),
+)
+
+
+@dataclass
+class DatasetSpec:
+    """
+    Parameters of a generated dataset.
+
+    Attributes:
+        activation_count: Number of PIM activations
+        seed: Random seed
+        hours: Period covered, ending at ``end``
+        end: End of the covered period
+        users_per_activation: Distinct users relative to activations
+        mean_activities: Mean AzureActivity records per activation
+        pareto_alpha: Shape of the per-user activity volume distribution;
+            smaller values give heavier tails
+        max_activities: Cap on the records of one activation
+        overlap_rate: Fraction of activations starting inside the same user's
+            previous elevation
+        deactivation_rate: Fraction of elevations ended early by the user
+        misaligned_rate: Fraction of activities unrelated to the stated reason
+    """
+
+    activation_count: int = 100
+    seed: int = 0
+    hours: int = 24
+    end: datetime = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    users_per_activation: float = 0.3
+    mean_activities: float = 20.0
+    pareto_alpha: float = 1.5
+    max_activities: int = 5000
+    overlap_rate: float = 0.2
+    deactivation_rate: float = 0.3
+    misaligned_rate: float = 0.1
+
+
+def _weighted(rng: random.Random, choices: Tuple[Tuple[Any, float], ...]) -> Any:
+    """Pick a value from (value, weight) pairs."""
+    values = [value for value, _ in choices]
+    weights = [weight for _, weight in choices]
+    return rng.choices(values, weights=weights)[0]
+
+
+def _activity(
+    rng: random.Random,
+    user: str,
+    timestamp: datetime,
+    workload: Tuple[str, str, str, Tuple[str, ...], Tuple[str, ...]],
+    subscription: str,
+) -> Dict[str, Any]:
+    """Build one AzureActivity record for a workload."""
+    provider, resource_type, prefix, _, operations = workload
+    operation = rng.choice(operations)
+    return {
+        "TimeGenerated": timestamp,
+        "Caller": user,
+        "OperationName": f"{provider}/{resource_type}/{operation}",
+        "OperationNameValue": f"{provider}/{resource_type}/{operation}",
+        "ResourceProviderValue": provider,
+        "Resource": f"{prefix}{rng.randrange(40):03d}",
+        "ResourceGroup": f"rg-{prefix}-{rng.choice(('prod', 'dev', 'shared'))}",
+        "SubscriptionId": subscription,
+        "ActivityStatusValue": "Success",
+    }
+
+
+def generate_dataset(spec: DatasetSpec) -> StandinDataset:
+    """
+    Generate a reproducible dataset.
+
+    Args:
+        spec: Dataset parameters
+
+    Returns:
+        Dataset with activations, endings and activities
+    """
+    rng = random.Random(spec.seed)
+    user_count = max(1, round(spec.activation_count * spec.users_per_activation))
+    users = [f"user{index:05d}@contoso.com" for index in range(user_count)]
+    # Pareto volumes normalized to a mean of one; max_activities caps the outliers
+    pareto_mean = spec.pareto_alpha / (spec.pareto_alpha - 1) if spec.pareto_alpha > 1 else 1.0
+    volume = {user: rng.paretovariate(spec.pareto_alpha) / pareto_mean for user in users}
+    subscriptions = [f"sub-{index:02d}" for index in range(max(1, user_count // 50))]
+
+    start = spec.end - timedelta(hours=spec.hours)
+    last_window: Dict[str, Tuple[datetime, datetime]] = {}
+    dataset = StandinDataset()
+
+    for index in range(spec.activation_count):
+        user = rng.choice(users)
+        duration = timedelta(hours=_weighted(rng, DURATION_HOURS))
+        previous = last_window.get(user)
+        if previous is not None and rng.random() < spec.overlap_rate:
+            overlap_end = min(previous[1], spec.end)
+            activated = previous[0] + (overlap_end - previous[0]) * rng.random()
+        else:
+            activated = start + (spec.end - start) * rng.random()
+        requested_end = activated + duration
+        last_window[user] = (activated, requested_end)
+
+        workload = rng.choice(WORKLOADS)
+        ticket = f"{rng.choice(('INC', 'CHG', 'RITM'))}{rng.randrange(100000, 999999)}"
+        role = _weighted(rng, ROLES)
+        dataset.activations.append(
+            {
+                "TimeGenerated": activated,
+                "RecordId": f"record-{spec.seed}-{index:07d}",
+                "UserEmail": user,
+                "RoleName": role,
+                "Reason": rng.choice(workload[3]).format(ticket=ticket),
+                "RequestedEnd": requested_end,
+            }
+        )
+
+        ended = requested_end
+        if rng.random() < spec.deactivation_rate:
+            ended = activated + duration * rng.uniform(0.1, 0.9)
+        if ended < spec.end:
+            dataset.endings.append({"EndedAt": ended, "UserEmail": user, "RoleName": role})
+
+        count = min(
+            spec.max_activities,
+            round(spec.mean_activities * volume[user] * rng.uniform(0.5, 1.5)),
+        )
+        window_end = min(ended, spec.end)
+        subscription = rng.choice(subscriptions)
+        for _ in range(count):
+            timestamp = activated + (window_end - activated) * rng.random()
+            chosen = workload if rng.random() >= spec.misaligned_rate else rng.choice(WORKLOADS)
+            dataset.activities.append(_activity(rng, user, timestamp, chosen, subscription))
+
+    dataset.reindex()
+    logger.info(
+        f"Generated {len(dataset.activations)} activations, {len(dataset.endings)} endings "
+        f"and {len(dataset.activities)} activities for {user_count} users"
+    )
+    return dataset
+
+
+def _encode(record: Dict[str, Any]) -> str:
+    """Serialize a record as one JSON line."""
+    return json.dumps(
+        {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in record.items()
+        },
+        sort_keys=True,
+    )
+
+
+def _decode(line: str) -> Dict[str, Any]:
+    """Parse one JSON line back into a record."""
+    record: Dict[str, Any] = json.loads(line)
+    for key in DATETIME_FIELDS:
+        if isinstance(record.get(key), str):
+            record[key] = datetime.fromisoformat(record[key])
+    return record
+
+
+def write_dataset(dataset: StandinDataset, directory: Path) -> None:
+    """
+    Write a dataset as JSON Lines files.
+
+    Args:
+        dataset: Dataset to write
+        directory: Output directory (created if missing)
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for attribute, filename in DATASET_FILES.items():
+        records: List[Dict[str, Any]] = getattr(dataset, attribute)
+        with open(directory / filename, "w", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(_encode(record) + "\n")
+    logger.info(f"Wrote dataset to {directory}")
+
+
+def load_dataset(directory: Path) -> StandinDataset:
+    """
+    Load a dataset written by ``write_dataset``.
+
+    Args:
+        directory: Dataset directory
+
+    Returns:
+        Dataset
+    """
+    records: Dict[str, List[Dict[str, Any]]] = {}
+    for attribute, filename in DATASET_FILES.items():
+        with open(directory / filename, encoding="utf-8") as handle:
+            records[attribute] = [_decode(line) for line in handle if line.strip()]
+    return StandinDataset(**records)
+
+
+@click.command()
+@click.option("--activations", type=int, default=100, help="Number of PIM activations")
+@click.option("--seed", type=int, default=0, help="Random seed")
+@click.option("--hours", type=int, default=24, help="Period covered, in hours")
+@click.option(
+    "--end",
+    type=click.DateTime(formats=["%Y-%m-%dT%H:%M:%S"]),
+    default=None,
+    help="End of the covered period in UTC (default: now)",
+)
+@click.option("--mean-activities", type=float, default=20.0, help="Mean activities per activation")
+@click.option("--pareto-alpha", type=float, default=1.5, help="Activity volume tail shape")
+@click.option("--output", type=click.Path(path_type=Path), required=True, help="Output directory")
+def main(
+    activations: int,
+    seed: int,
+    hours: int,
+    end: Optional[datetime],
+    mean_activities: float,
+    pareto_alpha: float,
+    output: Path,
+) -> None:
+    """Generate a dataset and write it as JSON Lines files."""
+    logging.basicConfig(level=logging.INFO)
+    spec = DatasetSpec(
+        activation_count=activations,
+        seed=seed,
+        hours=hours,
+        end=end.replace(tzinfo=timezone.utc) if end else datetime.now(timezone.utc),
+        mean_activities=mean_activities,
+        pareto_alpha=pareto_alpha,
+    )
+    write_dataset(generate_dataset(spec), output)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
@@ -0,0 +1,133 @@
+"""In-process Log Analytics and OpenAI clients replaying stand-in data."""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.standin_server import StandinDataset, canned_completion
+from pim_auto.azure.log_analytics import QueryResult, QueryRowStream, Timespan
+from pim_auto.azure.rate_limiter import estimate_request_tokens
+from pim_auto.monitoring.timing import record_openai_usage
+
+logger = logging.getLogger(__name__)
+
+
+def _bounds(timespan: Optional[Timespan], now: datetime) -> Tuple[datetime, datetime]:
+    """Get explicit (start, end) bounds for a query timespan."""
+    if isinstance(timespan, tuple):
+        start, end_or_duration = timespan
+        if isinstance(end_or_duration, timedelta):
+            return start, start + end_or_duration
+        return start, end_or_duration
+    if isinstance(timespan, str):
+        if timespan.startswith("PT") and timespan.endswith("H"):
+            timespan = timedelta(hours=int(timespan[2:-1]))
+        elif timespan.startswith("P") and timespan.endswith("D"):
+            timespan = timedelta(days=int(timespan[1:-1]))
+        else:
+            timespan = timedelta(days=1)
+    return now - (timespan or timedelta(hours=24)), now
+
+
+class ReplayLogAnalyticsClient:
+    """
+    Drop-in replacement for ``LogAnalyticsClient`` answering from a dataset.
+
+    Queries are answered in process by ``StandinDataset.query``, without
+    HTTP or serialization, so benchmarks measure PIM Auto's own overhead.
+
+    Args:
+        dataset: Records to answer queries from
+        now: Time relative timespans end at (default: now, UTC); set it to the
+            end of a generated dataset to replay it at any later date
+        latency_ms: Simulated service latency per query
+    """
+
+    def __init__(
+        self,
+        dataset: StandinDataset,
+        now: Optional[datetime] = None,
+        latency_ms: float = 0.0,
+    ):
+        self.dataset = dataset
+        self.now = now
+        self.latency_ms = latency_ms
+        self.queries = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def execute_query(
+        self,
+        query: str,
+        timespan: Optional[Timespan] = None,
+        split_on_limit: bool = False,
+        chunked: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Execute KQL query and return results."""
+        return self.execute_query_columnar(query, timespan).to_dicts()
+
+    def execute_query_columnar(
+        self,
+        query: str,
+        timespan: Optional[Timespan] = None,
+        split_on_limit: bool = False,
+        chunked: bool = False,
+    ) -> QueryResult:
+        """Execute KQL query and return a column-oriented result."""
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        start, end = _bounds(timespan, self.now or datetime.now(timezone.utc))
+        columns, rows = self.dataset.query(query, start, end)
+        with self._lock:
+            self.queries += 1
+            self.rows += len(rows)
+        logger.debug(f"Replayed query returned {len(rows)} rows")
+        return QueryResult([name for name, _ in columns], [tuple(row) for row in rows])
+
+    def stream_query(
+        self,
+        query: str,
+        timespan: Optional[Timespan] = None,
+        split_on_limit: bool = False,
+        chunked: bool = False,
+    ) -> QueryRowStream:
+        """Execute KQL query and return rows lazily as tuples."""
+        result = self.execute_query_columnar(query, timespan)
+        return QueryRowStream(result.columns, iter(result.rows))
+
+
+class ReplayOpenAIClient:
+    """
+    Drop-in replacement for ``OpenAIClient`` returning canned completions.
+
+    Args:
+        latency_ms: Simulated service latency per request
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.deployment = "replay"
+        self.calls = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def generate_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Generate chat completion."""
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        content = canned_completion(messages, response_format)
+        prompt_tokens = estimate_request_tokens(messages, 0)
+        completion_tokens = len(content) // 4
+        record_openai_usage(prompt_tokens, completion_tokens)
+        with self._lock:
+            self.calls += 1
+            self.tokens += prompt_tokens + completion_tokens
+        return content
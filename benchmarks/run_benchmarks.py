@@ -0,0 +1,216 @@
+"""
+End-to-end benchmarks of the batch pipeline.
+
+Drives ``BatchRunner.run`` against replayed clients at several scales and
+records wall time, peak RSS, Log Analytics queries and rows, and OpenAI
+calls and tokens. Every scale runs in a fresh process so peak RSS is not
+inflated by earlier, larger runs. Results are compared against a stored
+baseline; wall time and memory may grow by a tolerance, call counts must
+not grow at all. Run it with ``python -m benchmarks.run_benchmarks``.
+"""
+
+import json
+import logging
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import click
+
+from benchmarks.datagen import DatasetSpec, generate_dataset
+from benchmarks.replay import ReplayLogAnalyticsClient, ReplayOpenAIClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCALES = (10, 100, 1000, 10000)
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Metrics compared against the baseline with a relative tolerance, plus an
+# absolute slack so millisecond-scale runs do not flag noise as regressions
+TIMED_METRICS = {"wall_seconds": 0.25, "peak_rss_mb": 10.0}
+# Metrics that are deterministic for a seed and must not grow
+COUNTED_METRICS = ("log_analytics_queries", "openai_calls", "openai_tokens")
+
+
+def run_scale(
+    activations: int,
+    seed: int = 0,
+    logs_latency_ms: float = 0.0,
+    openai_latency_ms: float = 0.0,
+    config_overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Run one batch scan over a generated dataset and measure it.
+
+    Args:
+        activations: Number of PIM activations in the dataset
+        seed: Dataset seed
+        logs_latency_ms: Simulated Log Analytics latency per query
+        openai_latency_ms: Simulated OpenAI latency per request
+        config_overrides: Config fields to change from the defaults
+
+    Returns:
+        Metrics of the run
+    """
+    from pim_auto.config import Config
+    from pim_auto.interfaces.batch_runner import BatchRunner
+
+    spec = DatasetSpec(activation_count=activations, seed=seed)
+    dataset = generate_dataset(spec)
+    log_analytics = ReplayLogAnalyticsClient(dataset, now=spec.end, latency_ms=logs_latency_ms)
+    openai_client = ReplayOpenAIClient(latency_ms=openai_latency_ms)
+    config = Config(
+        azure_openai_endpoint="https://benchmark.openai.azure.com",
+        azure_openai_deployment="benchmark",
+        log_analytics_workspace_id="00000000-0000-0000-0000-000000000000",
+        default_scan_hours=spec.hours,
+        enable_app_insights=False,
+        **(config_overrides or {}),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        runner = BatchRunner(log_analytics, openai_client, config)  # type: ignore[arg-type]
+        started = time.perf_counter()
+        exit_code = runner.run(hours=spec.hours, output_path=Path(directory) / "report.md")
+        wall_seconds = time.perf_counter() - started
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+    return {
+        "activations": activations,
+        "exit_code": exit_code,
+        "wall_seconds": round(wall_seconds, 3),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "log_analytics_queries": log_analytics.queries,
+        "log_analytics_rows": log_analytics.rows,
+        "openai_calls": openai_client.calls,
+        "openai_tokens": openai_client.tokens,
+    }
+
+
+def run_benchmarks(scales: Sequence[int], **options: Any) -> List[Dict[str, Any]]:
+    """
+    Run every scale in its own process.
+
+    Args:
+        scales: Activation counts to benchmark
+        **options: Further ``run_scale`` arguments
+
+    Returns:
+        Metrics per scale, in the order of ``scales``
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for scale in scales:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_scale, scale, **options).result()
+        logger.info(f"Scale {scale}: {result}")
+        results.append(result)
+    return results
+
+
+def compare_to_baseline(
+    results: Sequence[Dict[str, Any]],
+    baseline: Sequence[Dict[str, Any]],
+    tolerance: float = 0.25,
+) -> List[str]:
+    """
+    Find regressions against a baseline.
+
+    Args:
+        results: Metrics of the current run
+        baseline: Stored metrics
+        tolerance: Allowed relative growth of timed metrics
+
+    Returns:
+        Descriptions of regressions (empty when there are none)
+    """
+    by_scale = {entry["activations"]: entry for entry in baseline}
+    regressions = []
+    for result in results:
+        scale = result["activations"]
+        reference = by_scale.get(scale)
+        if reference is None:
+            continue
+        if result.get("exit_code", 0) != 0:
+            regressions.append(f"{scale} activations: batch run failed")
+        for metric, slack in TIMED_METRICS.items():
+            limit = max(reference[metric] * (1 + tolerance), reference[metric] + slack)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{scale} activations: {metric} {result[metric]} exceeds "
+                    f"baseline {reference[metric]} by more than {tolerance:.0%}"
+                )
+        for metric in COUNTED_METRICS:
+            if result[metric] > reference[metric]:
+                regressions.append(
+                    f"{scale} activations: {metric} grew from {reference[metric]} "
+                    f"to {result[metric]}"
+                )
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--scales",
+    default=",".join(str(scale) for scale in DEFAULT_SCALES),
+    help="Comma-separated activation counts",
+)
+@click.option("--seed", type=int, default=0, help="Dataset seed")
+@click.option("--logs-latency-ms", type=float, default=0.0, help="Simulated query latency")
+@click.option("--openai-latency-ms", type=float, default=0.0, help="Simulated OpenAI latency")
+@click.option(
+    "--baseline",
+    type=click.Path(path_type=Path),
+    default=BASELINE_PATH,
+    help="Baseline file to compare against",
+)
+@click.option("--tolerance", type=float, default=0.25, help="Allowed timing/memory growth")
+@click.option("--update-baseline", is_flag=True, help="Store the results as the new baseline")
+@click.option("--output", type=click.Path(path_type=Path), default=None, help="Results JSON")
+def main(
+    scales: str,
+    seed: int,
+    logs_latency_ms: float,
+    openai_latency_ms: float,
+    baseline: Path,
+    tolerance: float,
+    update_baseline: bool,
+    output: Optional[Path],
+) -> int:
+    """Run the benchmarks and compare them against the baseline."""
+    logging.basicConfig(level=logging.WARNING)
+    results = run_benchmarks(
+        [int(scale) for scale in scales.split(",") if scale.strip()],
+        seed=seed,
+        logs_latency_ms=logs_latency_ms,
+        openai_latency_ms=openai_latency_ms,
+    )
+    click.echo(json.dumps(results, indent=2))
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if update_baseline:
+        baseline.write_text(json.dumps(results, indent=2) + "\n")
+        click.echo(f"Baseline written to {baseline}")
+        return 0
+
+    if not baseline.exists():
+        click.echo(f"No baseline at {baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare_to_baseline(results, json.loads(baseline.read_text()), tolerance)
+    for regression in regressions:
+        click.echo(f"REGRESSION: {regression}", err=True)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(standalone_mode=False))  # pylint: disable=no-value-for-parameter
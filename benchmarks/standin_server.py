@@ -0,0 +1,784 @@
+"""
+Local stand-in for the Log Analytics query API and Azure OpenAI chat completions.
+
+The server speaks enough of both REST APIs for the real ``LogAnalyticsClient``
+and ``OpenAIClient`` to run against it, so ``BatchRunner`` and
+``InteractiveCLI`` can be load tested without a tenant. It does not execute
+KQL: it recognizes the queries issued by ``PIMDetector`` and
+``ActivityCorrelator`` and answers them from an in-memory dataset. Other
+queries return an empty table. Completions are canned verdicts chosen
+deterministically from the prompt.
+
+Latency and throttling/error responses can be injected per service. Run it
+standalone with ``python -m benchmarks.standin_server``.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import click
+from azure.core.credentials import AccessToken
+
+logger = logging.getLogger(__name__)
+
+WORKSPACE_ID = "00000000-0000-0000-0000-000000000000"
+DEPLOYMENT = "standin"
+
+ACTIVATION_OPERATION = "Add member to role completed (PIM activation)"
+
+LOGS_QUERY_PATH = re.compile(r"/v1/workspaces/[^/]+/query$")
+COMPLETIONS_PATH = re.compile(r"/openai/deployments/([^/]+)/chat/completions$")
+
+ACTIVITY_COLUMNS = (
+    ("TimeGenerated", "datetime"),
+    ("OperationName", "string"),
+    ("OperationNameValue", "string"),
+    ("ResourceProviderValue", "string"),
+    ("Resource", "string"),
+    ("ResourceGroup", "string"),
+    ("SubscriptionId", "string"),
+    ("ActivityStatusValue", "string"),
+)
+ACTIVATION_COLUMNS = (
+    ("TimeGenerated", "datetime"),
+    ("RecordId", "string"),
+    ("UserEmail", "string"),
+    ("RoleName", "string"),
+    ("Reason", "string"),
+    ("RequestedEnd", "datetime"),
+)
+ENDING_COLUMNS = (
+    ("EndedAt", "datetime"),
+    ("UserEmail", "string"),
+    ("RoleName", "string"),
+)
+
+_KQL_DATETIME = r"datetime\(\"?([^)\"]+)\"?\)"
+_KQL_STRING = r"\"((?:[^\"\\]|\\.)*)\""
+WINDOW_ROW = re.compile(rf"(\d+), {_KQL_STRING}, {_KQL_DATETIME}, {_KQL_DATETIME}")
+CALLER_FILTER = re.compile(rf"Caller == {_KQL_STRING}")
+BETWEEN_FILTER = re.compile(rf"between \({_KQL_DATETIME} \.\. {_KQL_DATETIME}\)")
+WATERMARK_FILTER = re.compile(
+    rf"TimeGenerated > {_KQL_DATETIME} or \(TimeGenerated == {_KQL_DATETIME} "
+    rf"and strcmp\(Id, {_KQL_STRING}\) > 0\)"
+)
+
+STANDIN_REASONS = (
+    "Add storage account for data export",
+    "Restart virtual machine after patching",
+    "Update network security group rules",
+    "Rotate key vault secrets",
+    "Emergency production fix",
+)
+STANDIN_ROLES = ("Contributor", "Owner", "User Access Administrator", "Reader")
+STANDIN_OPERATIONS = (
+    ("Microsoft.Storage/storageAccounts/write", "Microsoft.Storage"),
+    ("Microsoft.Compute/virtualMachines/restart/action", "Microsoft.Compute"),
+    ("Microsoft.Network/networkSecurityGroups/write", "Microsoft.Network"),
+    ("Microsoft.KeyVault/vaults/secrets/write", "Microsoft.KeyVault"),
+    ("Microsoft.Resources/subscriptions/resourceGroups/read", "Microsoft.Resources"),
+)
+
+
+def _parse_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, assuming UTC when no offset is given."""
+    parsed = datetime.fromisoformat(value.strip())
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _parse_duration(value: str) -> timedelta:
+    """Parse the ``PT<seconds>S`` durations sent by the Logs query SDK."""
+    match = re.fullmatch(
+        r"PT(?:(\d+(?:\.\d+)?)H)?(?:(\d+(?:\.\d+)?)M)?(?:(\d+(?:\.\d+)?)S)?", value
+    )
+    if not match:
+        raise ValueError(f"Unsupported duration: {value}")
+    hours, minutes, seconds = (float(part or 0) for part in match.groups())
+    return timedelta(hours=hours, minutes=minutes, seconds=seconds)
+
+
+def parse_timespan(
+    value: Optional[str], now: Optional[datetime] = None
+) -> Tuple[datetime, datetime]:
+    """
+    Convert a Logs query ``timespan`` to explicit bounds.
+
+    Args:
+        value: ``start/end``, ``start/duration`` or ``duration`` (ending now)
+        now: Current time (default: now, UTC)
+
+    Returns:
+        Tuple of (start, end)
+    """
+    now = now or datetime.now(timezone.utc)
+    if not value:
+        return datetime.min.replace(tzinfo=timezone.utc), now
+    if "/" not in value:
+        return now - _parse_duration(value), now
+    start_text, end_text = value.split("/", 1)
+    start = _parse_datetime(start_text)
+    if end_text.startswith("P"):
+        return start, start + _parse_duration(end_text)
+    return start, _parse_datetime(end_text)
+
+
+def _unescape(value: str) -> str:
+    """Undo KQL string literal escaping."""
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def _json_value(value: Any) -> Any:
+    """Serialize a cell value the way the Logs query API does."""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+    return value
+
+
+@dataclass
+class StandinDataset:
+    """
+    In-memory AuditLogs and AzureActivity records served by the stand-in.
+
+    Attributes:
+        activations: PIM activation rows (TimeGenerated, RecordId, UserEmail,
+            RoleName, Reason, RequestedEnd)
+        endings: PIM deactivation/expiry rows (EndedAt, UserEmail, RoleName)
+        activities: AzureActivity rows (TimeGenerated, Caller, OperationName,
+            OperationNameValue, ResourceProviderValue, Resource, ResourceGroup, SubscriptionId,
+            ActivityStatusValue)
+    """
+
+    activations: List[Dict[str, Any]] = field(default_factory=list)
+    endings: List[Dict[str, Any]] = field(default_factory=list)
+    activities: List[Dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.reindex()
+
+    def reindex(self) -> None:
+        """Rebuild lookup structures after the records changed."""
+        self._activities_by_caller: Dict[str, List[Dict[str, Any]]] = {}
+        for activity in sorted(self.activities, key=lambda a: a["TimeGenerated"]):
+            self._activities_by_caller.setdefault(activity["Caller"], []).append(activity)
+        self._activity_times = {
+            caller: [a["TimeGenerated"] for a in rows]
+            for caller, rows in self._activities_by_caller.items()
+        }
+        self._endings_by_key: Dict[Tuple[str, str], List[datetime]] = {}
+        for ending in self.endings:
+            key = (ending["UserEmail"], ending["RoleName"])
+            self._endings_by_key.setdefault(key, []).append(ending["EndedAt"])
+
+    def latest_time(self) -> Optional[datetime]:
+        """Get the time of the most recent record, if any."""
+        times = [
+            *(a["TimeGenerated"] for a in self.activations),
+            *(e["EndedAt"] for e in self.endings),
+            *(a["TimeGenerated"] for a in self.activities),
+        ]
+        return max(times) if times else None
+
+    def activities_between(
+        self, caller: str, start: datetime, end: datetime
+    ) -> List[Dict[str, Any]]:
+        """Get a caller's activities with ``start <= TimeGenerated <= end``, oldest first."""
+        times = self._activity_times.get(caller, [])
+        low = bisect.bisect_left(times, start)
+        high = bisect.bisect_right(times, end)
+        return self._activities_by_caller[caller][low:high] if high > low else []
+
+    def deactivated_at(self, activation: Dict[str, Any], end: datetime) -> Optional[datetime]:
+        """Get the first recorded end of an activation before ``end``."""
+        key = (activation["UserEmail"], activation["RoleName"])
+        candidates = [
+            ended_at
+            for ended_at in self._endings_by_key.get(key, [])
+            if activation["TimeGenerated"] <= ended_at < end
+        ]
+        return min(candidates) if candidates else None
+
+    def query(
+        self, query: str, start: datetime, end: datetime
+    ) -> Tuple[Sequence[Tuple[str, str]], List[List[Any]]]:
+        """
+        Answer a PIM Auto query over the records in ``start .. end``.
+
+        Args:
+            query: KQL issued by PIMDetector or ActivityCorrelator
+            start: Start of the query timespan
+            end: End of the query timespan (exclusive)
+
+        Returns:
+            Tuple of (columns as (name, type) pairs, rows); no columns and
+            no rows for queries that are not recognized
+        """
+        if "AzureActivity" in query:
+            if "datatable(WindowIndex" in query:
+                return self._window_activities(query, start, end)
+            return ACTIVITY_COLUMNS, self._user_activities(query, start, end)
+        if "AuditLogs" in query:
+            if "join kind=leftouter endings" in query:
+                columns = (*ACTIVATION_COLUMNS, ("DeactivatedAt", "datetime"))
+                rows = [
+                    [*row, self.deactivated_at(activation, end)]
+                    for activation, row in self._activations(query, start, end)
+                ]
+                return columns, rows
+            if f'OperationName == "{ACTIVATION_OPERATION}"' in query:
+                return ACTIVATION_COLUMNS, [row for _, row in self._activations(query, start, end)]
+            if "OperationName in (" in query:
+                return ENDING_COLUMNS, self._endings(start, end)
+        logger.debug("Stand-in dataset does not recognize the query; returning no rows")
+        return (), []
+
+    def _activations(
+        self, query: str, start: datetime, end: datetime
+    ) -> List[Tuple[Dict[str, Any], List[Any]]]:
+        """Get activations in the timespan and after any watermark, newest first."""
+        watermark = WATERMARK_FILTER.search(query)
+        selected = []
+        for activation in self.activations:
+            generated = activation["TimeGenerated"]
+            if not start <= generated < end:
+                continue
+            if watermark is not None:
+                watermark_time = _parse_datetime(watermark.group(1))
+                record_id = _unescape(watermark.group(3))
+                if generated < watermark_time or (
+                    generated == watermark_time and activation["RecordId"] <= record_id
+                ):
+                    continue
+            selected.append(activation)
+        selected.sort(key=lambda a: a["TimeGenerated"], reverse=True)
+        return [(a, [a[name] for name, _ in ACTIVATION_COLUMNS]) for a in selected]
+
+    def _endings(self, start: datetime, end: datetime) -> List[List[Any]]:
+        """Get elevation endings in the timespan."""
+        return [
+            [ending[name] for name, _ in ENDING_COLUMNS]
+            for ending in self.endings
+            if start <= ending["EndedAt"] < end
+        ]
+
+    def _user_activities(self, query: str, start: datetime, end: datetime) -> List[List[Any]]:
+        """Answer ActivityCorrelator's single-user query."""
+        caller = CALLER_FILTER.search(query)
+        between = BETWEEN_FILTER.search(query)
+        if caller is None:
+            return []
+        low, high = start, end
+        if between is not None:
+            low = max(low, _parse_datetime(between.group(1)))
+            high = min(high, _parse_datetime(between.group(2)))
+        return [
+            [activity.get(name) for name, _ in ACTIVITY_COLUMNS]
+            for activity in self.activities_between(_unescape(caller.group(1)), low, high)
+            if activity["TimeGenerated"] < end
+        ]
+
+    def _window_activities(
+        self, query: str, start: datetime, end: datetime
+    ) -> Tuple[Sequence[Tuple[str, str]], List[List[Any]]]:
+        """Answer ActivityCorrelator's bulk query joining activation windows."""
+        columns = (("WindowIndex", "long"), *ACTIVITY_COLUMNS)
+        rows = []
+        for match in WINDOW_ROW.finditer(query):
+            index = int(match.group(1))
+            window_start = max(start, _parse_datetime(match.group(3)))
+            window_end = _parse_datetime(match.group(4))
+            for activity in self.activities_between(
+                _unescape(match.group(2)), window_start, window_end
+            ):
+                if activity["TimeGenerated"] < end:
+                    rows.append([index, *(activity.get(name) for name, _ in ACTIVITY_COLUMNS)])
+        return columns, rows
+
+    @classmethod
+    def synthetic(
+        cls,
+        activation_count: int = 10,
+        activities_per_activation: int = 5,
+        seed: int = 0,
+        end: Optional[datetime] = None,
+    ) -> "StandinDataset":
+        """
+        Build a small uniform dataset covering the 24 hours before ``end``.
+
+        Args:
+            activation_count: Number of PIM activations
+            activities_per_activation: AzureActivity records per activation
+            seed: Random seed
+            end: End of the covered period (default: now, UTC)
+
+        Returns:
+            Dataset
+        """
+        rng = random.Random(seed)
+        end = end or datetime.now(timezone.utc)
+        dataset = cls()
+        for index in range(activation_count):
+            user = f"user{index % max(1, activation_count // 2)}@contoso.com"
+            activated = end - timedelta(hours=rng.uniform(2, 23))
+            duration = timedelta(hours=rng.choice((1, 2, 4, 8)))
+            role = rng.choice(STANDIN_ROLES)
+            dataset.activations.append(
+                {
+                    "TimeGenerated": activated,
+                    "RecordId": f"record-{index:06d}",
+                    "UserEmail": user,
+                    "RoleName": role,
+                    "Reason": rng.choice(STANDIN_REASONS),
+                    "RequestedEnd": activated + duration,
+                }
+            )
+            for _ in range(activities_per_activation):
+                operation, provider = rng.choice(STANDIN_OPERATIONS)
+                dataset.activities.append(
+                    {
+                        "TimeGenerated": activated + duration * rng.random(),
+                        "Caller": user,
+                        "OperationName": operation,
+                        "OperationNameValue": operation,
+                        "ResourceProviderValue": provider,
+                        "Resource": f"resource{rng.randrange(50)}",
+                        "ResourceGroup": f"rg-{rng.randrange(5)}",
+                        "SubscriptionId": "sub-standin",
+                        "ActivityStatusValue": "Success",
+                    }
+                )
+        dataset.reindex()
+        return dataset
+
+
+@dataclass
+class FaultProfile:
+    """
+    Latency and error injection for one stand-in service.
+
+    Attributes:
+        latency_ms: Fixed delay before every response
+        jitter_ms: Additional uniformly distributed delay, up to this value
+        error_rate: Fraction of requests answered with ``error_status``
+        error_status: HTTP status of injected errors (429 adds a Retry-After)
+        retry_after_seconds: Retry-After sent with injected 429 responses
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    retry_after_seconds: float = 1.0
+
+
+@dataclass
+class StandinStats:
+    """Request counters collected by the stand-in server."""
+
+    log_queries: int = 0
+    log_rows: int = 0
+    completions: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    injected_errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Get the counters as a dictionary."""
+        return dict(self.__dict__)
+
+
+def canned_completion(
+    messages: Sequence[Dict[str, Any]], response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a deterministic completion for a PIM Auto prompt.
+
+    Verdicts are picked from a hash of the user messages, in the format the
+    system prompt asks for: text, a JSON object, a batched JSON array, or a
+    KQL query for the query generator.
+
+    Args:
+        messages: Chat messages
+        response_format: Requested ``response_format``, if any
+
+    Returns:
+        Completion content
+    """
+    system = " ".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+    user = " ".join(str(m.get("content", "")) for m in messages if m.get("role") != "system")
+    digest = int(hashlib.sha256(user.encode("utf-8")).hexdigest(), 16)
+    levels = ("ALIGNED", "ALIGNED", "PARTIALLY_ALIGNED", "NOT_ALIGNED")
+
+    if "JSON array" in system:
+        count = len(re.findall(r"^Activation \d+:", user, flags=re.MULTILINE))
+        return json.dumps(
+            [
+                {
+                    "id": number,
+                    "level": levels[(digest >> number) % len(levels)],
+                    "explanation": "Stand-in batched assessment.",
+                }
+                for number in range(1, count + 1)
+            ]
+        )
+    if response_format or "JSON object" in system:
+        return json.dumps(
+            {
+                "level": levels[digest % len(levels)],
+                "confidence": 0.9,
+                "reasons": ["Stand-in assessment."],
+            }
+        )
+    if "Kusto Query Language" in system:
+        return "AuditLogs | where TimeGenerated > ago(24h) | take 10"
+    return f"{levels[digest % len(levels)]}: Stand-in assessment of the activities."
+
+
+def _estimate_tokens(text: str) -> int:
+    """Approximate token count, matching the client-side estimate."""
+    return (len(text) + 3) // 4
+
+
+class StandinServer:
+    """
+    Threaded HTTP stand-in for Log Analytics and Azure OpenAI.
+
+    Args:
+        dataset: Records served to Log Analytics queries
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        logs_faults: Latency/error injection for Log Analytics queries
+        openai_faults: Latency/error injection for chat completions
+        max_rows: Rows after which a query returns a partial result flagged as
+            too large, like the service's result-size limit (None for no limit)
+        seed: Seed for jitter and error injection
+        now: Time relative timespans end at (default: the current time); set
+            it to the end of a generated dataset to replay it at any later date
+    """
+
+    def __init__(
+        self,
+        dataset: Optional[StandinDataset] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        logs_faults: Optional[FaultProfile] = None,
+        openai_faults: Optional[FaultProfile] = None,
+        max_rows: Optional[int] = None,
+        seed: int = 0,
+        now: Optional[datetime] = None,
+    ):
+        self.dataset = dataset or StandinDataset()
+        self.now = now
+        self.logs_faults = logs_faults or FaultProfile()
+        self.openai_faults = openai_faults or FaultProfile()
+        self.max_rows = max_rows
+        self.stats = StandinStats()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), _handler_for(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> "StandinServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Stand-in server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        """Zero the request counters."""
+        with self._lock:
+            self.stats = StandinStats()
+
+    def inject(self, faults: FaultProfile) -> bool:
+        """
+        Sleep for the injected latency and decide whether to fail the request.
+
+        Returns:
+            True when the request should be answered with an injected error
+        """
+        with self._lock:
+            delay = faults.latency_ms + self._random.random() * faults.jitter_ms
+            fail = self._random.random() < faults.error_rate
+            if fail:
+                self.stats.injected_errors += 1
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        return fail
+
+    def handle(self, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """
+        Route a POST request, applying latency and error injection.
+
+        Args:
+            path: Request path without the query string
+            body: Parsed JSON request body
+
+        Returns:
+            Tuple of (HTTP status, response body, extra response headers)
+        """
+        if LOGS_QUERY_PATH.search(path):
+            faults, answer = self.logs_faults, self.run_query
+        elif COMPLETIONS_PATH.search(path):
+            faults, answer = self.openai_faults, self.complete
+        else:
+            return 404, {"error": {"code": "NotFound", "message": path}}, {}
+
+        if self.inject(faults):
+            headers = {}
+            if faults.error_status == 429:
+                headers["Retry-After"] = f"{faults.retry_after_seconds:g}"
+                headers["retry-after-ms"] = f"{faults.retry_after_seconds * 1000:g}"
+            error = {"code": "InjectedError", "message": "Stand-in injected error"}
+            return faults.error_status, {"error": error}, headers
+
+        try:
+            return 200, answer(body), {}
+        except Exception as e:
+            logger.exception("Stand-in request failed")
+            return 500, {"error": {"code": "InternalError", "message": str(e)}}, {}
+
+    def run_query(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a Logs query request body.
+
+        Returns:
+            Logs query response body
+        """
+        query = str(body.get("query", ""))
+        start, end = parse_timespan(body.get("timespan"), now=self.now)
+        columns, rows = self.dataset.query(query, start, end)
+
+        response: Dict[str, Any] = {}
+        if self.max_rows is not None and len(rows) > self.max_rows:
+            rows = rows[: self.max_rows]
+            response["error"] = {
+                "code": "PartialError",
+                "message": "E_QUERY_RESULT_SET_TOO_LARGE: result set exceeded the row limit",
+            }
+
+        with self._lock:
+            self.stats.log_queries += 1
+            self.stats.log_rows += len(rows)
+        response["tables"] = [
+            {
+                "name": "PrimaryResult",
+                "columns": [{"name": name, "type": kind} for name, kind in columns],
+                "rows": [[_json_value(value) for value in row] for row in rows],
+            }
+        ]
+        return response
+
+    def complete(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a chat-completions request body with a canned completion.
+
+        Returns:
+            Chat completion response body
+        """
+        messages = body.get("messages", [])
+        content = canned_completion(messages, body.get("response_format"))
+        prompt_tokens = sum(_estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        with self._lock:
+            self.stats.completions += 1
+            self.stats.prompt_tokens += prompt_tokens
+            self.stats.completion_tokens += completion_tokens
+        return {
+            "id": f"chatcmpl-standin-{self.stats.completions}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or DEPLOYMENT,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+def _handler_for(server: StandinServer) -> Type[BaseHTTPRequestHandler]:
+    """Build a request handler class bound to a stand-in server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:  # noqa: N802 - http.server naming
+            path = self.path.split("?", 1)[0]
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": {"code": "BadRequest", "message": "Invalid JSON"}})
+                return
+
+            self._send(*server.handle(path, body))
+
+        def _send(
+            self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+        ) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return Handler
+
+
+class StaticTokenCredential:
+    """Credential returning a fixed token, for clients pointed at the stand-in."""
+
+    def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+        return AccessToken("standin-token", int(time.time()) + 3600)
+
+
+def standin_clients(
+    server: StandinServer,
+    log_analytics_options: Optional[Dict[str, Any]] = None,
+    openai_options: Optional[Dict[str, Any]] = None,
+) -> Tuple[Any, Any]:
+    """
+    Build the real Log Analytics and OpenAI clients pointed at a stand-in server.
+
+    Args:
+        server: Running stand-in server
+        log_analytics_options: Extra LogAnalyticsClient arguments (e.g. retry_policy)
+        openai_options: Extra OpenAIClient arguments (e.g. rate_limiter, retry_policy)
+
+    Returns:
+        Tuple of (LogAnalyticsClient, OpenAIClient)
+    """
+    from pim_auto.azure.log_analytics import LogAnalyticsClient
+    from pim_auto.azure.openai_client import OpenAIClient
+
+    credential: Any = StaticTokenCredential()
+    log_analytics = LogAnalyticsClient(
+        workspace_id=WORKSPACE_ID,
+        credential=credential,
+        endpoint=server.url,
+        **(log_analytics_options or {}),
+    )
+    openai_client = OpenAIClient(
+        endpoint=server.url,
+        deployment=DEPLOYMENT,
+        api_version="2024-02-15-preview",
+        credential=credential,
+        **(openai_options or {}),
+    )
+    return log_analytics, openai_client
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Interface to bind")
+@click.option("--port", type=int, default=8080, help="Port to bind")
+@click.option(
+    "--dataset",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Directory written by benchmarks.datagen (default: small synthetic dataset)",
+)
+@click.option("--activations", type=int, default=100, help="Synthetic PIM activations")
+@click.option("--activities", type=int, default=20, help="Activities per activation")
+@click.option("--seed", type=int, default=0, help="Random seed")
+@click.option("--logs-latency-ms", type=float, default=0.0, help="Log Analytics latency")
+@click.option("--openai-latency-ms", type=float, default=0.0, help="Chat completion latency")
+@click.option("--jitter-ms", type=float, default=0.0, help="Extra random latency, up to")
+@click.option("--error-rate", type=float, default=0.0, help="Fraction of throttled responses")
+@click.option("--max-rows", type=int, default=None, help="Rows before partial results")
+def main(
+    host: str,
+    port: int,
+    dataset: Optional[Path],
+    activations: int,
+    activities: int,
+    seed: int,
+    logs_latency_ms: float,
+    openai_latency_ms: float,
+    jitter_ms: float,
+    error_rate: float,
+    max_rows: Optional[int],
+) -> None:
+    """Run the stand-in server until interrupted."""
+    logging.basicConfig(level=logging.INFO)
+    if dataset is not None:
+        from benchmarks.datagen import load_dataset
+
+        records = load_dataset(dataset)
+        now: Optional[datetime] = records.latest_time()
+    else:
+        records = StandinDataset.synthetic(activations, activities, seed=seed)
+        now = None
+    server = StandinServer(
+        dataset=records,
+        host=host,
+        port=port,
+        logs_faults=FaultProfile(logs_latency_ms, jitter_ms, error_rate),
+        openai_faults=FaultProfile(openai_latency_ms, jitter_ms, error_rate),
+        max_rows=max_rows,
+        seed=seed,
+        now=now,
+    )
+    click.echo(f"Log Analytics endpoint: {server.url}/v1  (workspace {WORKSPACE_ID})")
+    click.echo(f"Azure OpenAI endpoint: {server.url}  (deployment {DEPLOYMENT})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        click.echo(json.dumps(server.stats.as_dict()))
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
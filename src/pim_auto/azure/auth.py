@@ -1,8 +1,14 @@
 """Azure authentication management."""
 
 from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
 
 
 def get_azure_credential() -> DefaultAzureCredential:
     """Get Azure credential using DefaultAzureCredential chain."""
     return DefaultAzureCredential()
+
+
+def get_async_azure_credential() -> AsyncDefaultAzureCredential:
+    """Get async Azure credential for use with aio clients."""
+    return AsyncDefaultAzureCredential()
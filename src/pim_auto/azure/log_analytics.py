@@ -1,67 +1,686 @@
 """Azure Log Analytics client wrapper."""
 
+import asyncio
+import contextvars
+import itertools
 import logging
-from datetime import timedelta
-from typing import Any, Dict, List, Optional, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from types import TracebackType
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
 
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
 from azure.identity import DefaultAzureCredential
 from azure.monitor.query import LogsQueryClient, LogsQueryStatus
+from azure.monitor.query.aio import LogsQueryClient as AsyncLogsQueryClient
+
+from pim_auto.azure.rate_limiter import RetryPolicy, retry_after_seconds
+from pim_auto.monitoring.tracing import current_span, increment_span_attribute
 
 logger = logging.getLogger(__name__)
 
+# A duration ("PT24H", "P1D" or timedelta) ending now, or explicit (start, end) bounds
+Timespan = Union[str, timedelta, Tuple[datetime, datetime], Tuple[datetime, timedelta]]
+
+# HTTP statuses Log Analytics uses for throttling and transient failures
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Partial-error markers for result-size and execution-time limits
+LIMIT_ERROR_MARKERS = ("too_large", "too large", "exceeded", "limit", "timeout", "timed out")
+
+# How many times a partial query's timespan may be halved
+MAX_SPLIT_DEPTH = 4
+
+# Chunked queries aim for at most this many rows per chunk, well below the
+# 500,000-row result limit, and never shrink chunks below MIN_CHUNK_DURATION
+DEFAULT_TARGET_CHUNK_ROWS = 50_000
+DEFAULT_CHUNK_WORKERS = 4
+MIN_CHUNK_DURATION = timedelta(minutes=15)
+
+
+def _resolve_timespan(
+    timespan: Optional[Timespan],
+) -> Union[timedelta, Tuple[datetime, datetime], Tuple[datetime, timedelta]]:
+    """Convert a query timespan argument to what query_workspace accepts."""
+    if isinstance(timespan, tuple):
+        return timespan
+
+    if timespan is None:
+        # Default to 24 hours if no timespan provided
+        return timedelta(hours=24)
+
+    if isinstance(timespan, str):
+        # Parse ISO 8601 duration format (e.g., "P1D" = 1 day, "PT24H" = 24 hours)
+        if timespan.startswith("PT") and timespan.endswith("H"):
+            hours = int(timespan[2:-1])
+            return timedelta(hours=hours)
+        elif timespan.startswith("P") and timespan.endswith("D"):
+            days = int(timespan[1:-1])
+            return timedelta(days=days)
+        else:
+            return timedelta(days=1)  # Default
+
+    return timespan
+
+
+def _timespan_bounds(timespan: Optional[Timespan]) -> Tuple[datetime, datetime]:
+    """Get explicit (start, end) bounds for a query timespan."""
+    resolved = _resolve_timespan(timespan)
+    if isinstance(resolved, tuple):
+        start, end_or_duration = resolved
+        if isinstance(end_or_duration, timedelta):
+            return start, start + end_or_duration
+        return start, end_or_duration
+    end = datetime.now(timezone.utc)
+    return end - resolved, end
+
+
+def _is_limit_error(error: Any) -> bool:
+    """Check whether a partial-result error was caused by size or time limits."""
+    if error is None:
+        return False
+    text = " ".join(
+        str(part) for part in (error.code, error.message, getattr(error, "details", None))
+    ).lower()
+    return any(marker in text for marker in LIMIT_ERROR_MARKERS)
+
+
+def _query_options(
+    additional_workspace_ids: Sequence[str], endpoint: Optional[str]
+) -> Dict[str, Any]:
+    """Build the extra query_workspace options for a client's settings."""
+    options: Dict[str, Any] = {}
+    if additional_workspace_ids:
+        options["additional_workspaces"] = list(additional_workspace_ids)
+    if endpoint is not None and endpoint.startswith("http://"):
+        # Plain HTTP is only meant for local stand-ins; the SDK refuses to
+        # send bearer tokens over it unless told otherwise
+        options["enforce_https"] = False
+    return options
+
+
+def _client_options(retry_policy: Optional[RetryPolicy], endpoint: Optional[str]) -> Dict[str, Any]:
+    """Build the LogsQueryClient options for a client's settings."""
+    options: Dict[str, Any] = {}
+    if retry_policy is not None:
+        options["retry_total"] = 0
+    if endpoint is not None:
+        options["endpoint"] = endpoint
+    return options
+
+
+def _retry_delay(
+    error: Exception, attempt: int, retry_policy: Optional[RetryPolicy]
+) -> Optional[float]:
+    """Return the backoff before retrying a failed query, or None to raise."""
+    if retry_policy is None or attempt >= retry_policy.max_retries:
+        return None
+    if isinstance(error, HttpResponseError):
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+    elif not isinstance(error, ServiceRequestError):
+        return None
+    response = getattr(error, "response", None)
+    return retry_policy.backoff(attempt, retry_after_seconds(getattr(response, "headers", None)))
+
+
+def _response_tables(response: Any) -> Tuple[List[Any], Optional[Any]]:
+    """
+    Return the tables of a response and its partial error, if any.
+
+    Partial results keep the rows that were returned, together with the error
+    explaining why the rest is missing.
+    """
+    if response.status == LogsQueryStatus.SUCCESS:
+        return list(response.tables), None
+    if response.status == LogsQueryStatus.PARTIAL:
+        logger.warning(f"Query returned partial results: {response.partial_error}")
+        return list(response.partial_data), response.partial_error
+    logger.error(f"Query failed with status: {response.status}")
+    return [], None
+
+
+class QueryRows(List[Dict[str, Any]]):
+    """
+    Row dictionaries of a Log Analytics query, as returned by execute_query.
+
+    A plain list of rows that also carries the ``partial_error`` when only
+    part of the data was returned.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = (), partial_error: Optional[Any] = None):
+        super().__init__(rows)
+        # LogsQueryError when only part of the data was returned
+        self.partial_error = partial_error
+
+
+class QueryResult:
+    """
+    Column-oriented result of a Log Analytics query.
+
+    Column names are stored once and rows are kept as tuples, avoiding a
+    per-row dictionary with repeated keys.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        rows: List[Tuple[Any, ...]],
+        partial_error: Optional[Any] = None,
+    ):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.rows = rows
+        # LogsQueryError when only part of the data was returned
+        self.partial_error = partial_error
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    def column_index(self, name: str) -> Optional[int]:
+        """Return the position of a column, or None if it is not present."""
+        return self._index.get(name)
+
+    def column(self, name: str) -> List[Any]:
+        """Return all values of one column."""
+        index = self._index[name]
+        return [row[index] for row in self.rows]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert to the row-dictionary format returned by execute_query."""
+        return [dict(zip(self.columns, row, strict=False)) for row in self.rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return iter(self.rows)
+
+
+class QueryRowStream:
+    """
+    Lazily converted rows of a Log Analytics query.
+
+    Like QueryResult, but rows are produced as tuples one at a time while
+    iterating, so no result list is built.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        rows: Iterable[Tuple[Any, ...]],
+        partial_error: Optional[Any] = None,
+    ):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._rows = rows
+        # LogsQueryError when only part of the data was returned
+        self.partial_error = partial_error
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    def column_index(self, name: str) -> Optional[int]:
+        """Return the position of a column, or None if it is not present."""
+        return self._index.get(name)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        return iter(self._rows)
+
+
+def _primary_tables(responses: Sequence[Any]) -> Tuple[Tuple[str, ...], List[Any], Optional[Any]]:
+    """
+    Collect the tables sharing the primary table's schema across responses.
+
+    Returns:
+        Tuple of (column names, matching tables, first partial error)
+    """
+    all_tables: List[Any] = []
+    partial_error = None
+    for response in responses:
+        tables, error = _response_tables(response)
+        all_tables.extend(tables)
+        partial_error = partial_error or error
+
+    if not all_tables:
+        return (), [], partial_error
+    columns = tuple(str(col) for col in all_tables[0].columns)
+    tables = [t for t in all_tables if tuple(str(col) for col in t.columns) == columns]
+    if len(tables) < len(all_tables):
+        logger.debug(f"Ignoring {len(all_tables) - len(tables)} non-primary result tables")
+    return columns, tables, partial_error
+
+
+def _response_to_columnar(responses: Sequence[Any]) -> QueryResult:
+    """Convert Log Analytics query responses to a QueryResult."""
+    columns, tables, partial_error = _primary_tables(responses)
+    rows = [tuple(row) for table in tables for row in table.rows]
+    logger.debug(f"Query returned {len(rows)} rows")
+    return QueryResult(columns, rows, partial_error)
+
+
+def _response_to_stream(responses: Sequence[Any]) -> QueryRowStream:
+    """Convert Log Analytics query responses to a QueryRowStream."""
+    columns, tables, partial_error = _primary_tables(responses)
+    return QueryRowStream(
+        columns, (tuple(row) for table in tables for row in table.rows), partial_error
+    )
+
+
+def _response_to_rows(responses: Sequence[Any]) -> QueryRows:
+    """Convert Log Analytics query responses to a list of row dictionaries."""
+    results = QueryRows()
+    for response in responses:
+        tables, error = _response_tables(response)
+        results.partial_error = results.partial_error or error
+        for table in tables:
+            column_names = [str(col) for col in table.columns]
+            for row in table.rows:
+                row_dict = dict(zip(column_names, row, strict=False))
+                results.append(row_dict)
+    logger.debug(f"Query returned {len(results)} rows")
+    return results
+
+
+def _split_timespan(
+    timespan: Optional[Timespan],
+) -> Tuple[Tuple[datetime, datetime], Tuple[datetime, datetime]]:
+    """Split a timespan into two halves with explicit bounds."""
+    start, end = _timespan_bounds(timespan)
+    middle = start + (end - start) / 2
+    return (start, middle), (middle, end)
+
+
+def _row_count(responses: Sequence[Any]) -> int:
+    """Count the rows returned by query responses."""
+    count = 0
+    for response in responses:
+        if response.status == LogsQueryStatus.SUCCESS:
+            tables = response.tables
+        elif response.status == LogsQueryStatus.PARTIAL:
+            tables = response.partial_data
+        else:
+            continue
+        count += sum(len(table.rows) for table in tables)
+    return count
+
+
+def _next_chunk_size(
+    rows: int,
+    covered: timedelta,
+    target_rows: int,
+    maximum: timedelta,
+) -> timedelta:
+    """
+    Pick the chunk duration for the next round of a chunked query.
+
+    The row rate observed over the covered time is extrapolated so the next
+    chunks return about ``target_rows`` rows each.
+
+    Args:
+        rows: Rows returned in the last round
+        covered: Time covered by the last round
+        target_rows: Desired rows per chunk
+        maximum: Largest allowed chunk duration
+
+    Returns:
+        Next chunk duration, between MIN_CHUNK_DURATION and ``maximum``
+    """
+    if rows == 0 or covered <= timedelta(0):
+        return maximum
+    proposed = covered * (target_rows / rows)
+    return max(min(proposed, maximum), min(MIN_CHUNK_DURATION, maximum))
+
+
+def _needs_split(response: Any, split_on_limit: bool, depth: int) -> bool:
+    """Check whether a partial response should be re-run as two halves."""
+    return (
+        split_on_limit
+        and depth < MAX_SPLIT_DEPTH
+        and response.status == LogsQueryStatus.PARTIAL
+        and _is_limit_error(response.partial_error)
+    )
+
 
 class LogAnalyticsClient:
-    """Wrapper for Azure Log Analytics queries."""
+    """
+    Wrapper for Azure Log Analytics queries.
+
+    Partial results are returned with the rows that were received, and every
+    result type carries the ``partial_error``. With
+    ``split_on_limit``, a query that hit a result-size or execution-time
+    limit is re-run over the two halves of its timespan, recursively, so
+    row-level queries still return complete data. Only use it for queries
+    whose results do not aggregate across the timespan.
 
-    def __init__(self, workspace_id: str, credential: DefaultAzureCredential):
+    With a ``chunk_size`` configured, ``chunked`` queries over longer windows
+    are run as consecutive sub-windows, several at a time, and the results
+    are concatenated in window order. The chunk duration adapts to the row
+    counts returned so far, shrinking for busy periods to stay well below the
+    result limits. The same restriction as for ``split_on_limit`` applies.
+
+    With ``additional_workspace_ids``, every query runs across the primary
+    and the additional workspaces in a single request, and the rows of all
+    workspaces come back as one result.
+
+    With ``max_concurrent_queries``, at most that many requests are in flight
+    across all callers of the client, including the sub-window queries of
+    chunked queries issued from several threads at once.
+    """
+
+    def __init__(
+        self,
+        workspace_id: str,
+        credential: DefaultAzureCredential,
+        retry_policy: Optional[RetryPolicy] = None,
+        chunk_size: Optional[timedelta] = None,
+        max_chunk_workers: int = DEFAULT_CHUNK_WORKERS,
+        target_chunk_rows: int = DEFAULT_TARGET_CHUNK_ROWS,
+        additional_workspace_ids: Optional[Sequence[str]] = None,
+        endpoint: Optional[str] = None,
+        max_concurrent_queries: Optional[int] = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            workspace_id: Log Analytics workspace ID
+            credential: Azure credential
+            retry_policy: Optional backoff policy for throttled (429/503) and
+                transient failures; replaces the SDK's built-in retries when set
+            chunk_size: Largest sub-window of a chunked query (None disables chunking)
+            max_chunk_workers: Sub-window queries run concurrently
+            target_chunk_rows: Rows per sub-window the adaptive chunk size aims for
+            additional_workspace_ids: Further workspaces every query also covers;
+                the service runs the query across all of them in one request
+            endpoint: Log Analytics API endpoint (default: public cloud), e.g. a
+                sovereign cloud or a local stand-in server
+            max_concurrent_queries: Requests in flight at once across all
+                callers and chunk workers (None for no limit)
+        """
         self.workspace_id = workspace_id
-        self.client = LogsQueryClient(credential)
+        self.additional_workspace_ids = list(additional_workspace_ids or [])
+        self.retry_policy = retry_policy
+        self.chunk_size = chunk_size
+        self.max_chunk_workers = max_chunk_workers
+        self.target_chunk_rows = target_chunk_rows
+        self._query_slots = (
+            threading.BoundedSemaphore(max_concurrent_queries)
+            if max_concurrent_queries is not None
+            else None
+        )
+        self._query_options = _query_options(self.additional_workspace_ids, endpoint)
+        self.client = LogsQueryClient(credential, **_client_options(retry_policy, endpoint))
 
     def execute_query(
-        self, query: str, timespan: Optional[Union[str, timedelta]] = None
-    ) -> List[Dict[str, Any]]:
+        self,
+        query: str,
+        timespan: Optional[Timespan] = None,
+        split_on_limit: bool = False,
+        chunked: bool = False,
+    ) -> QueryRows:
         """Execute KQL query and return results."""
-        try:
-            # Convert string timespan to timedelta if needed
-            actual_timespan: timedelta
-            if timespan is not None:
-                if isinstance(timespan, str):
-                    # Parse ISO 8601 duration format (e.g., "P1D" = 1 day, "PT24H" = 24 hours)
-                    if timespan.startswith("PT") and timespan.endswith("H"):
-                        hours = int(timespan[2:-1])
-                        actual_timespan = timedelta(hours=hours)
-                    elif timespan.startswith("P") and timespan.endswith("D"):
-                        days = int(timespan[1:-1])
-                        actual_timespan = timedelta(days=days)
-                    else:
-                        actual_timespan = timedelta(days=1)  # Default
-                else:
-                    actual_timespan = timespan
-            else:
-                # Default to 24 hours if no timespan provided
-                actual_timespan = timedelta(hours=24)
-
-            # Log query at DEBUG level
-            logger.debug(f"Executing Log Analytics query:\n{query}")
-            logger.debug(f"Timespan: {actual_timespan}")
-
-            response = self.client.query_workspace(
-                workspace_id=self.workspace_id, query=query, timespan=actual_timespan
+        return _response_to_rows(self._run(query, timespan, split_on_limit, chunked))
+
+    def execute_query_columnar(
+        self,
+        query: str,
+        timespan: Optional[Timespan] = None,
+        split_on_limit: bool = False,
+        chunked: bool = False,
+    ) -> QueryResult:
+        """Execute KQL query and return a column-oriented result."""
+        return _response_to_columnar(self._run(query, timespan, split_on_limit, chunked))
+
+    def stream_query(
+        self,
+        query: str,
+        timespan: Optional[Timespan] = None,
+        split_on_limit: bool = False,
+        chunked: bool = False,
+    ) -> QueryRowStream:
+        """Execute KQL query and return rows lazily as tuples."""
+        return _response_to_stream(self._run(query, timespan, split_on_limit, chunked))
+
+    def _run(
+        self, query: str, timespan: Optional[Timespan], split_on_limit: bool, chunked: bool
+    ) -> List[Any]:
+        """Run a query, in chunks when requested and the window is long enough."""
+        responses: Optional[List[Any]] = None
+        if chunked and self.chunk_size is not None:
+            start, end = _timespan_bounds(timespan)
+            if end - start > self.chunk_size:
+                responses = self._query_chunked(query, start, end, self.chunk_size, split_on_limit)
+        if responses is None:
+            responses = self._query_all(query, timespan, split_on_limit)
+
+        span = current_span()
+        if span is not None:
+            span.increment("rows", _row_count(responses))
+            span.increment("responses", len(responses))
+        return responses
+
+    def _query_chunked(
+        self,
+        query: str,
+        start: datetime,
+        end: datetime,
+        max_chunk_size: timedelta,
+        split_on_limit: bool,
+    ) -> List[Any]:
+        """
+        Run a query over consecutive sub-windows of ``start .. end``.
+
+        Sub-windows are queried in rounds of ``max_chunk_workers`` concurrent
+        queries; the row rate seen in each round sets the chunk duration for
+        the next one.
+
+        Returns:
+            Responses of all sub-windows, in time order
+        """
+        chunk_size = max_chunk_size
+        responses: List[Any] = []
+        chunks = 0
+        cursor = start
+        with ThreadPoolExecutor(max_workers=self.max_chunk_workers) as executor:
+            while cursor < end:
+                windows: List[Tuple[datetime, datetime]] = []
+                while cursor < end and len(windows) < self.max_chunk_workers:
+                    window_end = min(cursor + chunk_size, end)
+                    windows.append((cursor, window_end))
+                    cursor = window_end
+
+                # Each sub-window runs in a copy of this context to stay in its trace
+                contexts = [contextvars.copy_context() for _ in windows]
+                results = list(
+                    executor.map(
+                        lambda context, window: context.run(
+                            self._query_all, query, window, split_on_limit
+                        ),
+                        contexts,
+                        windows,
+                    )
+                )
+                round_responses = [response for result in results for response in result]
+                responses.extend(round_responses)
+                chunks += len(windows)
+
+                chunk_size = _next_chunk_size(
+                    _row_count(round_responses),
+                    windows[-1][1] - windows[0][0],
+                    self.target_chunk_rows,
+                    max_chunk_size,
+                )
+
+        logger.info(
+            f"Chunked query over {start.isoformat()} .. {end.isoformat()} "
+            f"ran as {chunks} sub-windows"
+        )
+        return responses
+
+    def _query_all(
+        self, query: str, timespan: Optional[Timespan], split_on_limit: bool, depth: int = 0
+    ) -> List[Any]:
+        """Run a query, splitting its timespan while it hits result limits."""
+        response = self._query(query, timespan)
+        if not _needs_split(response, split_on_limit, depth):
+            return [response]
+
+        first, second = _split_timespan(timespan)
+        logger.warning(
+            f"Query hit a result limit; splitting {first[0].isoformat()} .. "
+            f"{second[1].isoformat()} into two halves"
+        )
+        return [
+            *self._query_all(query, first, split_on_limit, depth + 1),
+            *self._query_all(query, second, split_on_limit, depth + 1),
+        ]
+
+    def _query(self, query: str, timespan: Optional[Timespan]) -> Any:
+        """Run a query against the workspace and return the raw response."""
+        actual_timespan = _resolve_timespan(timespan)
+
+        # Log query at DEBUG level
+        logger.debug(f"Executing Log Analytics query:\n{query}")
+        logger.debug(f"Timespan: {actual_timespan}")
+
+        attempt = 0
+        while True:
+            try:
+                return self._query_workspace(query, actual_timespan)
+
+            except Exception as e:
+                delay = _retry_delay(e, attempt, self.retry_policy)
+                if delay is None or self.retry_policy is None:
+                    logger.error(f"Log Analytics query error: {e}")
+                    raise
+                attempt += 1
+                increment_span_attribute("retries")
+                logger.warning(
+                    f"Log Analytics query failed ({e}); retry {attempt}/"
+                    f"{self.retry_policy.max_retries} in {delay:.1f}s"
+                )
+                self.retry_policy.sleep(delay)
+
+    def _query_workspace(self, query: str, timespan: Any) -> Any:
+        """Send one request, holding a query slot (not during retry backoff)."""
+        with self._query_slots or nullcontext():
+            return self.client.query_workspace(
+                workspace_id=self.workspace_id,
+                query=query,
+                timespan=timespan,
+                **self._query_options,
             )
 
-            if response.status == LogsQueryStatus.SUCCESS:
-                results = []
-                for table in response.tables:
-                    column_names = [str(col) for col in table.columns]
-                    for row in table.rows:
-                        row_dict = dict(zip(column_names, row, strict=False))
-                        results.append(row_dict)
-                logger.debug(f"Query returned {len(results)} rows")
-                return results
-            else:
-                logger.error(f"Query failed with status: {response.status}")
-                return []
-
-        except Exception as e:
-            logger.error(f"Log Analytics query error: {e}")
-            raise
+
+class AsyncLogAnalyticsClient:
+    """
+    Async wrapper for Azure Log Analytics queries.
+
+    Built on the aio ``LogsQueryClient``, which keeps a single HTTP session
+    for its lifetime so overlapping queries reuse the same connection pool.
+    Retries, partial results and additional workspaces are handled like in
+    ``LogAnalyticsClient``.
+    Use it as an async context manager, or call ``close()`` when done. The
+    credential is usually shared with other clients, so it is closed too only
+    when created for this client (``owns_credential``).
+    """
+
+    def __init__(
+        self,
+        workspace_id: str,
+        credential: AsyncTokenCredential,
+        retry_policy: Optional[RetryPolicy] = None,
+        additional_workspace_ids: Optional[Sequence[str]] = None,
+        endpoint: Optional[str] = None,
+        owns_credential: bool = False,
+    ):
+        self.workspace_id = workspace_id
+        self.additional_workspace_ids = list(additional_workspace_ids or [])
+        self.retry_policy = retry_policy
+        self.credential = credential
+        self.owns_credential = owns_credential
+        self._query_options = _query_options(self.additional_workspace_ids, endpoint)
+        self.client = AsyncLogsQueryClient(credential, **_client_options(retry_policy, endpoint))
+
+    async def execute_query(
+        self, query: str, timespan: Optional[Timespan] = None, split_on_limit: bool = False
+    ) -> QueryRows:
+        """Execute KQL query and return results."""
+        return _response_to_rows(await self._query_all(query, timespan, split_on_limit))
+
+    async def execute_query_columnar(
+        self, query: str, timespan: Optional[Timespan] = None, split_on_limit: bool = False
+    ) -> QueryResult:
+        """Execute KQL query and return a column-oriented result."""
+        return _response_to_columnar(await self._query_all(query, timespan, split_on_limit))
+
+    async def stream_query(
+        self, query: str, timespan: Optional[Timespan] = None, split_on_limit: bool = False
+    ) -> QueryRowStream:
+        """Execute KQL query and return rows lazily as tuples."""
+        return _response_to_stream(await self._query_all(query, timespan, split_on_limit))
+
+    async def _query_all(
+        self, query: str, timespan: Optional[Timespan], split_on_limit: bool, depth: int = 0
+    ) -> List[Any]:
+        """Run a query, splitting its timespan while it hits result limits."""
+        response = await self._query(query, timespan)
+        if not _needs_split(response, split_on_limit, depth):
+            return [response]
+
+        first, second = _split_timespan(timespan)
+        logger.warning(
+            f"Query hit a result limit; splitting {first[0].isoformat()} .. "
+            f"{second[1].isoformat()} into two halves"
+        )
+        halves = await asyncio.gather(
+            self._query_all(query, first, split_on_limit, depth + 1),
+            self._query_all(query, second, split_on_limit, depth + 1),
+        )
+        return list(itertools.chain.from_iterable(halves))
+
+    async def _query(self, query: str, timespan: Optional[Timespan]) -> Any:
+        """Run a query against the workspace and return the raw response."""
+        actual_timespan = _resolve_timespan(timespan)
+
+        logger.debug(f"Executing Log Analytics query:\n{query}")
+        logger.debug(f"Timespan: {actual_timespan}")
+
+        attempt = 0
+        while True:
+            try:
+                return await self.client.query_workspace(
+                    workspace_id=self.workspace_id,
+                    query=query,
+                    timespan=actual_timespan,
+                    **self._query_options,
+                )
+
+            except Exception as e:
+                delay = _retry_delay(e, attempt, self.retry_policy)
+                if delay is None or self.retry_policy is None:
+                    logger.error(f"Log Analytics query error: {e}")
+                    raise
+                attempt += 1
+                increment_span_attribute("retries")
+                logger.warning(
+                    f"Log Analytics query failed ({e}); retry {attempt}/"
+                    f"{self.retry_policy.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session, and the credential if this client owns it."""
+        await self.client.close()
+        if self.owns_credential:
+            await self.credential.close()
+
+    async def __aenter__(self) -> "AsyncLogAnalyticsClient":
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close()
@@ -1,14 +1,87 @@
 """Azure OpenAI client wrapper."""
 
+import asyncio
 import logging
-from typing import Any, Dict, List
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Type
 
+import httpx
+from azure.core.credentials_async import AsyncTokenCredential
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from openai import AzureOpenAI
+from azure.identity.aio import get_bearer_token_provider as get_async_bearer_token_provider
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncAzureOpenAI,
+    AzureOpenAI,
+    DefaultAsyncHttpxClient,
+)
 from openai.types.chat import ChatCompletionMessageParam
 
+from pim_auto.azure.rate_limiter import (
+    RateLimiter,
+    RetryPolicy,
+    estimate_request_tokens,
+    retry_after_seconds,
+)
+from pim_auto.monitoring.timing import record_openai_usage
+from pim_auto.monitoring.tracing import increment_span_attribute
+
 logger = logging.getLogger(__name__)
 
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+# Status codes worth retrying: timeouts, conflicts, throttling and server errors
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+def _to_typed_messages(messages: List[Dict[str, Any]]) -> List[ChatCompletionMessageParam]:
+    """Convert plain message dictionaries to the OpenAI message type."""
+    typed_messages: List[ChatCompletionMessageParam] = []
+    for msg in messages:
+        typed_messages.append(msg)  # type: ignore[arg-type]
+    return typed_messages
+
+
+def _completion_content(response: Any) -> str:
+    """Report a completion's token usage to the active timer and return its content."""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if isinstance(prompt_tokens, int) and isinstance(completion_tokens, int):
+        record_openai_usage(prompt_tokens, completion_tokens)
+    return response.choices[0].message.content or ""
+
+
+def _retry_delay(
+    error: Exception,
+    attempt: int,
+    retry_policy: Optional[RetryPolicy],
+    rate_limiter: Optional[RateLimiter],
+) -> Optional[float]:
+    """
+    Decide whether a failed request should be retried.
+
+    A ``retry-after`` from the service also pauses the shared rate limiter, so
+    other queued requests hold off instead of being throttled in turn.
+
+    Returns:
+        Delay before the retry in seconds, or None if the error should be raised
+    """
+    if retry_policy is None or attempt >= retry_policy.max_retries:
+        return None
+    if isinstance(error, APIStatusError):
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return None
+    elif not isinstance(error, APIConnectionError):
+        return None
+
+    response = getattr(error, "response", None)
+    retry_after = retry_after_seconds(getattr(response, "headers", None))
+    if retry_after is not None and rate_limiter is not None:
+        rate_limiter.pause(retry_after)
+    return retry_policy.backoff(attempt, retry_after)
+
 
 class OpenAIClient:
     """Wrapper for Azure OpenAI API."""
@@ -19,39 +92,200 @@ class OpenAIClient:
         deployment: str,
         api_version: str,
         credential: DefaultAzureCredential,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
-        token_provider = get_bearer_token_provider(
-            credential, "https://cognitiveservices.azure.com/.default"
-        )
+        """
+        Initialize the client.
+
+        Args:
+            endpoint: Azure OpenAI endpoint
+            deployment: Deployment name
+            api_version: API version
+            credential: Azure credential
+            rate_limiter: Optional client-side RPM/TPM limiter; requests wait
+                for quota instead of being throttled
+            retry_policy: Optional backoff policy for 429s and transient errors;
+                replaces the SDK's built-in retries when set
+        """
+        token_provider = get_bearer_token_provider(credential, COGNITIVE_SERVICES_SCOPE)
 
+        sdk_options: Dict[str, Any] = {}
+        if retry_policy is not None:
+            sdk_options["max_retries"] = 0
         self.client = AzureOpenAI(
             azure_endpoint=endpoint,
             azure_ad_token_provider=token_provider,
             api_version=api_version,
+            **sdk_options,
         )
         self.deployment = deployment
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
 
     def generate_completion(
         self,
         messages: List[Dict[str, Any]],
         temperature: float = 0.7,
         max_tokens: int = 2000,
+        response_format: Optional[Dict[str, Any]] = None,
     ) -> str:
-        """Generate chat completion."""
-        try:
-            # Convert to proper message format
-            typed_messages: List[ChatCompletionMessageParam] = []
-            for msg in messages:
-                typed_messages.append(msg)  # type: ignore[arg-type]
-
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=typed_messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
+        """
+        Generate chat completion.
+
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Maximum number of output tokens
+            response_format: Optional ``response_format`` for structured output,
+                e.g. ``{"type": "json_object"}`` or a ``json_schema`` format
+
+        Returns:
+            Content of the first choice
+        """
+        extra: Dict[str, Any] = {}
+        if response_format is not None:
+            extra["response_format"] = response_format
+        estimated_tokens = estimate_request_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimated_tokens)
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=_to_typed_messages(messages),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **extra,
+                )
+                return _completion_content(response)
+
+            except Exception as e:
+                delay = _retry_delay(e, attempt, self.retry_policy, self.rate_limiter)
+                if delay is None or self.retry_policy is None:
+                    logger.error(f"OpenAI API error: {e}")
+                    raise
+                attempt += 1
+                increment_span_attribute("retries")
+                logger.warning(
+                    f"OpenAI request failed ({e}); retry {attempt}/"
+                    f"{self.retry_policy.max_retries} in {delay:.1f}s"
+                )
+                self.retry_policy.sleep(delay)
+
+
+class AsyncOpenAIClient:
+    """
+    Async wrapper for Azure OpenAI API.
+
+    All requests share one HTTP connection pool of ``max_connections`` and
+    at most ``max_concurrent_requests`` completions are in flight at once,
+    however many coroutines call ``generate_completion`` concurrently. Use it
+    as an async context manager, or call ``close()`` when done.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        deployment: str,
+        api_version: str,
+        credential: AsyncTokenCredential,
+        max_connections: int = 20,
+        max_concurrent_requests: int = 8,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1")
+
+        token_provider = get_async_bearer_token_provider(credential, COGNITIVE_SERVICES_SCOPE)
+
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
             )
-            return response.choices[0].message.content or ""
+        )
+        sdk_options: Dict[str, Any] = {}
+        if retry_policy is not None:
+            sdk_options["max_retries"] = 0
+        self.client = AsyncAzureOpenAI(
+            azure_endpoint=endpoint,
+            azure_ad_token_provider=token_provider,
+            api_version=api_version,
+            http_client=self.http_client,
+            **sdk_options,
+        )
+        self.deployment = deployment
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.max_concurrent_requests = max_concurrent_requests
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
 
-        except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise
+    async def generate_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Generate chat completion.
+
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Maximum number of output tokens
+            response_format: Optional ``response_format`` for structured output,
+                e.g. ``{"type": "json_object"}`` or a ``json_schema`` format
+
+        Returns:
+            Content of the first choice
+        """
+        extra: Dict[str, Any] = {}
+        if response_format is not None:
+            extra["response_format"] = response_format
+        estimated_tokens = estimate_request_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(estimated_tokens)
+            try:
+                async with self._semaphore:
+                    response = await self.client.chat.completions.create(
+                        model=self.deployment,
+                        messages=_to_typed_messages(messages),
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **extra,
+                    )
+                return _completion_content(response)
+
+            except Exception as e:
+                delay = _retry_delay(e, attempt, self.retry_policy, self.rate_limiter)
+                if delay is None or self.retry_policy is None:
+                    logger.error(f"OpenAI API error: {e}")
+                    raise
+                attempt += 1
+                increment_span_attribute("retries")
+                logger.warning(
+                    f"OpenAI request failed ({e}); retry {attempt}/"
+                    f"{self.retry_policy.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        """Close the shared HTTP connection pool."""
+        await self.client.close()
+
+    async def __aenter__(self) -> "AsyncOpenAIClient":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close()
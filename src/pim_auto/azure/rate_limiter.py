@@ -0,0 +1,297 @@
+"""Client-side rate limiting and retry scheduling for Azure service requests."""
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used to estimate prompt size before sending
+CHARS_PER_TOKEN = 4
+
+# Azure OpenAI enforces quota over short windows, so buckets only allow
+# this many seconds' worth of quota to be spent in a burst
+DEFAULT_BURST_SECONDS = 10.0
+
+
+def estimate_request_tokens(messages: List[Dict[str, Any]], max_tokens: int) -> int:
+    """
+    Estimate the tokens a chat request counts against a TPM quota.
+
+    Azure OpenAI counts the prompt plus the requested ``max_tokens`` when
+    admitting a request, so both are included.
+
+    Args:
+        messages: Chat messages
+        max_tokens: Requested output token limit
+
+    Returns:
+        Estimated token count
+    """
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return (prompt_chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN + max_tokens
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Read the server-requested retry delay from response headers.
+
+    Supports ``retry-after-ms`` and ``retry-after`` given either as seconds
+    or as an HTTP date.
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+
+    Returns:
+        Delay in seconds, or None when no usable header is present
+    """
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000.0, 0.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    Reservations are taken immediately and may drive the level negative; the
+    caller is told how long to wait before its reservation is covered. This
+    queues concurrent callers in arrival order without holding a lock while
+    they wait.
+
+    Args:
+        rate_per_minute: Sustained rate the bucket refills at
+        burst_seconds: Seconds of quota the bucket holds when full
+        clock: Monotonic clock, in seconds
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate_per_second * burst_seconds)
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the capacity accrued since the last update; caller holds the lock."""
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Reserve capacity, returning how long to wait before using it.
+
+        Args:
+            amount: Units to reserve; amounts above the capacity are charged in
+                full, and the wait covers the resulting debt
+
+        Returns:
+            Seconds to wait (0 when capacity is available now)
+        """
+        with self._lock:
+            self._refill()
+            self._level -= amount
+            if self._level >= 0:
+                return 0.0
+            return -self._level / self.rate_per_second
+
+    def refund(self, amount: float) -> None:
+        """
+        Return a reservation that will not be used as reserved.
+
+        Args:
+            amount: Units to give back
+        """
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level + amount)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter for one deployment.
+
+    Args:
+        requests_per_minute: Deployment RPM quota (None for no limit)
+        tokens_per_minute: Deployment TPM quota (None for no limit)
+        burst_seconds: Seconds of quota that may be spent in a burst
+        clock: Monotonic clock, in seconds
+        sleep: Blocking sleep function
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute, burst_seconds, clock) if requests_per_minute else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, burst_seconds, clock) if tokens_per_minute else None
+        )
+        self._clock = clock
+        self._sleep = sleep
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, estimated_tokens: int) -> Tuple[float, bool]:
+        """
+        Reserve quota for one request.
+
+        When the TPM quota holds the request back longer than the RPM quota,
+        its request slot is given back so it does not hold back other requests
+        meanwhile; the caller takes it again with ``reserve_request`` once the
+        wait is over, so the request still counts against RPM when it is sent.
+
+        Args:
+            estimated_tokens: Estimated tokens the request will count
+
+        Returns:
+            Tuple of (seconds to wait, whether the request slot must be
+            reserved again after waiting)
+        """
+        request_delay = self.requests.reserve(1) if self.requests is not None else 0.0
+        token_delay = self.tokens.reserve(estimated_tokens) if self.tokens is not None else 0.0
+        slot_deferred = self.requests is not None and token_delay > request_delay
+        if self.requests is not None and slot_deferred:
+            self.requests.refund(1)
+            request_delay = 0.0
+        return max(0.0, request_delay, token_delay, self._paused_delay()), slot_deferred
+
+    def reserve_request(self) -> float:
+        """
+        Reserve the request slot of a request whose token wait is over.
+
+        Returns:
+            Seconds to wait before sending the request
+        """
+        request_delay = self.requests.reserve(1) if self.requests is not None else 0.0
+        return max(0.0, request_delay, self._paused_delay())
+
+    def acquire(self, estimated_tokens: int) -> None:
+        """Block until quota for one request is available."""
+        delay, slot_deferred = self.reserve(estimated_tokens)
+        if slot_deferred:
+            self._wait(delay)
+            delay = self.reserve_request()
+        self._wait(delay)
+
+    async def acquire_async(self, estimated_tokens: int) -> None:
+        """Wait asynchronously until quota for one request is available."""
+        delay, slot_deferred = self.reserve(estimated_tokens)
+        if slot_deferred:
+            await self._wait_async(delay)
+            delay = self.reserve_request()
+        await self._wait_async(delay)
+
+    def _paused_delay(self) -> float:
+        """Seconds left of the current pause (negative when not paused)."""
+        with self._lock:
+            return self._paused_until - self._clock()
+
+    def _wait(self, delay: float) -> None:
+        """Sleep for a reservation's delay, if any."""
+        if delay > 0:
+            logger.debug(f"Rate limiter delaying request by {delay:.2f}s")
+            self._sleep(delay)
+
+    async def _wait_async(self, delay: float) -> None:
+        """Asynchronously sleep for a reservation's delay, if any."""
+        if delay > 0:
+            logger.debug(f"Rate limiter delaying request by {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold all new requests for a while, e.g. after a ``retry-after`` response.
+
+        Args:
+            seconds: Pause duration
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for throttled or transiently failing requests.
+
+    Args:
+        max_retries: Maximum number of retries after the first attempt
+        base_delay: Backoff delay before the first retry, in seconds
+        max_delay: Upper bound for a single backoff delay, in seconds
+        sleep: Blocking sleep function
+        random_fraction: Source of jitter in [0, 1)
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+        random_fraction: Callable[[], float] = random.random,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self._random = random_fraction
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before a retry.
+
+        A server-provided ``retry_after`` is honored, plus up to ``base_delay``
+        of jitter so waiting clients do not retry in lockstep. Otherwise the
+        delay is exponential in ``attempt`` with "equal jitter" (between half
+        and all of the exponential delay).
+
+        Args:
+            attempt: Zero-based retry number
+            retry_after: Server-requested delay in seconds, if any
+
+        Returns:
+            Delay in seconds
+        """
+        if retry_after is not None:
+            return retry_after + self._random() * self.base_delay
+        exponential = min(self.max_delay, self.base_delay * float(2**attempt))
+        return exponential / 2 + self._random() * exponential / 2
@@ -1,8 +1,30 @@
 """Configuration management for PIM Auto."""
 
 import os
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urlparse
+
+# Hosts allowed plain-http endpoints, e.g. a local stand-in server
+_LOCAL_HOSTS = ("localhost", "127.0.0.1")
+
+
+def is_secure_endpoint(endpoint: str) -> bool:
+    """Check whether an endpoint uses HTTPS, or plain HTTP on the local host."""
+    if endpoint.startswith("https://"):
+        return True
+    return endpoint.startswith("http://") and urlparse(endpoint).hostname in _LOCAL_HOSTS
+
+
+def _optional_int(name: str) -> Optional[int]:
+    """Read an optional integer environment variable."""
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _list_env(name: str) -> List[str]:
+    """Read a comma-separated environment variable as a list of values."""
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
 
 
 @dataclass
@@ -17,15 +39,58 @@ class Config:
     # Optional fields (with defaults)
     azure_openai_api_version: str = "2024-02-15-preview"
     log_analytics_region: Optional[str] = None
+    # Further workspaces (e.g. per region or landing zone) covered by every query
+    log_analytics_additional_workspace_ids: List[str] = field(default_factory=list)
+    # Log Analytics API endpoint (None uses the public cloud), e.g. a sovereign cloud
+    log_analytics_endpoint: Optional[str] = None
     default_scan_hours: int = 24
     log_level: str = "INFO"
     batch_output_path: Optional[str] = None
 
+    # Batch concurrency settings
+    log_analytics_max_concurrency: int = 1
+    log_analytics_max_retries: int = 5
+    openai_max_concurrency: int = 1
+
+    # Scan windows longer than this run as concurrent sub-window queries (None disables)
+    log_analytics_chunk_hours: Optional[int] = None
+    log_analytics_chunk_concurrency: int = 4
+
+    # Azure OpenAI deployment quota (client-side rate limiting when set) and retries
+    openai_requests_per_minute: Optional[int] = None
+    openai_tokens_per_minute: Optional[int] = None
+    openai_max_retries: int = 6
+
+    # Assessment cache settings
+    assessment_cache_path: Optional[str] = None
+    assessment_cache_ttl_hours: int = 24
+
+    # Approximate token budget for the activity list in risk assessment prompts
+    assessment_prompt_token_budget: int = 2000
+
+    # Skip the LLM for trivial activations using deterministic rules
+    assessment_fast_path: bool = False
+
+    # Pack up to this many small activations into one OpenAI request (1 disables)
+    assessment_batch_size: int = 1
+    assessment_batch_max_item_tokens: int = 300
+
+    # Verdict format: "text", "json_object" or "json_schema" (structured outputs)
+    assessment_response_format: str = "text"
+
+    # Incremental scan state (enables incremental batch scans when set)
+    scan_state_path: Optional[str] = None
+    scan_overlap_minutes: int = 30  # Re-scan behind the watermark for late-ingested records
+
     # Monitoring settings
     enable_app_insights: bool = True
     app_insights_connection_string: Optional[str] = None
     structured_logging: bool = False  # JSON format logging
 
+    # Trace export of batch runs: "file", "app_insights" or None (disabled)
+    trace_exporter: Optional[str] = None
+    trace_file_path: str = "pim-auto-traces.jsonl"
+
     @classmethod
     def from_environment(cls) -> "Config":
         """Load configuration from environment variables."""
@@ -45,21 +110,122 @@ class Config:
             log_analytics_workspace_id=os.getenv("LOG_ANALYTICS_WORKSPACE_ID", ""),
             azure_openai_api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
             log_analytics_region=os.getenv("LOG_ANALYTICS_REGION"),
+            log_analytics_additional_workspace_ids=_list_env(
+                "LOG_ANALYTICS_ADDITIONAL_WORKSPACE_IDS"
+            ),
+            log_analytics_endpoint=os.getenv("LOG_ANALYTICS_ENDPOINT") or None,
             default_scan_hours=int(os.getenv("DEFAULT_SCAN_HOURS", "24")),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             batch_output_path=os.getenv("BATCH_OUTPUT_PATH"),
+            log_analytics_max_concurrency=int(os.getenv("LOG_ANALYTICS_MAX_CONCURRENCY", "1")),
+            log_analytics_max_retries=int(os.getenv("LOG_ANALYTICS_MAX_RETRIES", "5")),
+            openai_max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "1")),
+            log_analytics_chunk_hours=_optional_int("LOG_ANALYTICS_CHUNK_HOURS"),
+            log_analytics_chunk_concurrency=int(os.getenv("LOG_ANALYTICS_CHUNK_CONCURRENCY", "4")),
+            openai_requests_per_minute=_optional_int("OPENAI_REQUESTS_PER_MINUTE"),
+            openai_tokens_per_minute=_optional_int("OPENAI_TOKENS_PER_MINUTE"),
+            openai_max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "6")),
+            assessment_cache_path=os.getenv("ASSESSMENT_CACHE_PATH"),
+            assessment_cache_ttl_hours=int(os.getenv("ASSESSMENT_CACHE_TTL_HOURS", "24")),
+            assessment_prompt_token_budget=int(os.getenv("ASSESSMENT_PROMPT_TOKEN_BUDGET", "2000")),
+            assessment_fast_path=os.getenv("ASSESSMENT_FAST_PATH", "false").lower() == "true",
+            assessment_batch_size=int(os.getenv("ASSESSMENT_BATCH_SIZE", "1")),
+            assessment_batch_max_item_tokens=int(
+                os.getenv("ASSESSMENT_BATCH_MAX_ITEM_TOKENS", "300")
+            ),
+            assessment_response_format=os.getenv("ASSESSMENT_RESPONSE_FORMAT", "text"),
+            scan_state_path=os.getenv("SCAN_STATE_PATH"),
+            scan_overlap_minutes=int(os.getenv("SCAN_OVERLAP_MINUTES", "30")),
             enable_app_insights=os.getenv("ENABLE_APP_INSIGHTS", "true").lower() == "true",
             app_insights_connection_string=os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING"),
             structured_logging=os.getenv("STRUCTURED_LOGGING", "false").lower() == "true",
+            trace_exporter=os.getenv("TRACE_EXPORTER") or None,
+            trace_file_path=os.getenv("TRACE_FILE_PATH", "pim-auto-traces.jsonl"),
         )
 
     def validate(self) -> None:
         """Validate configuration values."""
-        if not self.azure_openai_endpoint.startswith("https://"):
-            raise ValueError("Azure OpenAI endpoint must start with https://")
+        self._validate_endpoints()
 
         if self.default_scan_hours < 1 or self.default_scan_hours > 168:
             raise ValueError("Default scan hours must be between 1 and 168 (1 week)")
 
+        if self.log_analytics_workspace_id in self.log_analytics_additional_workspace_ids:
+            raise ValueError("Additional workspace IDs must not repeat the primary workspace")
+
+        if self.log_analytics_max_concurrency < 1 or self.log_analytics_max_concurrency > 32:
+            raise ValueError("Log Analytics max concurrency must be between 1 and 32")
+
+        if self.log_analytics_max_retries < 0:
+            raise ValueError("Log Analytics max retries must not be negative")
+
+        if self.log_analytics_chunk_hours is not None and self.log_analytics_chunk_hours < 1:
+            raise ValueError("Log Analytics chunk hours must be at least 1")
+
+        if self.log_analytics_chunk_concurrency < 1 or self.log_analytics_chunk_concurrency > 16:
+            raise ValueError("Log Analytics chunk concurrency must be between 1 and 16")
+
+        if self.scan_overlap_minutes < 0:
+            raise ValueError("Scan overlap minutes must not be negative")
+
+        self._validate_openai_limits()
+        self._validate_assessment_settings()
+        self._validate_tracing()
+
         if self.log_level not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
             raise ValueError(f"Invalid log level: {self.log_level}")
+
+    def _validate_endpoints(self) -> None:
+        """Validate service endpoints use HTTPS, except on the local host."""
+        for name, endpoint in (
+            ("Azure OpenAI", self.azure_openai_endpoint),
+            ("Log Analytics", self.log_analytics_endpoint),
+        ):
+            if endpoint is not None and not is_secure_endpoint(endpoint):
+                raise ValueError(
+                    f"{name} endpoint must start with https:// (http:// is allowed for localhost)"
+                )
+
+    def _validate_openai_limits(self) -> None:
+        """Validate Azure OpenAI concurrency, quota and retry settings."""
+        if self.openai_max_concurrency < 1 or self.openai_max_concurrency > 32:
+            raise ValueError("OpenAI max concurrency must be between 1 and 32")
+
+        for name, value in (
+            ("requests", self.openai_requests_per_minute),
+            ("tokens", self.openai_tokens_per_minute),
+        ):
+            if value is not None and value < 1:
+                raise ValueError(f"OpenAI {name} per minute must be at least 1")
+
+        if self.openai_max_retries < 0:
+            raise ValueError("OpenAI max retries must not be negative")
+
+    def _validate_assessment_settings(self) -> None:
+        """Validate risk assessment settings."""
+        if self.assessment_cache_ttl_hours < 1:
+            raise ValueError("Assessment cache TTL must be at least 1 hour")
+
+        if self.assessment_prompt_token_budget < 200:
+            raise ValueError("Assessment prompt token budget must be at least 200")
+
+        if self.assessment_batch_size < 1 or self.assessment_batch_size > 50:
+            raise ValueError("Assessment batch size must be between 1 and 50")
+
+        if self.assessment_batch_max_item_tokens < 1:
+            raise ValueError("Assessment batch max item tokens must be at least 1")
+
+        if self.assessment_response_format not in ["text", "json_object", "json_schema"]:
+            raise ValueError(
+                f"Invalid assessment response format: {self.assessment_response_format}"
+            )
+
+    def _validate_tracing(self) -> None:
+        """Validate trace export settings."""
+        if self.trace_exporter not in [None, "file", "app_insights"]:
+            raise ValueError(f"Invalid trace exporter: {self.trace_exporter}")
+
+        if self.trace_exporter == "app_insights" and not self.app_insights_connection_string:
+            raise ValueError(
+                "Trace export to Application Insights needs APPLICATIONINSIGHTS_CONNECTION_STRING"
+            )
@@ -1,14 +1,36 @@
 """Activity correlation module."""
 
 import logging
+from array import array
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, List
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from pim_auto.azure.log_analytics import QueryRowStream
+from pim_auto.core.pim_detector import PIMActivation
+from pim_auto.core.window_merger import (
+    ActivityWindow,
+    activation_window_end,
+    merge_activation_windows,
+)
+from pim_auto.monitoring.timing import StageTimer
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActivityEvent:
     """Represents an Azure activity event."""
 
@@ -19,26 +41,263 @@ class ActivityEvent:
     status: str
     resource_group: str
     subscription_id: str
+    # Resource manager operation, e.g. "Microsoft.Compute/virtualMachines/delete"
+    operation_value: str = ""
+
+
+# ActivityEvent string fields, in the order ActivityBatch stores them
+_EVENT_FIELDS = (
+    "operation_name",
+    "resource_type",
+    "resource_name",
+    "status",
+    "resource_group",
+    "subscription_id",
+    "operation_value",
+)
+
+
+class _Vocabulary:
+    """Maps repeated field values to small integer codes."""
+
+    __slots__ = ("_values", "_codes")
+
+    def __init__(self) -> None:
+        self._values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._values.append(value)
+            self._codes[value] = code
+        return code
+
+    def decode(self, code: int) -> Any:
+        return self._values[code]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class ActivityBatch(Sequence[ActivityEvent]):
+    """
+    Compact, dictionary-encoded storage for a sequence of activity events.
+
+    Subscription IDs, resource groups, providers and operation names repeat
+    across thousands of events, so each string field is stored as a code into
+    a vocabulary shared by the batch (and by batches derived from it with
+    ``take``). Events are materialized as ``ActivityEvent`` on access, so
+    callers keep using the usual attribute API.
+
+    Args:
+        events: Initial events to store
+    """
+
+    __slots__ = ("_vocabulary", "_timestamps", "_columns")
+
+    def __init__(self, events: Iterable[ActivityEvent] = ()) -> None:
+        self._vocabulary = _Vocabulary()
+        self._timestamps: List[datetime] = []
+        self._columns: Tuple[array, ...] = tuple(array("I") for _ in _EVENT_FIELDS)
+        for event in events:
+            self.append(event)
+
+    def append(self, event: ActivityEvent) -> None:
+        """Append an event to the batch."""
+        self.append_values(event.timestamp, *(getattr(event, field) for field in _EVENT_FIELDS))
+
+    def append_values(self, timestamp: datetime, *values: Any) -> None:
+        """
+        Append an event from raw field values without building an ActivityEvent.
+
+        Args:
+            timestamp: Event timestamp
+            *values: Operation, resource type, resource name, status,
+                resource group, subscription ID and operation value, in that order
+        """
+        if len(values) != len(_EVENT_FIELDS):
+            raise ValueError(f"Expected {len(_EVENT_FIELDS)} field values, got {len(values)}")
+        self._timestamps.append(timestamp)
+        for column, value in zip(self._columns, values, strict=True):
+            column.append(self._vocabulary.encode(value))
+
+    def take(self, positions: Iterable[int]) -> "ActivityBatch":
+        """
+        Select events by position into a new batch sharing this batch's vocabulary.
+
+        Args:
+            positions: Event positions to copy, in the order they should appear
+
+        Returns:
+            New ActivityBatch with the selected events
+        """
+        selected = ActivityBatch()
+        selected._vocabulary = self._vocabulary
+        for position in positions:
+            selected._timestamps.append(self._timestamps[position])
+            for target, source in zip(selected._columns, self._columns, strict=True):
+                target.append(source[position])
+        return selected
+
+    @classmethod
+    def union(cls, batches: Sequence["ActivityBatch"]) -> "ActivityBatch":
+        """
+        Combine batches from overlapping activity windows.
+
+        Each distinct event is kept as many times as the batch holding it most
+        often has it, and the result is in time order. Events are compared on
+        their encoded rows, so none are materialized; codes of batches with a
+        different vocabulary than the first are translated once per code.
+
+        Args:
+            batches: Batches to combine
+
+        Returns:
+            New ActivityBatch sharing the first batch's vocabulary
+        """
+        merged = cls()
+        if not batches:
+            return merged
+        vocabulary = merged._vocabulary = batches[0]._vocabulary
+
+        counts: Dict[Tuple[Any, ...], int] = {}
+        for batch in batches:
+            for key, count in batch._row_counts(vocabulary).items():
+                if count > counts.get(key, 0):
+                    counts[key] = count
+
+        for key in sorted(counts, key=lambda row: row[0]):
+            for _ in range(counts[key]):
+                merged._timestamps.append(key[0])
+                for column, code in zip(merged._columns, key[1:], strict=True):
+                    column.append(code)
+        return merged
+
+    def _row_counts(self, vocabulary: _Vocabulary) -> Dict[Tuple[Any, ...], int]:
+        """Count encoded rows ``(timestamp, *codes)``, with codes from ``vocabulary``."""
+        translate: Dict[int, int] = {}
+
+        def recode(code: int) -> int:
+            if code not in translate:
+                translate[code] = vocabulary.encode(self._vocabulary.decode(code))
+            return translate[code]
+
+        counts: Dict[Tuple[Any, ...], int] = {}
+        for position, timestamp in enumerate(self._timestamps):
+            codes = (column[position] for column in self._columns)
+            if self._vocabulary is not vocabulary:
+                codes = (recode(code) for code in codes)
+            key = (timestamp, *codes)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    @property
+    def timestamps(self) -> Sequence[datetime]:
+        """Event timestamps, without materializing the events."""
+        return self._timestamps
+
+    def _event(self, position: int) -> ActivityEvent:
+        decode = self._vocabulary.decode
+        (
+            operation_name,
+            resource_type,
+            resource_name,
+            status,
+            resource_group,
+            subscription_id,
+            operation_value,
+        ) = (decode(column[position]) for column in self._columns)
+        return ActivityEvent(
+            timestamp=self._timestamps[position],
+            operation_name=operation_name,
+            resource_type=resource_type,
+            resource_name=resource_name,
+            status=status,
+            resource_group=resource_group,
+            subscription_id=subscription_id,
+            operation_value=operation_value,
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> ActivityEvent: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ActivityBatch": ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ActivityEvent, "ActivityBatch"]:
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        return self._event(range(len(self))[index])
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def __iter__(self) -> Iterator[ActivityEvent]:
+        for position in range(len(self)):
+            yield self._event(position)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ActivityBatch({len(self)} events, {len(self._vocabulary)} distinct values)"
+
+
+def _kql_string(value: str) -> str:
+    """Quote a value as a KQL string literal."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _kql_datetime(value: datetime) -> str:
+    """Format a datetime as a KQL datetime literal."""
+    return f"datetime({value.isoformat()})"
+
+
+def _query_timespan(start_time: datetime, end_time: datetime) -> Tuple[datetime, datetime]:
+    """
+    Build explicit query bounds covering ``start_time .. end_time``.
+
+    The end is padded by a second so events at exactly ``end_time``, which the
+    query's inclusive ``between`` filter keeps, are inside the timespan too.
+    """
+    return start_time, end_time + timedelta(seconds=1)
 
 
 class ActivityCorrelator:
-    """Correlates user activities with PIM activations."""
+    """
+    Correlates user activities with PIM activations.
 
-    def __init__(self, log_analytics_client: Any):
+    Queries deduplicate AzureActivity events by ``EventDataId``, so workspaces
+    receiving the same activity log each count an event once. Queries that
+    return only part of their rows are recorded in ``partial_errors``.
+    """
+
+    def __init__(self, log_analytics_client: Any, timer: Optional[StageTimer] = None):
         self.log_analytics_client = log_analytics_client
+        self.timer = timer or StageTimer()
+        self.partial_errors: List[str] = []
 
     def get_user_activities(
         self, user_email: str, start_time: datetime, end_time: datetime
-    ) -> List[ActivityEvent]:
+    ) -> ActivityBatch:
         """Get all activities for a user in the specified time range."""
         query = f"""
         AzureActivity
         | where TimeGenerated between (datetime("{start_time.isoformat()}") .. datetime("{end_time.isoformat()}"))
         | where Caller == "{user_email}"
         | where ActivityStatusValue == "Success"
+        | summarize arg_max(TimeGenerated, *) by EventDataId
         | project
             TimeGenerated,
             OperationName,
+            OperationNameValue,
             ResourceProviderValue,
             Resource,
             ResourceGroup,
@@ -47,23 +306,171 @@ class ActivityCorrelator:
         | order by TimeGenerated asc
         """
 
-        results = self.log_analytics_client.execute_query(query=query, timespan=None)
-
-        activities = []
-        for row in results:
-            # Debug: log what we're getting from the query
-            logger.debug(f"Activity row: {row}")
-            activities.append(
-                ActivityEvent(
-                    timestamp=row["TimeGenerated"],
-                    operation_name=row.get("OperationName", "Unknown"),
-                    resource_type=row.get("ResourceProviderValue", "Unknown"),
-                    resource_name=row.get("Resource", "Unknown"),
-                    status=row.get("ActivityStatusValue", "Unknown"),
-                    resource_group=row.get("ResourceGroup", "Unknown"),
-                    subscription_id=row.get("SubscriptionId", "Unknown"),
-                )
-            )
+        activities = ActivityBatch()
+        with self.timer.query("user_activities"):
+            stream = self._stream_query(query, _query_timespan(start_time, end_time))
+            self._record_partial(stream, "user_activities")
+            append_row = self._row_appender(stream)
+            for row in stream:
+                append_row(activities, row)
 
         logger.info(f"Found {len(activities)} activities for {user_email}")
         return activities
+
+    def get_activities_for_activations(
+        self,
+        activations: Sequence[PIMActivation],
+        end_time: Optional[datetime] = None,
+    ) -> List[ActivityBatch]:
+        """
+        Get activities for many activations with a single Log Analytics query.
+
+        Overlapping or adjacent windows of the same user are merged first, and
+        each merged (caller, start, end) window goes into an inline ``datatable``
+        joined against ``AzureActivity``. Each activation window ends at the
+        activation's recorded end time, capped at ``end_time``. Returned
+        activities are attributed back to every activation whose window they
+        fall in.
+
+        Args:
+            activations: PIM activations to correlate
+            end_time: End of open-ended windows and upper bound for all (default: now, UTC)
+
+        Returns:
+            One batch of activities per activation, in the same order as ``activations``
+        """
+        grouped: List[ActivityBatch] = [ActivityBatch() for _ in activations]
+        if not activations:
+            return grouped
+
+        window_end = end_time or datetime.now(timezone.utc)
+        windows = merge_activation_windows(activations, window_end)
+        query = self._build_bulk_query(windows)
+        events_by_window: List[ActivityBatch] = [ActivityBatch() for _ in windows]
+        with self.timer.query("activity_correlation"):
+            stream = self._stream_query(
+                query,
+                _query_timespan(
+                    min(window.start_time for window in windows),
+                    max(window.end_time for window in windows),
+                ),
+            )
+            self._record_partial(stream, "activity_correlation")
+            append_row = self._row_appender(stream)
+            window_column = stream.column_index("WindowIndex")
+            for row in stream:
+                index = int(row[window_column]) if window_column is not None else -1
+                if 0 <= index < len(windows):
+                    append_row(events_by_window[index], row)
+                else:
+                    logger.warning(f"Ignoring activity row with unknown window index {index}")
+
+        for window, events in zip(windows, events_by_window, strict=True):
+            for activation_index in window.activation_indices:
+                activation = activations[activation_index]
+                start = activation.activation_time
+                end = activation_window_end(activation, window_end)
+                grouped[activation_index] = events.take(
+                    position
+                    for position, timestamp in enumerate(events.timestamps)
+                    if start <= timestamp <= end
+                )
+
+        logger.info(
+            f"Found {sum(len(events) for events in events_by_window)} activities "
+            f"for {len(activations)} activations in one query"
+        )
+        return grouped
+
+    def _stream_query(self, query: str, timespan: Any) -> Any:
+        """
+        Run a query and return its rows as a QueryRowStream.
+
+        Clients without ``stream_query`` are queried with ``execute_query``
+        and their row dictionaries converted to tuples.
+        """
+        client = self.log_analytics_client
+        if hasattr(client, "stream_query"):
+            return client.stream_query(
+                query=query, timespan=timespan, split_on_limit=True, chunked=True
+            )
+
+        rows = client.execute_query(query=query, timespan=timespan)
+        columns = list(rows[0]) if rows else []
+        return QueryRowStream(
+            columns,
+            (tuple(row.get(c) for c in columns) for row in rows),
+            getattr(rows, "partial_error", None),
+        )
+
+    def _record_partial(self, stream: Any, query_name: str) -> None:
+        """Record the error of a query that returned only part of its rows."""
+        if stream.partial_error is not None:
+            logger.warning(f"Incomplete {query_name} results: {stream.partial_error}")
+            self.partial_errors.append(f"{query_name}: {stream.partial_error}")
+
+    def _build_bulk_query(self, windows: Sequence[ActivityWindow]) -> str:
+        """Build a KQL query joining activity windows to AzureActivity."""
+        window_rows = ",\n            ".join(
+            f"{index}, {_kql_string(window.user_email)}, "
+            f"{_kql_datetime(window.start_time)}, {_kql_datetime(window.end_time)}"
+            for index, window in enumerate(windows)
+        )
+        callers = ", ".join(_kql_string(email) for email in sorted({w.user_email for w in windows}))
+        earliest = min(window.start_time for window in windows)
+        latest = max(window.end_time for window in windows)
+
+        return f"""
+        let windows = datatable(WindowIndex: long, Caller: string, StartTime: datetime, EndTime: datetime) [
+            {window_rows}
+        ];
+        AzureActivity
+        | where TimeGenerated between ({_kql_datetime(earliest)} .. {_kql_datetime(latest)})
+        | where Caller in ({callers})
+        | where ActivityStatusValue == "Success"
+        | summarize arg_max(TimeGenerated, *) by EventDataId
+        | join kind=inner windows on Caller
+        | where TimeGenerated between (StartTime .. EndTime)
+        | project
+            WindowIndex,
+            TimeGenerated,
+            OperationName,
+            OperationNameValue,
+            ResourceProviderValue,
+            Resource,
+            ResourceGroup,
+            SubscriptionId,
+            ActivityStatusValue
+        | order by WindowIndex asc, TimeGenerated asc
+        """
+
+    def _row_appender(self, stream: Any) -> Callable[[ActivityBatch, Tuple[Any, ...]], None]:
+        """
+        Build a function appending result row tuples to an ActivityBatch.
+
+        Column positions are resolved once per result; columns missing from the
+        result map to "Unknown".
+        """
+        timestamp_index = stream.column_index("TimeGenerated")
+        field_indexes = [
+            stream.column_index(column)
+            for column in (
+                "OperationName",
+                "ResourceProviderValue",
+                "Resource",
+                "ActivityStatusValue",
+                "ResourceGroup",
+                "SubscriptionId",
+                "OperationNameValue",
+            )
+        ]
+
+        def append_row(batch: ActivityBatch, row: Tuple[Any, ...]) -> None:
+            if timestamp_index is None:
+                raise KeyError("TimeGenerated")
+            batch.append_values(
+                row[timestamp_index],
+                *(row[i] if i is not None else "Unknown" for i in field_indexes),
+            )
+
+        return append_row
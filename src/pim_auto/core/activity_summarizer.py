@@ -0,0 +1,170 @@
+"""Activity summarization module for bounding risk assessment prompt size."""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio for English and identifiers in GPT tokenizers
+CHARS_PER_TOKEN = 4
+
+# Default prompt budget for the activity list
+DEFAULT_ACTIVITY_TOKEN_BUDGET = 2000
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Approximate token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class ActivityGroup:
+    """Activities sharing an operation, provider and resource group."""
+
+    operation_name: str
+    resource_type: str
+    resource_group: str
+    count: int
+    first_time: datetime
+    last_time: datetime
+    samples: List[str] = field(default_factory=list)
+
+
+def format_activity(activity: Any) -> str:
+    """Format a single activity as a prompt line."""
+    return (
+        f"- {activity.timestamp.strftime(TIME_FORMAT)}: {activity.operation_name} "
+        f"on {activity.resource_type}/{activity.resource_name}"
+    )
+
+
+def group_activities(activities: Sequence[Any], max_samples: int = 3) -> List[ActivityGroup]:
+    """
+    Group activities by operation, provider and resource group.
+
+    Args:
+        activities: Activities to group
+        max_samples: Maximum number of distinct resource names kept per group
+
+    Returns:
+        Groups ordered by first occurrence, then by key
+    """
+    groups: Dict[Tuple[str, str, str], ActivityGroup] = {}
+    for activity in activities:
+        key = (
+            str(activity.operation_name),
+            str(activity.resource_type),
+            str(activity.resource_group),
+        )
+        group = groups.get(key)
+        if group is None:
+            group = ActivityGroup(
+                operation_name=key[0],
+                resource_type=key[1],
+                resource_group=key[2],
+                count=0,
+                first_time=activity.timestamp,
+                last_time=activity.timestamp,
+            )
+            groups[key] = group
+        group.count += 1
+        group.first_time = min(group.first_time, activity.timestamp)
+        group.last_time = max(group.last_time, activity.timestamp)
+        resource_name = str(activity.resource_name)
+        if len(group.samples) < max_samples and resource_name not in group.samples:
+            group.samples.append(resource_name)
+
+    return sorted(
+        groups.values(),
+        key=lambda g: (g.first_time, g.operation_name, g.resource_type, g.resource_group),
+    )
+
+
+def _format_group(group: ActivityGroup, with_samples: bool) -> str:
+    """Format an activity group as a prompt line."""
+    line = (
+        f"- {group.operation_name} on {group.resource_type} in {group.resource_group}: "
+        f"{group.count}x between {group.first_time.strftime(TIME_FORMAT)} "
+        f"and {group.last_time.strftime(TIME_FORMAT)}"
+    )
+    if with_samples and group.samples:
+        line += f" (e.g. {', '.join(group.samples)})"
+    return line
+
+
+def summarize_activities(
+    activities: Sequence[Any],
+    token_budget: int = DEFAULT_ACTIVITY_TOKEN_BUDGET,
+    max_samples: int = 3,
+) -> str:
+    """
+    Render activities for a prompt within a token budget.
+
+    Activities are listed one per line when that fits the budget. Otherwise
+    they are grouped by operation, provider and resource group with counts,
+    first/last times and sample resource names; samples are dropped if the
+    groups still do not fit, and trailing groups are replaced by an omission
+    line as a last resort. The output is deterministic for the same input.
+
+    Args:
+        activities: Activities to render
+        token_budget: Approximate maximum number of tokens for the result
+        max_samples: Maximum number of sample resource names per group
+
+    Returns:
+        Activity text for the prompt
+    """
+    detailed = "\n".join(format_activity(activity) for activity in activities)
+    if estimate_tokens(detailed) <= token_budget:
+        return detailed
+
+    groups = group_activities(activities, max_samples=max_samples)
+    header = f"{len(activities)} activities summarized into {len(groups)} groups:"
+
+    for with_samples in (True, False):
+        lines = [header, *(_format_group(group, with_samples) for group in groups)]
+        text = "\n".join(lines)
+        if estimate_tokens(text) <= token_budget:
+            logger.info(
+                f"Summarized {len(activities)} activities into {len(groups)} groups "
+                f"(~{estimate_tokens(text)} tokens)"
+            )
+            return text
+
+    # Keep as many groups as fit, reserving room for the omission line
+    lines = [header]
+    used = estimate_tokens(header) + 1
+    reserve = estimate_tokens(
+        f"- ... {len(groups)} more groups ({len(activities)} activities) omitted"
+    )
+    kept = 0
+    for group in groups:
+        line = _format_group(group, with_samples=False)
+        cost = estimate_tokens(line) + 1
+        if used + cost + reserve > token_budget:
+            break
+        lines.append(line)
+        used += cost
+        kept += 1
+
+    omitted = groups[kept:]
+    lines.append(
+        f"- ... {len(omitted)} more groups ({sum(g.count for g in omitted)} activities) omitted"
+    )
+    logger.info(
+        f"Summarized {len(activities)} activities into {kept} of {len(groups)} groups "
+        f"to fit a {token_budget}-token budget"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,183 @@
+"""Persistent cache of risk assessments."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Optional, Sequence, Type, Union
+
+from pim_auto.core.risk_assessor import AlignmentLevel, RiskAssessment
+
+logger = logging.getLogger(__name__)
+
+
+class AssessmentCache:
+    """
+    SQLite-backed, content-addressed cache of risk assessments.
+
+    Entries are keyed on a hash of everything that determines the model's
+    answer (deployment, prompt version, PIM reason and the normalized activity
+    list), so overlapping scan windows in scheduled runs reuse earlier verdicts
+    instead of calling Azure OpenAI again. Use it as a context manager, or
+    call ``close()`` when done.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl_hours: int = 24):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl_hours: How long a cached assessment stays valid
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_hours * 3600
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS assessments (
+                    key TEXT PRIMARY KEY,
+                    level TEXT NOT NULL,
+                    explanation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    confidence REAL,
+                    reasons TEXT
+                )
+                """)
+            # Databases created before structured verdicts lack the last two columns
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(assessments)")}
+            for column, column_type in (("confidence", "REAL"), ("reasons", "TEXT")):
+                if column not in columns:
+                    self._connection.execute(
+                        f"ALTER TABLE assessments ADD COLUMN {column} {column_type}"
+                    )
+
+    @staticmethod
+    def make_key(
+        deployment: str,
+        prompt_version: str,
+        pim_reason: str,
+        activities: Sequence[Any],
+    ) -> str:
+        """
+        Build the cache key for an assessment.
+
+        Args:
+            deployment: Azure OpenAI deployment name
+            prompt_version: Version of the assessment prompt
+            pim_reason: PIM activation reason
+            activities: Activity events assessed
+
+        Returns:
+            Hex SHA-256 digest of the normalized inputs
+        """
+        normalized_activities = sorted(
+            [
+                act.timestamp.isoformat(),
+                act.operation_name,
+                act.resource_type,
+                act.resource_name,
+                act.resource_group,
+                act.subscription_id,
+                act.status,
+            ]
+            for act in activities
+        )
+        payload = json.dumps(
+            [deployment, prompt_version, pim_reason.strip(), normalized_activities],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[RiskAssessment]:
+        """
+        Look up a cached assessment.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached RiskAssessment, or None if missing or expired
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT level, explanation, created_at, confidence, reasons "
+                "FROM assessments WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        level, explanation, created_at, confidence, reasons = row
+        if time.time() - created_at > self.ttl_seconds:
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM assessments WHERE key = ?", (key,))
+            return None
+
+        return RiskAssessment(
+            level=AlignmentLevel(level),
+            explanation=explanation,
+            confidence=confidence,
+            reasons=json.loads(reasons) if reasons else None,
+        )
+
+    def put(self, key: str, assessment: RiskAssessment) -> None:
+        """
+        Store an assessment.
+
+        Args:
+            key: Cache key from make_key
+            assessment: Assessment to cache
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO assessments "
+                "(key, level, explanation, created_at, confidence, reasons) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    assessment.level.value,
+                    assessment.explanation,
+                    time.time(),
+                    assessment.confidence,
+                    json.dumps(assessment.reasons) if assessment.reasons else None,
+                ),
+            )
+
+    def purge_expired(self) -> int:
+        """
+        Delete expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM assessments WHERE created_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "AssessmentCache":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,182 @@
+"""Rule-based fast-path classification that skips the LLM for trivial cases."""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional, Sequence, Tuple
+
+from pim_auto.core.risk_assessor import AlignmentLevel, RiskAssessment
+
+logger = logging.getLogger(__name__)
+
+# Reason keywords mapped to the resource providers they justify touching
+DEFAULT_REASON_ALLOW_LIST: Mapping[str, Tuple[str, ...]] = {
+    "storage": ("Microsoft.Storage",),
+    "blob": ("Microsoft.Storage",),
+    "virtual machine": ("Microsoft.Compute",),
+    "vm": ("Microsoft.Compute",),
+    "network": ("Microsoft.Network",),
+    "vnet": ("Microsoft.Network",),
+    "key vault": ("Microsoft.KeyVault",),
+    "keyvault": ("Microsoft.KeyVault",),
+    "sql": ("Microsoft.Sql",),
+    "database": ("Microsoft.Sql", "Microsoft.DocumentDB", "Microsoft.DBforPostgreSQL"),
+    "app service": ("Microsoft.Web",),
+    "web app": ("Microsoft.Web",),
+    "aks": ("Microsoft.ContainerService",),
+    "kubernetes": ("Microsoft.ContainerService",),
+}
+
+# Providers whose write operations always need a full assessment
+SENSITIVE_PROVIDERS: Tuple[str, ...] = ("Microsoft.Authorization",)
+
+RuleFunction = Callable[[str, Sequence[Any]], Optional[RiskAssessment]]
+
+
+@dataclass(frozen=True)
+class FastPathRule:
+    """A named deterministic rule returning an assessment when it fires."""
+
+    name: str
+    evaluate: RuleFunction
+
+
+def _operation_value(activity: Any) -> str:
+    """
+    Get an activity's lowercase resource manager operation.
+
+    This is the AzureActivity ``OperationNameValue``, e.g.
+    ``microsoft.compute/virtualmachines/delete``; ``operation_name`` holds the
+    display name ("Delete Virtual Machine") and cannot be matched reliably.
+    """
+    return str(getattr(activity, "operation_value", "") or "").lower()
+
+
+def _is_read_operation(activity: Any) -> bool:
+    """Check whether an activity is a read-only Azure operation."""
+    return _operation_value(activity).endswith("/read")
+
+
+def _is_write_operation(activity: Any) -> bool:
+    """Check whether an activity creates or updates a resource (not delete or action)."""
+    return _operation_value(activity).endswith("/write")
+
+
+def _matches_provider(activity: Any, providers: Sequence[str]) -> bool:
+    """Check whether an activity's provider or operation belongs to any of the providers."""
+    values = (str(activity.resource_type).lower(), _operation_value(activity))
+    return any(value.startswith(provider.lower()) for value in values for provider in providers)
+
+
+def no_activities_rule(pim_reason: str, activities: Sequence[Any]) -> Optional[RiskAssessment]:
+    """Elevations without any activity cannot be misaligned."""
+    if activities:
+        return None
+    return RiskAssessment(
+        level=AlignmentLevel.ALIGNED,
+        explanation="ALIGNED: No activities were recorded during the elevation.",
+    )
+
+
+def read_only_rule(pim_reason: str, activities: Sequence[Any]) -> Optional[RiskAssessment]:
+    """Elevations that only read resources made no changes."""
+    if not activities or not all(_is_read_operation(activity) for activity in activities):
+        return None
+    return RiskAssessment(
+        level=AlignmentLevel.ALIGNED,
+        explanation=(
+            f"ALIGNED: All {len(activities)} activities were read-only operations; "
+            "no resources were changed."
+        ),
+    )
+
+
+def allow_list_rule(
+    allow_list: Mapping[str, Sequence[str]] = DEFAULT_REASON_ALLOW_LIST,
+) -> RuleFunction:
+    """
+    Build a rule accepting activities that match providers named by the reason.
+
+    The rule fires when the reason mentions at least one allow-listed keyword
+    and every activity is either a read or a create/update write to a provider
+    allowed by the matched keywords. Deletes, actions and writes to sensitive
+    providers never match, so they always get a full assessment.
+
+    Args:
+        allow_list: Mapping of lowercase reason keywords to provider prefixes
+
+    Returns:
+        Rule function
+    """
+
+    def evaluate(pim_reason: str, activities: Sequence[Any]) -> Optional[RiskAssessment]:
+        if not activities:
+            return None
+        words = f" {re.sub(r'[^a-z0-9]+', ' ', pim_reason.lower())} "
+        matched = sorted(keyword for keyword in allow_list if f" {keyword} " in words)
+        if not matched:
+            return None
+        providers = [provider for keyword in matched for provider in allow_list[keyword]]
+        for activity in activities:
+            if _is_read_operation(activity):
+                continue
+            if not _is_write_operation(activity):
+                return None
+            if _matches_provider(activity, SENSITIVE_PROVIDERS):
+                return None
+            if not _matches_provider(activity, providers):
+                return None
+        return RiskAssessment(
+            level=AlignmentLevel.ALIGNED,
+            explanation=(
+                f"ALIGNED: All {len(activities)} activities are reads or writes to the "
+                f"resource providers for the stated reason ({', '.join(matched)})."
+            ),
+        )
+
+    return evaluate
+
+
+def default_rules() -> Tuple[FastPathRule, ...]:
+    """Get the built-in fast-path rules, in evaluation order."""
+    return (
+        FastPathRule("no_activities", no_activities_rule),
+        FastPathRule("read_only", read_only_rule),
+        FastPathRule("allow_list", allow_list_rule()),
+    )
+
+
+class FastPathClassifier:
+    """
+    Deterministic pre-classifier run before the LLM assessment.
+
+    Args:
+        rules: Rules evaluated in order; the first one returning an assessment wins
+    """
+
+    def __init__(self, rules: Optional[Sequence[FastPathRule]] = None):
+        self.rules = tuple(rules) if rules is not None else default_rules()
+
+    def classify(self, pim_reason: str, activities: Sequence[Any]) -> Optional[RiskAssessment]:
+        """
+        Classify an activation without calling the LLM if a rule fires.
+
+        Args:
+            pim_reason: PIM activation reason
+            activities: Activities during the elevation
+
+        Returns:
+            RiskAssessment with ``source`` set to ``fast_path:<rule>``, or None
+            when no rule fires
+        """
+        for rule in self.rules:
+            try:
+                assessment = rule.evaluate(pim_reason, activities)
+            except Exception as e:
+                logger.warning(f"Fast-path rule {rule.name} failed: {e}")
+                continue
+            if assessment is not None:
+                assessment.source = f"fast_path:{rule.name}"
+                logger.info(f"Assessment (fast path, {rule.name}): {assessment.level.value}")
+                return assessment
+        return None
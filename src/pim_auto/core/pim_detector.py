@@ -1,12 +1,24 @@
 """PIM activation detection module."""
 
 import logging
+import math
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, List
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from pim_auto.monitoring.timing import StageTimer
+
+if TYPE_CHECKING:
+    from pim_auto.core.scan_state import ScanWatermark
 
 logger = logging.getLogger(__name__)
 
+# AuditLogs operations that end a PIM elevation before or at its expiry
+ELEVATION_END_OPERATIONS = (
+    "Remove member from role completed (PIM deactivate)",
+    "Remove member from role (PIM activation expired)",
+)
+
 
 @dataclass
 class PIMActivation:
@@ -17,42 +29,228 @@ class PIMActivation:
     activation_reason: str
     activation_time: datetime
     duration_hours: int
+    record_id: str = ""
+    end_time: Optional[datetime] = None
+
+    def is_active(self, at: datetime) -> bool:
+        """Check whether the elevation is still in effect at the given time."""
+        if self.end_time is not None:
+            return self.end_time > at
+        return self.activation_time + timedelta(hours=self.duration_hours) > at
 
 
 class PIMDetector:
-    """Detects PIM activations from Azure Log Analytics."""
+    """
+    Detects PIM activations from Azure Log Analytics.
 
-    def __init__(self, log_analytics_client: Any):
+    Args:
+        log_analytics_client: Log Analytics client
+        chunk_hours: Windows longer than this are scanned with chunked queries
+            (None always uses a single query)
+        timer: Optional timer recording query durations
+
+    Queries that return only part of their rows are recorded in
+    ``partial_errors``, so callers can flag the detection as incomplete.
+    """
+
+    def __init__(
+        self,
+        log_analytics_client: Any,
+        chunk_hours: Optional[int] = None,
+        timer: Optional[StageTimer] = None,
+    ):
         self.log_analytics_client = log_analytics_client
+        self.chunk_hours = chunk_hours
+        self.timer = timer or StageTimer()
+        self.partial_errors: List[str] = []
 
-    def detect_activations(self, hours: int = 24) -> List[PIMActivation]:
-        """Detect PIM activations in the specified time window."""
-        query = f"""
-        AuditLogs
-        | where TimeGenerated > ago({hours}h)
-        | where OperationName == "Add member to role completed (PIM activation)"
-        | extend ReasonValue = tostring(parse_json(tostring(AdditionalDetails[3])).value)
-        | project
-            TimeGenerated,
-            UserEmail = tostring(InitiatedBy.user.userPrincipalName),
-            RoleName = tostring(TargetResources[0].displayName),
-            Reason = iff(isempty(ResultDescription), ReasonValue, ResultDescription)
-        | order by TimeGenerated desc
+    def detect_activations(
+        self,
+        hours: int = 24,
+        since: Optional["ScanWatermark"] = None,
+        overlap: timedelta = timedelta(0),
+    ) -> List[PIMActivation]:
         """
+        Detect PIM activations in the specified time window.
 
-        results = self.log_analytics_client.execute_query(query=query, timespan=f"PT{hours}H")
+        Args:
+            hours: Look-back window in hours
+            since: Optional watermark; only activations recorded after it are returned
+            overlap: How far behind the watermark to re-scan for records that
+                were ingested late; the caller drops records it already saw
+
+        Returns:
+            Detected activations, newest first
+        """
+        watermark_filter = ""
+        if since is not None:
+            watermark_filter = self._watermark_filter(since, overlap)
+
+        if self.chunk_hours is not None and hours > self.chunk_hours:
+            results = self._query_chunked(hours, watermark_filter)
+        else:
+            query = f"""
+        let activations = {self._activations_query(hours, watermark_filter)};
+        let endings = {self._endings_query(hours)};
+        activations
+        | join kind=leftouter endings on UserEmail, RoleName
+        | extend EndedAt = iff(EndedAt >= TimeGenerated, EndedAt, datetime(null))
+        | summarize DeactivatedAt = min(EndedAt)
+            by TimeGenerated, RecordId, UserEmail, RoleName, Reason, RequestedEnd
+        | order by TimeGenerated desc
+        """
+            with self.timer.query("pim_detection"):
+                results = self.log_analytics_client.execute_query(
+                    query=query, timespan=f"PT{hours}H"
+                )
+            self._record_partial(results, "pim_detection")
 
         activations = []
         for row in results:
+            activation_time = row["TimeGenerated"]
+            end_time = self._resolve_end_time(row)
+            if end_time is not None:
+                elapsed_hours = (end_time - activation_time).total_seconds() / 3600
+                duration_hours = max(1, math.ceil(elapsed_hours))
+            else:
+                duration_hours = hours  # No end recorded: assume full window
             activations.append(
                 PIMActivation(
                     user_email=row["UserEmail"],
                     role_name=row["RoleName"],
                     activation_reason=row["Reason"],
-                    activation_time=row["TimeGenerated"],
-                    duration_hours=hours,  # Simplified: assume full window
+                    activation_time=activation_time,
+                    duration_hours=duration_hours,
+                    record_id=str(row.get("RecordId") or ""),
+                    end_time=end_time,
                 )
             )
 
         logger.info(f"Detected {len(activations)} PIM activations")
         return activations
+
+    def _record_partial(self, rows: Any, query_name: str) -> None:
+        """Record the error of a query that returned only part of its rows."""
+        error = getattr(rows, "partial_error", None)
+        if error is not None:
+            logger.warning(f"Incomplete {query_name} results: {error}")
+            self.partial_errors.append(f"{query_name}: {error}")
+
+    @staticmethod
+    def _watermark_filter(since: "ScanWatermark", overlap: timedelta) -> str:
+        """Build the KQL filter restricting activations to records after a watermark."""
+        if overlap > timedelta(0):
+            start = since.time_generated - overlap
+            return f"| where TimeGenerated >= datetime({start.isoformat()})"
+
+        watermark_time = f"datetime({since.time_generated.isoformat()})"
+        record_id = since.record_id.replace("\\", "\\\\").replace('"', '\\"')
+        return (
+            f"| where TimeGenerated > {watermark_time} or "
+            f'(TimeGenerated == {watermark_time} and strcmp(Id, "{record_id}") > 0)'
+        )
+
+    def _activations_query(self, hours: int, watermark_filter: str) -> str:
+        """
+        Build the KQL returning one row per PIM activation.
+
+        Rows are deduplicated by record ``Id``: workspaces receiving the same
+        diagnostic stream each return a copy of the record.
+        """
+        return f"""AuditLogs
+        | where TimeGenerated > ago({hours}h)
+        {watermark_filter}
+        | where OperationName == "Add member to role completed (PIM activation)"
+        | summarize arg_max(TimeGenerated, *) by Id
+        | extend ReasonValue = tostring(parse_json(tostring(AdditionalDetails[3])).value)
+        | mv-apply Detail = AdditionalDetails on (
+            summarize Details = make_bag(bag_pack(tostring(Detail.key), tostring(Detail.value)))
+          )
+        | project
+            TimeGenerated,
+            RecordId = Id,
+            UserEmail = tostring(InitiatedBy.user.userPrincipalName),
+            RoleName = tostring(TargetResources[0].displayName),
+            Reason = iff(isempty(ResultDescription), ReasonValue, ResultDescription),
+            RequestedEnd = todatetime(Details.ExpirationTime)"""
+
+    def _endings_query(self, hours: int) -> str:
+        """Build the KQL returning one row per PIM deactivation or expiry."""
+        end_operations = ", ".join(f'"{operation}"' for operation in ELEVATION_END_OPERATIONS)
+        return f"""AuditLogs
+        | where TimeGenerated > ago({hours}h)
+        | where OperationName in ({end_operations})
+        | summarize arg_max(TimeGenerated, *) by Id
+        | mv-apply Target = TargetResources on (
+            where tostring(Target.type) == "User"
+            | summarize TargetUser = take_any(tostring(Target.userPrincipalName))
+          )
+        | project
+            EndedAt = TimeGenerated,
+            UserEmail = coalesce(TargetUser, tostring(InitiatedBy.user.userPrincipalName)),
+            RoleName = tostring(TargetResources[0].displayName)"""
+
+    def _query_chunked(self, hours: int, watermark_filter: str) -> List[Dict[str, Any]]:
+        """
+        Detect activations over a long window with chunked queries.
+
+        An elevation may end in a later chunk than it started in, so
+        activations and endings are queried separately and joined here
+        instead of in KQL.
+
+        Args:
+            hours: Look-back window in hours
+            watermark_filter: KQL filter restricting activations to new records
+
+        Returns:
+            Activation rows with ``DeactivatedAt`` set, newest first
+        """
+        timespan = f"PT{hours}H"
+        with self.timer.query("pim_activations"):
+            activations = self.log_analytics_client.execute_query(
+                query=self._activations_query(hours, watermark_filter),
+                timespan=timespan,
+                chunked=True,
+            )
+        self._record_partial(activations, "pim_activations")
+        with self.timer.query("pim_endings"):
+            endings = self.log_analytics_client.execute_query(
+                query=self._endings_query(hours), timespan=timespan, chunked=True
+            )
+        self._record_partial(endings, "pim_endings")
+
+        ended_at: Dict[Tuple[str, str], List[datetime]] = {}
+        for ending in endings:
+            key = (ending["UserEmail"], ending["RoleName"])
+            ended_at.setdefault(key, []).append(ending["EndedAt"])
+
+        rows = []
+        for row in activations:
+            candidates = [
+                value
+                for value in ended_at.get((row["UserEmail"], row["RoleName"]), [])
+                if value >= row["TimeGenerated"]
+            ]
+            rows.append({**row, "DeactivatedAt": min(candidates) if candidates else None})
+        rows.sort(key=lambda row: row["TimeGenerated"], reverse=True)
+        return rows
+
+    def _resolve_end_time(self, row: Dict[str, Any]) -> Optional[datetime]:
+        """
+        Determine when an elevation ended.
+
+        Uses the earliest of the matching deactivation/expiry event and the
+        expiration time requested at activation.
+
+        Args:
+            row: Activation result row
+
+        Returns:
+            End of the elevation, or None if neither is recorded
+        """
+        candidates = [
+            value
+            for value in (row.get("DeactivatedAt"), row.get("RequestedEnd"))
+            if isinstance(value, datetime) and value >= row["TimeGenerated"]
+        ]
+        return min(candidates) if candidates else None
@@ -1,16 +1,25 @@
 """KQL query generation using Azure OpenAI."""
 
 import logging
-from typing import Any
+from typing import Any, Optional
+
+from pim_auto.monitoring.timing import StageTimer
 
 logger = logging.getLogger(__name__)
 
 
 class QueryGenerator:
-    """Generates Kusto queries using Azure OpenAI."""
+    """
+    Generates Kusto queries using Azure OpenAI.
+
+    Args:
+        openai_client: OpenAI client
+        timer: Optional timer recording OpenAI call durations and token usage
+    """
 
-    def __init__(self, openai_client: Any):
+    def __init__(self, openai_client: Any, timer: Optional[StageTimer] = None):
         self.openai_client = openai_client
+        self.timer = timer or StageTimer()
 
     def generate_query(self, natural_language: str, max_retries: int = 2) -> str:
         """Generate KQL query from natural language."""
@@ -26,10 +35,11 @@ class QueryGenerator:
 
         for attempt in range(max_retries + 1):
             try:
-                query: str = self.openai_client.generate_completion(
-                    messages=messages,
-                    temperature=0.3,  # Lower temperature for more deterministic output
-                )
+                with self.timer.openai_call("query_generation"):
+                    query: str = self.openai_client.generate_completion(
+                        messages=messages,
+                        temperature=0.3,  # Lower temperature for more deterministic output
+                    )
 
                 # Basic validation: check if it looks like KQL
                 if any(
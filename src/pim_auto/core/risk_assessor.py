@@ -1,11 +1,88 @@
 """Risk assessment module using Azure OpenAI."""
 
+import json
 import logging
+import threading
+from collections import Counter
 from enum import Enum
-from typing import Any, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from pim_auto.core.activity_summarizer import (
+    DEFAULT_ACTIVITY_TOKEN_BUDGET,
+    estimate_tokens,
+    summarize_activities,
+)
+from pim_auto.monitoring.timing import StageTimer
+
+if TYPE_CHECKING:
+    from pim_auto.core.assessment_cache import AssessmentCache
+    from pim_auto.core.fast_path import FastPathClassifier
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt or parsing changes so cached assessments are not reused
+PROMPT_VERSION = "3"
+
+# Defaults for packing several small activations into one request
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_BATCH_ITEM_TOKENS = 300
+
+SYSTEM_PROMPT = """You are a security analyst assessing Azure PIM (Privileged Identity Management) activations.
+        Determine if the user's activities during their elevated access period align with their stated reason for activation.
+        Respond with one of: ALIGNED, PARTIALLY_ALIGNED, NOT_ALIGNED, UNKNOWN.
+        Then provide a brief explanation."""
+
+STRUCTURED_SYSTEM_PROMPT = """You are a security analyst assessing Azure PIM (Privileged Identity Management) activations.
+        Determine if the user's activities during their elevated access period align with their stated reason for activation.
+        Respond only with a JSON object: {"level": "ALIGNED" | "PARTIALLY_ALIGNED" | "NOT_ALIGNED" | "UNKNOWN", "confidence": <number from 0 to 1>, "reasons": [<at most 3 short reasons>]}"""
+
+# Output token ceiling for structured verdicts
+STRUCTURED_MAX_TOKENS = 300
+
+# Response formats supported by RiskAssessor
+RESPONSE_FORMATS = ("text", "json_object", "json_schema")
+
+VERDICT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "level": {
+            "type": "string",
+            "enum": ["ALIGNED", "PARTIALLY_ALIGNED", "NOT_ALIGNED", "UNKNOWN"],
+        },
+        "confidence": {"type": "number"},
+        "reasons": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["level", "confidence", "reasons"],
+    "additionalProperties": False,
+}
+
+BATCH_SYSTEM_PROMPT = """You are a security analyst assessing Azure PIM (Privileged Identity Management) activations.
+        For each numbered activation, determine if the user's activities during their elevated access period align with their stated reason for activation.
+        Respond only with a JSON array containing one object per activation:
+        [{"id": <activation number>, "level": "ALIGNED" | "PARTIALLY_ALIGNED" | "NOT_ALIGNED" | "UNKNOWN", "explanation": "<brief explanation>"}]"""
+
+STRUCTURED_BATCH_SYSTEM_PROMPT = """You are a security analyst assessing Azure PIM (Privileged Identity Management) activations.
+        For each numbered activation, determine if the user's activities during their elevated access period align with their stated reason for activation.
+        Respond only with a JSON object containing one verdict per activation:
+        {"verdicts": [{"id": <activation number>, "level": "ALIGNED" | "PARTIALLY_ALIGNED" | "NOT_ALIGNED" | "UNKNOWN", "confidence": <number from 0 to 1>, "reasons": [<at most 3 short reasons>]}]}"""
+
+BATCH_VERDICTS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "verdicts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, **VERDICT_SCHEMA["properties"]},
+                "required": ["id", *VERDICT_SCHEMA["required"]],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["verdicts"],
+    "additionalProperties": False,
+}
+
 
 class AlignmentLevel(Enum):
     """Activity alignment levels."""
@@ -19,30 +96,331 @@ class AlignmentLevel(Enum):
 class RiskAssessment:
     """Risk assessment result."""
 
-    def __init__(self, level: AlignmentLevel, explanation: str):
+    def __init__(
+        self,
+        level: AlignmentLevel,
+        explanation: str,
+        source: str = "llm",
+        confidence: Optional[float] = None,
+        reasons: Optional[List[str]] = None,
+    ):
         self.level = level
         self.explanation = explanation
+        # Model-reported confidence (0-1) and reasons, set by structured output
+        self.confidence = confidence
+        self.reasons = reasons or []
+        # How the assessment was produced: "llm", "llm_batch", "cache" or "fast_path:<rule>"
+        self.source = source
 
 
 class RiskAssessor:
     """Assesses alignment between PIM reasons and activities."""
 
-    def __init__(self, openai_client: Any):
+    def __init__(
+        self,
+        openai_client: Any,
+        cache: Optional["AssessmentCache"] = None,
+        activity_token_budget: int = DEFAULT_ACTIVITY_TOKEN_BUDGET,
+        fast_path: Optional["FastPathClassifier"] = None,
+        response_format: str = "text",
+        timer: Optional[StageTimer] = None,
+    ):
+        """
+        Initialize risk assessor.
+
+        Args:
+            openai_client: OpenAI client used for assessments
+            cache: Optional cache of previous assessments
+            activity_token_budget: Approximate token budget for the activity list
+                in the prompt; larger activity sets are summarized to fit
+            fast_path: Optional rule-based classifier tried before the LLM
+            response_format: "text" for free-text verdicts, or "json_object" /
+                "json_schema" for compact structured verdicts
+            timer: Optional timer recording OpenAI call durations
+        """
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"Unsupported response format: {response_format}")
+
         self.openai_client = openai_client
+        self.cache = cache
+        self.activity_token_budget = activity_token_budget
+        self.fast_path = fast_path
+        self.response_format = response_format
+        self.timer = timer or StageTimer()
+        self._path_counts: Counter[str] = Counter()
+        self._path_lock = threading.Lock()
+
+    @property
+    def path_counts(self) -> Dict[str, int]:
+        """Number of assessments per source (see ``RiskAssessment.source``)."""
+        with self._path_lock:
+            return dict(self._path_counts)
+
+    def _record_path(self, assessment: RiskAssessment) -> RiskAssessment:
+        """Count which path produced an assessment."""
+        with self._path_lock:
+            self._path_counts[assessment.source] += 1
+        return assessment
 
-    def assess_alignment(self, pim_reason: str, activities: List[Any]) -> RiskAssessment:
+    def _classify_fast_path(
+        self, pim_reason: str, activities: Sequence[Any]
+    ) -> Optional[RiskAssessment]:
+        """Try the fast-path classifier, if configured."""
+        if self.fast_path is None:
+            return None
+        return self.fast_path.classify(pim_reason, activities)
+
+    def assess_alignment(self, pim_reason: str, activities: Sequence[Any]) -> RiskAssessment:
         """Assess if activities align with PIM activation reason."""
-        activities_text = "\n".join(
-            [
-                f"- {act.timestamp.strftime('%Y-%m-%d %H:%M:%S')}: {act.operation_name} on {act.resource_type}/{act.resource_name}"
-                for act in activities
-            ]
+        fast = self._classify_fast_path(pim_reason, activities)
+        if fast is not None:
+            return self._record_path(fast)
+
+        cache_key = self._cache_key(pim_reason, activities)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return self._record_path(cached)
+
+        return self._assess_with_llm(pim_reason, activities, cache_key)
+
+    def assess_alignment_batch(
+        self,
+        items: Sequence[Tuple[str, Sequence[Any]]],
+        max_batch_size: int = DEFAULT_BATCH_SIZE,
+        max_item_tokens: int = DEFAULT_BATCH_ITEM_TOKENS,
+    ) -> List[Optional[RiskAssessment]]:
+        """
+        Assess several activations, packing small ones into shared requests.
+
+        Fast-path and cached results are used first. Remaining activations
+        whose activity text is at most ``max_item_tokens`` are sent up to
+        ``max_batch_size`` at a time in one request answered with a JSON array
+        of verdicts; larger ones are assessed individually. Activations missing
+        from a batch answer, or whose batch answer cannot be parsed, fall back
+        to single requests. A failed single request leaves its slot None
+        without affecting the other items.
+
+        Args:
+            items: (PIM reason, activities) pairs
+            max_batch_size: Maximum number of activations per request
+            max_item_tokens: Approximate activity-text size limit for batching
+
+        Returns:
+            One RiskAssessment per item, in the same order as ``items``; None
+            where the assessment failed
+        """
+        results: List[Optional[RiskAssessment]] = [None] * len(items)
+        batchable: List[Tuple[int, Optional[str], str]] = []
+
+        for index, (pim_reason, activities) in enumerate(items):
+            fast = self._classify_fast_path(pim_reason, activities)
+            if fast is not None:
+                results[index] = self._record_path(fast)
+                continue
+
+            cache_key = self._cache_key(pim_reason, activities)
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                results[index] = self._record_path(cached)
+                continue
+
+            activities_text = summarize_activities(activities, self.activity_token_budget)
+            if max_batch_size > 1 and estimate_tokens(activities_text) <= max_item_tokens:
+                batchable.append((index, cache_key, activities_text))
+            else:
+                results[index] = self._try_assess_with_llm(pim_reason, activities, cache_key)
+
+        for start in range(0, len(batchable), max_batch_size):
+            group = batchable[start : start + max_batch_size]
+            verdicts = (
+                self._request_batch([(items[index][0], text) for index, _, text in group])
+                if len(group) > 1
+                else {}
+            )
+            for position, (index, cache_key, _) in enumerate(group):
+                assessment = verdicts.get(position)
+                if assessment is None:
+                    pim_reason, activities = items[index]
+                    results[index] = self._try_assess_with_llm(pim_reason, activities, cache_key)
+                    continue
+                self._put_cached(cache_key, assessment)
+                results[index] = self._record_path(assessment)
+
+        return results
+
+    def _try_assess_with_llm(
+        self, pim_reason: str, activities: Sequence[Any], cache_key: Optional[str]
+    ) -> Optional[RiskAssessment]:
+        """Assess one activation of a batch with a single request, None on failure."""
+        try:
+            return self._assess_with_llm(pim_reason, activities, cache_key)
+        except Exception as e:
+            logger.warning(f"Assessment of a batched activation failed: {e}")
+            return None
+
+    def _assess_with_llm(
+        self, pim_reason: str, activities: Sequence[Any], cache_key: Optional[str]
+    ) -> RiskAssessment:
+        """Assess one activation with a single OpenAI request."""
+        with self.timer.openai_call("assessment"):
+            response = self.openai_client.generate_completion(
+                **self._completion_kwargs(pim_reason, activities)
+            )
+        assessment = self._parse_completion(response)
+        self._put_cached(cache_key, assessment)
+        return self._record_path(assessment)
+
+    def _request_batch(self, entries: Sequence[Tuple[str, str]]) -> Dict[int, RiskAssessment]:
+        """
+        Assess several activations in one request.
+
+        Args:
+            entries: (PIM reason, activity text) pairs
+
+        Returns:
+            Assessments keyed by position in ``entries``; empty when the request
+            or its response parsing failed
+        """
+        sections = [
+            f"Activation {number}:\n"
+            f"PIM Activation Reason: {pim_reason}\n"
+            f"Activities during elevation:\n{text if text else 'No activities recorded'}"
+            for number, (pim_reason, text) in enumerate(entries, start=1)
+        ]
+        system_prompt = (
+            BATCH_SYSTEM_PROMPT
+            if self.response_format == "text"
+            else STRUCTURED_BATCH_SYSTEM_PROMPT
         )
+        kwargs: Dict[str, Any] = {
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": "\n\n".join(sections)},
+            ],
+            "temperature": 0.5,
+        }
+        response_format = self._response_format("pim_alignment_verdicts", BATCH_VERDICTS_SCHEMA)
+        if response_format is not None:
+            kwargs["response_format"] = response_format
 
-        system_prompt = """You are a security analyst assessing Azure PIM (Privileged Identity Management) activations.
-        Determine if the user's activities during their elevated access period align with their stated reason for activation.
-        Respond with one of: ALIGNED, PARTIALLY_ALIGNED, NOT_ALIGNED, UNKNOWN.
-        Then provide a brief explanation."""
+        try:
+            with self.timer.openai_call("assessment_batch"):
+                response = self.openai_client.generate_completion(**kwargs)
+            verdicts = self._parse_batch_response(response, len(entries))
+        except Exception as e:
+            logger.warning(f"Batched assessment of {len(entries)} activations failed: {e}")
+            return {}
+
+        logger.info(f"Assessed {len(verdicts)} of {len(entries)} activations in one request")
+        return verdicts
+
+    def _parse_batch_response(self, response: str, count: int) -> Dict[int, RiskAssessment]:
+        """Parse a JSON array (or ``{"verdicts": [...]}``) of verdicts keyed by position."""
+        if self.response_format == "text":
+            start = response.find("[")
+            end = response.rfind("]")
+            if start == -1 or end < start:
+                raise ValueError("No JSON array in batched assessment response")
+            entries = json.loads(response[start : end + 1])
+        else:
+            entries = json.loads(response)["verdicts"]
+
+        verdicts: Dict[int, RiskAssessment] = {}
+        for entry in entries:
+            position = int(entry["id"]) - 1
+            if not 0 <= position < count or position in verdicts:
+                continue
+            if "reasons" in entry:
+                assessment = self._structured_assessment(entry)
+                assessment.source = "llm_batch"
+            else:
+                label = str(entry["level"])
+                assessment = RiskAssessment(
+                    level=self._level_from_text(label),
+                    explanation=f"{label}: {entry.get('explanation', '')}".strip(),
+                    source="llm_batch",
+                )
+            verdicts[position] = assessment
+        return verdicts
+
+    async def assess_alignment_async(
+        self, pim_reason: str, activities: Sequence[Any]
+    ) -> RiskAssessment:
+        """Assess alignment using an async OpenAI client (e.g. AsyncOpenAIClient)."""
+        fast = self._classify_fast_path(pim_reason, activities)
+        if fast is not None:
+            return self._record_path(fast)
+
+        cache_key = self._cache_key(pim_reason, activities)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return self._record_path(cached)
+
+        with self.timer.openai_call("assessment"):
+            response = await self.openai_client.generate_completion(
+                **self._completion_kwargs(pim_reason, activities)
+            )
+        assessment = self._parse_completion(response)
+        self._put_cached(cache_key, assessment)
+        return self._record_path(assessment)
+
+    def _cache_key(self, pim_reason: str, activities: Sequence[Any]) -> Optional[str]:
+        """Build the cache key for an assessment, or None when caching is off."""
+        if self.cache is None:
+            return None
+        deployment = str(getattr(self.openai_client, "deployment", ""))
+        prompt_version = f"{PROMPT_VERSION}:{self.activity_token_budget}:{self.response_format}"
+        return self.cache.make_key(deployment, prompt_version, pim_reason, activities)
+
+    def _get_cached(self, cache_key: Optional[str]) -> Optional[RiskAssessment]:
+        """Return a cached assessment, treating cache errors as misses."""
+        if self.cache is None or cache_key is None:
+            return None
+        try:
+            cached = self.cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Assessment cache lookup failed: {e}")
+            return None
+        if cached is not None:
+            cached.source = "cache"
+            logger.info(f"Assessment (cached): {cached.level.value}")
+        return cached
+
+    def _put_cached(self, cache_key: Optional[str], assessment: RiskAssessment) -> None:
+        """Store an assessment, logging rather than raising on cache errors."""
+        if self.cache is None or cache_key is None:
+            return
+        try:
+            self.cache.put(cache_key, assessment)
+        except Exception as e:
+            logger.warning(f"Assessment cache write failed: {e}")
+
+    def _completion_kwargs(self, pim_reason: str, activities: Sequence[Any]) -> Dict[str, Any]:
+        """Build generate_completion arguments for the configured response format."""
+        kwargs: Dict[str, Any] = {
+            "messages": self._build_messages(pim_reason, activities),
+            "temperature": 0.5,
+        }
+        response_format = self._response_format("pim_alignment_verdict", VERDICT_SCHEMA)
+        if response_format is not None:
+            kwargs["max_tokens"] = STRUCTURED_MAX_TOKENS
+            kwargs["response_format"] = response_format
+        return kwargs
+
+    def _response_format(self, name: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build the ``response_format`` request argument, None in text mode."""
+        if self.response_format == "json_object":
+            return {"type": "json_object"}
+        if self.response_format == "json_schema":
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": name, "strict": True, "schema": schema},
+            }
+        return None
+
+    def _build_messages(self, pim_reason: str, activities: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Build the chat messages for an alignment assessment."""
+        activities_text = summarize_activities(activities, self.activity_token_budget)
 
         user_prompt = f"""
         PIM Activation Reason: {pim_reason}
@@ -53,26 +431,57 @@ class RiskAssessor:
         Does the activity align with the stated reason?
         """
 
-        messages = [
+        system_prompt = (
+            SYSTEM_PROMPT if self.response_format == "text" else STRUCTURED_SYSTEM_PROMPT
+        )
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
 
-        response = self.openai_client.generate_completion(
-            messages=messages,
-            temperature=0.5,
-        )
+    def _level_from_text(self, text: str) -> AlignmentLevel:
+        """Find the alignment level named in a piece of model output."""
+        text_upper = text.upper()
+        if "NOT_ALIGNED" in text_upper or "NOT ALIGNED" in text_upper:
+            return AlignmentLevel.NOT_ALIGNED
+        if "PARTIALLY_ALIGNED" in text_upper or "PARTIALLY ALIGNED" in text_upper:
+            return AlignmentLevel.PARTIALLY_ALIGNED
+        if "ALIGNED" in text_upper:
+            return AlignmentLevel.ALIGNED
+        return AlignmentLevel.UNKNOWN
 
-        # Parse response
-        response_upper = response.upper()
-        if "NOT_ALIGNED" in response_upper or "NOT ALIGNED" in response_upper:
-            level = AlignmentLevel.NOT_ALIGNED
-        elif "PARTIALLY_ALIGNED" in response_upper or "PARTIALLY ALIGNED" in response_upper:
-            level = AlignmentLevel.PARTIALLY_ALIGNED
-        elif "ALIGNED" in response_upper:
-            level = AlignmentLevel.ALIGNED
-        else:
-            level = AlignmentLevel.UNKNOWN
+    def _parse_response(self, response: str) -> RiskAssessment:
+        """Parse the model response into a RiskAssessment."""
+        level = self._level_from_text(response)
 
         logger.info(f"Assessment: {level.value}")
         return RiskAssessment(level=level, explanation=response)
+
+    def _parse_completion(self, response: str) -> RiskAssessment:
+        """Parse a completion in the configured response format."""
+        if self.response_format == "text":
+            return self._parse_response(response)
+        try:
+            return self._parse_structured_response(response)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not decode structured verdict, parsing as text: {e}")
+            return self._parse_response(response)
+
+    def _parse_structured_response(self, response: str) -> RiskAssessment:
+        """Decode a ``{level, confidence, reasons[]}`` verdict into a RiskAssessment."""
+        return self._structured_assessment(json.loads(response))
+
+    def _structured_assessment(self, verdict: Dict[str, Any]) -> RiskAssessment:
+        """Build a RiskAssessment from a decoded ``{level, confidence, reasons[]}`` verdict."""
+        level = AlignmentLevel[str(verdict["level"]).strip().upper()]
+        confidence = min(max(float(verdict.get("confidence", 0.0)), 0.0), 1.0)
+        reasons = [str(reason) for reason in verdict.get("reasons", [])]
+
+        explanation = "; ".join(reasons) if reasons else "No reasons given."
+        logger.info(f"Assessment: {level.value} (confidence {confidence:.2f})")
+        return RiskAssessment(
+            level=level,
+            explanation=f"{explanation} (confidence {confidence:.2f})",
+            confidence=confidence,
+            reasons=reasons,
+        )
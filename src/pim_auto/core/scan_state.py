@@ -0,0 +1,168 @@
+"""Persistent state for incremental PIM scanning."""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from pim_auto.core.pim_detector import PIMActivation
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_datetime(value: str) -> datetime:
+    """Parse an ISO timestamp, assuming UTC when no offset is stored."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+@dataclass
+class ScanWatermark:
+    """High-water mark of the last AuditLogs record processed."""
+
+    time_generated: datetime
+    record_id: str
+
+    @classmethod
+    def latest(
+        cls, activations: Sequence[PIMActivation], previous: Optional["ScanWatermark"] = None
+    ) -> Optional["ScanWatermark"]:
+        """
+        Return the newest watermark covering the given activations.
+
+        Args:
+            activations: Activations returned by the latest scan
+            previous: Watermark from the previous run, if any
+
+        Returns:
+            Watermark of the newest record seen, or ``previous`` if nothing newer
+        """
+        latest = previous
+        for activation in activations:
+            candidate = (activation.activation_time, activation.record_id)
+            if latest is None or candidate > (latest.time_generated, latest.record_id):
+                latest = cls(time_generated=candidate[0], record_id=candidate[1])
+        return latest
+
+
+@dataclass
+class ScanState:
+    """
+    State carried between incremental batch runs.
+
+    Attributes:
+        watermark: Newest AuditLogs record processed
+        open_activations: Processed activations whose elevation may still be in effect
+        recent_records: Record ID -> TimeGenerated of processed activations inside
+            the re-scan overlap behind the watermark, so late-ingested records
+            can be picked up without reprocessing the ones already seen
+    """
+
+    watermark: Optional[ScanWatermark] = None
+    open_activations: List[PIMActivation] = field(default_factory=list)
+    recent_records: Dict[str, datetime] = field(default_factory=dict)
+
+
+class ScanStateStore:
+    """Loads and saves incremental scan state as a local JSON file."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize the state store.
+
+        Args:
+            path: Path to the JSON state file
+        """
+        self.path = Path(path)
+
+    def load(self) -> ScanState:
+        """
+        Load scan state from disk.
+
+        Returns:
+            Stored state, or an empty state if the file is missing or unreadable
+        """
+        if not self.path.exists():
+            logger.info(f"No scan state at {self.path}; starting a full scan")
+            return ScanState()
+
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable scan state {self.path}: {e}")
+            return ScanState()
+
+        watermark = None
+        if data.get("watermark"):
+            watermark = ScanWatermark(
+                time_generated=_parse_datetime(data["watermark"]["time_generated"]),
+                record_id=data["watermark"]["record_id"],
+            )
+
+        open_activations = [
+            PIMActivation(
+                user_email=item["user_email"],
+                role_name=item["role_name"],
+                activation_reason=item["activation_reason"],
+                activation_time=_parse_datetime(item["activation_time"]),
+                duration_hours=item["duration_hours"],
+                record_id=item.get("record_id", ""),
+                end_time=_parse_datetime(item["end_time"]) if item.get("end_time") else None,
+            )
+            for item in data.get("open_activations", [])
+        ]
+
+        recent_records = {
+            record_id: _parse_datetime(value)
+            for record_id, value in data.get("recent_records", {}).items()
+        }
+
+        return ScanState(
+            watermark=watermark,
+            open_activations=open_activations,
+            recent_records=recent_records,
+        )
+
+    def save(self, state: ScanState) -> None:
+        """
+        Atomically write scan state to disk.
+
+        Args:
+            state: State to persist
+        """
+        data: Dict[str, Any] = {
+            "watermark": (
+                {
+                    "time_generated": state.watermark.time_generated.isoformat(),
+                    "record_id": state.watermark.record_id,
+                }
+                if state.watermark
+                else None
+            ),
+            "open_activations": [
+                {
+                    "user_email": activation.user_email,
+                    "role_name": activation.role_name,
+                    "activation_reason": activation.activation_reason,
+                    "activation_time": activation.activation_time.isoformat(),
+                    "duration_hours": activation.duration_hours,
+                    "record_id": activation.record_id,
+                    "end_time": activation.end_time.isoformat() if activation.end_time else None,
+                }
+                for activation in state.open_activations
+            ],
+            "recent_records": {
+                record_id: value.isoformat() for record_id, value in state.recent_records.items()
+            },
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        temp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(temp_path, self.path)
+        logger.debug(f"Scan state saved to {self.path}")
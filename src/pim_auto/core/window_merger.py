@@ -0,0 +1,80 @@
+"""Activation window merging module."""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from pim_auto.core.pim_detector import PIMActivation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ActivityWindow:
+    """A time window of one user's activity covering one or more activations."""
+
+    user_email: str
+    start_time: datetime
+    end_time: datetime
+    activation_indices: List[int] = field(default_factory=list)
+
+
+def activation_window_end(activation: PIMActivation, end_time: datetime) -> datetime:
+    """
+    Get the end of an activation's activity window.
+
+    Args:
+        activation: PIM activation
+        end_time: End for open-ended activations and upper bound for all
+
+    Returns:
+        The activation's recorded end, capped at ``end_time``
+    """
+    if activation.end_time is not None:
+        return min(activation.end_time, end_time)
+    return end_time
+
+
+def merge_activation_windows(
+    activations: Sequence[PIMActivation],
+    end_time: datetime,
+    gap: timedelta = timedelta(0),
+) -> List[ActivityWindow]:
+    """
+    Coalesce overlapping or adjacent activation windows per user.
+
+    When a user activates several roles back to back, their windows overlap
+    and would otherwise be fetched repeatedly. Merging yields the minimal set
+    of windows per user; each records the indices of the activations it covers
+    so results can be attributed back.
+
+    Args:
+        activations: PIM activations
+        end_time: End for open-ended activations and upper bound for all
+        gap: Windows separated by at most this much are merged as adjacent
+
+    Returns:
+        Merged windows, ordered by user and then by start time
+    """
+    by_user: Dict[str, List[int]] = {}
+    for index, activation in enumerate(activations):
+        by_user.setdefault(activation.user_email, []).append(index)
+
+    windows: List[ActivityWindow] = []
+    for user_email in sorted(by_user):
+        indices = sorted(by_user[user_email], key=lambda i: activations[i].activation_time)
+        current: Optional[ActivityWindow] = None
+        for index in indices:
+            start = activations[index].activation_time
+            end = activation_window_end(activations[index], end_time)
+            if current is not None and start <= current.end_time + gap:
+                current.end_time = max(current.end_time, end)
+                current.activation_indices.append(index)
+            else:
+                current = ActivityWindow(user_email, start, end, [index])
+                windows.append(current)
+
+    if len(windows) < len(activations):
+        logger.info(f"Merged {len(activations)} activation windows into {len(windows)}")
+    return windows
@@ -1,20 +1,94 @@
 """Batch mode runner for automated PIM activity scanning."""
 
+import contextvars
 import logging
-from datetime import datetime, timezone
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 from pim_auto.azure.log_analytics import LogAnalyticsClient
 from pim_auto.azure.openai_client import OpenAIClient
 from pim_auto.config import Config
-from pim_auto.core.activity_correlator import ActivityCorrelator, ActivityEvent
-from pim_auto.core.pim_detector import PIMDetector
-from pim_auto.core.risk_assessor import RiskAssessment, RiskAssessor
+from pim_auto.core.activity_correlator import (
+    ActivityBatch,
+    ActivityCorrelator,
+    ActivityEvent,
+)
+from pim_auto.core.assessment_cache import AssessmentCache
+from pim_auto.core.fast_path import FastPathClassifier
+from pim_auto.core.pim_detector import PIMActivation, PIMDetector
+from pim_auto.core.risk_assessor import AlignmentLevel, RiskAssessment, RiskAssessor
+from pim_auto.core.scan_state import ScanState, ScanStateStore, ScanWatermark
+from pim_auto.monitoring.timing import (
+    STAGE_CORRELATION,
+    STAGE_DETECTION,
+    STAGE_REPORT,
+    MetricsSink,
+    StageTimer,
+)
+from pim_auto.monitoring.tracing import KIND_SERVER, Tracer, set_span_attribute
 from pim_auto.reporting.markdown_generator import MarkdownGenerator
 
 logger = logging.getLogger(__name__)
 
+# Exit code of a run whose report is based on partial query results
+EXIT_INCOMPLETE = 2
+
+# Alignment levels from most to least severe, for merging a user's assessments
+_SEVERITY_ORDER = (
+    AlignmentLevel.NOT_ALIGNED,
+    AlignmentLevel.PARTIALLY_ALIGNED,
+    AlignmentLevel.UNKNOWN,
+    AlignmentLevel.ALIGNED,
+)
+
+
+def _merge_user_activities(
+    batches: Sequence[Sequence[ActivityEvent]],
+) -> Sequence[ActivityEvent]:
+    """
+    Combine activities from all activations of the same user.
+
+    Overlapping activations return the same events, so the result keeps each
+    distinct event as many times as the input holding it most often has it,
+    in time order (see ``ActivityBatch.union``).
+    """
+    if len(batches) == 1:
+        return batches[0]
+    return ActivityBatch.union(
+        [batch if isinstance(batch, ActivityBatch) else ActivityBatch(batch) for batch in batches]
+    )
+
+
+def _merge_user_assessments(
+    assessed: Sequence[tuple[PIMActivation, RiskAssessment]],
+) -> RiskAssessment:
+    """
+    Combine the assessments of all activations of the same user.
+
+    The report shows one verdict per user, so it takes the most severe level
+    and keeps every activation's explanation, labelled with its role.
+    """
+    if len(assessed) == 1:
+        return assessed[0][1]
+    worst = min(
+        (assessment for _, assessment in assessed),
+        key=lambda assessment: _SEVERITY_ORDER.index(assessment.level),
+    )
+    explanation = " ".join(
+        f"[{activation.role_name} at {activation.activation_time:%Y-%m-%d %H:%M}: "
+        f"{assessment.level.value}] {assessment.explanation}"
+        for activation, assessment in assessed
+    )
+    return RiskAssessment(
+        level=worst.level,
+        explanation=explanation,
+        source=worst.source,
+        confidence=worst.confidence,
+        reasons=[reason for _, assessment in assessed for reason in assessment.reasons],
+    )
+
 
 class BatchRunner:
     """Runs PIM activity audit in non-interactive batch mode."""
@@ -24,6 +98,8 @@ class BatchRunner:
         log_analytics: LogAnalyticsClient,
         openai_client: OpenAIClient,
         config: Config,
+        monitor: Optional[MetricsSink] = None,
+        tracer: Optional[Tracer] = None,
     ):
         """
         Initialize batch runner.
@@ -32,97 +108,403 @@ class BatchRunner:
             log_analytics: Log Analytics client
             openai_client: OpenAI client for risk assessment
             config: Application configuration
+            monitor: Optional metrics sink (e.g. ApplicationInsightsMonitor) receiving
+                stage, query and OpenAI call timings
+            tracer: Optional tracer; each run becomes one trace with spans per
+                stage, query, activation and OpenAI call
         """
         self.log_analytics = log_analytics
         self.openai_client = openai_client
         self.config = config
-        self.pim_detector = PIMDetector(log_analytics)
-        self.activity_correlator = ActivityCorrelator(log_analytics)
-        self.risk_assessor = RiskAssessor(openai_client)
+        self.tracer = tracer or Tracer()
+        self.timer = StageTimer(monitor, self.tracer)
+        self.pim_detector = PIMDetector(
+            log_analytics, chunk_hours=config.log_analytics_chunk_hours, timer=self.timer
+        )
+        self.activity_correlator = ActivityCorrelator(log_analytics, timer=self.timer)
+        self.assessment_cache = (
+            AssessmentCache(config.assessment_cache_path, config.assessment_cache_ttl_hours)
+            if config.assessment_cache_path
+            else None
+        )
+        self.risk_assessor = RiskAssessor(
+            openai_client,
+            cache=self.assessment_cache,
+            activity_token_budget=config.assessment_prompt_token_budget,
+            fast_path=FastPathClassifier() if config.assessment_fast_path else None,
+            response_format=config.assessment_response_format,
+            timer=self.timer,
+        )
+        self.scan_state_store = (
+            ScanStateStore(config.scan_state_path) if config.scan_state_path else None
+        )
         self.markdown_generator = MarkdownGenerator()
 
     def run(self, hours: Optional[int] = None, output_path: Optional[Path] = None) -> int:
         """
         Run batch mode scan and generate report.
 
+        Closes the assessment cache when done, so a runner runs once.
+
         Args:
             hours: Number of hours to scan (default from config)
             output_path: Path to output report file (default from config)
 
         Returns:
-            Exit code (0 for success, 1 for error)
+            Exit code (0 for success, 1 for error, ``EXIT_INCOMPLETE`` when
+            some queries returned partial results)
         """
+        scan_hours = hours or self.config.default_scan_hours
+        try:
+            with self.tracer.span("batch_run", KIND_SERVER, scan_hours=scan_hours) as span:
+                exit_code = self._run(scan_hours, output_path)
+                span.set_attribute("exit_code", exit_code)
+        finally:
+            if self.assessment_cache is not None:
+                self.assessment_cache.close()
+        return exit_code
+
+    def _run(self, scan_hours: int, output_path: Optional[Path]) -> int:
+        """Run the scan inside the run's root span; see ``run``."""
         try:
-            scan_hours = hours or self.config.default_scan_hours
             logger.info(f"Starting batch mode scan (last {scan_hours} hours)")
 
             # Detect PIM activations
             logger.info("Scanning for PIM activations...")
-            activations = self.pim_detector.detect_activations(hours=scan_hours)
+            pending_state: Optional[ScanState] = None
+            with self.timer.stage(STAGE_DETECTION):
+                if self.scan_state_store is not None:
+                    activations, pending_state = self._detect_incremental(
+                        self.scan_state_store, scan_hours
+                    )
+                else:
+                    activations = self.pim_detector.detect_activations(hours=scan_hours)
             logger.info(f"Found {len(activations)} PIM activations")
+            self.timer.monitor.track_pim_activations(len(activations))
+            set_span_attribute("activations", len(activations))
 
             if not activations:
                 logger.info("No activations found. Generating empty report.")
-                report = self._generate_empty_report()
-                self._output_report(report, output_path)
-                return 0
+                partial_errors = self._partial_errors()
+                report = self._generate_empty_report(partial_errors)
+                return self._complete(report, output_path, pending_state, partial_errors)
 
             # Collect activities and assessments for each user
-            activities_by_user: dict[str, list[ActivityEvent]] = {}
-            assessments_by_user: dict[str, RiskAssessment] = {}
+            user_batches: dict[str, list[Sequence[ActivityEvent]]] = {}
+            user_assessments: dict[str, list[tuple[PIMActivation, RiskAssessment]]] = {}
 
-            for activation in activations:
-                logger.info(f"Processing {activation.user_email}...")
-
-                # Get activities
-                end_time = datetime.now(timezone.utc)
-                activities = self.activity_correlator.get_user_activities(
-                    user_email=activation.user_email,
-                    start_time=activation.activation_time,
-                    end_time=end_time,
+            # Fetch activities and assess alignment for every activation
+            end_time = datetime.now(timezone.utc)
+            with self.timer.stage(STAGE_CORRELATION):
+                activities_per_activation, assessments_per_activation = self._correlate_and_assess(
+                    activations, end_time
                 )
-                activities_by_user[activation.user_email] = activities
-                logger.info(f"  Found {len(activities)} activities")
 
-                # Assess alignment
-                try:
-                    assessment = self.risk_assessor.assess_alignment(
-                        pim_reason=activation.activation_reason,
-                        activities=activities,
+            for activation, activities, assessment in zip(
+                activations, activities_per_activation, assessments_per_activation, strict=True
+            ):
+                logger.info(f"Processing {activation.user_email}...")
+                user_batches.setdefault(activation.user_email, []).append(activities)
+                logger.info(f"  Found {len(activities)} activities")
+                self.timer.monitor.track_user_activities(len(activities))
+                if assessment is not None:
+                    user_assessments.setdefault(activation.user_email, []).append(
+                        (activation, assessment)
                     )
-                    assessments_by_user[activation.user_email] = assessment
                     logger.info(f"  Assessment: {assessment.level.value}")
-                except Exception as e:
-                    logger.warning(f"  Failed to assess alignment: {e}")
-                    # Continue with other users even if one assessment fails
+
+            activities_by_user = {
+                user: _merge_user_activities(batches) for user, batches in user_batches.items()
+            }
+            assessments_by_user = {
+                user: _merge_user_assessments(assessed)
+                for user, assessed in user_assessments.items()
+            }
+
+            path_counts = self.risk_assessor.path_counts
+            if path_counts:
+                summary = ", ".join(
+                    f"{path}={count}" for path, count in sorted(path_counts.items())
+                )
+                logger.info(f"Assessment paths: {summary}")
 
             # Generate report
             logger.info("Generating markdown report...")
-            report = self.markdown_generator.generate_report(
-                activations=activations,
-                activities_by_user=activities_by_user,
-                assessments_by_user=assessments_by_user,
-                output_path=output_path,
-            )
-
-            # Output report
-            self._output_report(report, output_path)
+            partial_errors = self._partial_errors()
+            with self.timer.stage(STAGE_REPORT):
+                report = self.markdown_generator.generate_report(
+                    activations=activations,
+                    activities_by_user=activities_by_user,
+                    assessments_by_user=assessments_by_user,
+                    output_path=output_path,
+                    warnings=partial_errors,
+                )
 
-            logger.info("Batch mode completed successfully")
-            return 0
+            logger.info(f"Timings: {self.timer.summary()}")
+            return self._complete(report, output_path, pending_state, partial_errors)
 
         except Exception as e:
             logger.error(f"Batch mode failed: {e}", exc_info=True)
             return 1
 
-    def _generate_empty_report(self) -> str:
+    def _detect_incremental(
+        self, store: ScanStateStore, scan_hours: int
+    ) -> tuple[list[PIMActivation], ScanState]:
+        """
+        Detect activations recorded since the stored watermark.
+
+        Activations from earlier runs whose elevation is still in effect are
+        carried over, so their activity keeps being reviewed until they end.
+
+        Args:
+            store: Scan state store holding the previous watermark
+            scan_hours: Maximum look-back window in hours
+
+        Returns:
+            Tuple of (activations to process, state to persist after a successful run)
+        """
+        state = store.load()
+        overlap = timedelta(minutes=self.config.scan_overlap_minutes)
+
+        # Re-scan an overlap behind the watermark for late-ingested records and
+        # drop the ones an earlier run already processed
+        detected = self.pim_detector.detect_activations(
+            hours=scan_hours, since=state.watermark, overlap=overlap
+        )
+        new_activations = [a for a in detected if a.record_id not in state.recent_records]
+        logger.info(f"Found {len(new_activations)} new PIM activations since last run")
+
+        now = datetime.now(timezone.utc)
+        new_ids = {activation.record_id for activation in new_activations}
+        still_open = [
+            activation
+            for activation in state.open_activations
+            if activation.is_active(now) and activation.record_id not in new_ids
+        ]
+        if still_open:
+            logger.info(f"Re-checking {len(still_open)} still-open activations")
+
+        activations = new_activations + still_open
+        watermark = ScanWatermark.latest(new_activations, state.watermark)
+        recent_records = dict(state.recent_records)
+        recent_records.update((a.record_id, a.activation_time) for a in new_activations)
+        if watermark is not None:
+            cutoff = watermark.time_generated - overlap
+            recent_records = {
+                record_id: time_generated
+                for record_id, time_generated in recent_records.items()
+                if record_id and time_generated >= cutoff
+            }
+        pending_state = ScanState(
+            watermark=watermark,
+            open_activations=[a for a in activations if a.is_active(now)],
+            recent_records=recent_records,
+        )
+        return activations, pending_state
+
+    def _partial_errors(self) -> list[str]:
+        """Return the errors of all queries that returned partial results."""
+        return self.pim_detector.partial_errors + self.activity_correlator.partial_errors
+
+    def _complete(
+        self,
+        report: str,
+        output_path: Optional[Path],
+        pending_state: Optional[ScanState],
+        partial_errors: Sequence[str],
+    ) -> int:
+        """
+        Output the report and finish the run.
+
+        A run based on partial results keeps the previous scan state, so the
+        next incremental run scans the same records again.
+
+        Returns:
+            Exit code (0, or ``EXIT_INCOMPLETE`` when there were partial results)
+        """
+        self._output_report(report, output_path)
+        if partial_errors:
+            logger.warning(f"Batch mode completed with {len(partial_errors)} partial query results")
+            return EXIT_INCOMPLETE
+        self._save_scan_state(pending_state)
+        logger.info("Batch mode completed successfully")
+        return 0
+
+    def _save_scan_state(self, state: Optional[ScanState]) -> None:
+        """Persist incremental scan state once a run has completed."""
+        if self.scan_state_store is not None and state is not None:
+            self.scan_state_store.save(state)
+
+    def _correlate_and_assess(
+        self, activations: list[PIMActivation], end_time: datetime
+    ) -> tuple[list[Sequence[ActivityEvent]], list[Optional[RiskAssessment]]]:
+        """
+        Fetch activities and assess alignment using bounded worker pools.
+
+        Activations are split into one chunk per Log Analytics worker, keeping
+        each user's activations together, and each chunk is correlated with a
+        single bulk query. As soon as a chunk's
+        activities arrive, its assessments are queued on the OpenAI pool (in
+        groups of ``assessment_batch_size`` when batching is enabled), so
+        both services are kept busy without exceeding their concurrency limits.
+        Results are stored by activation index, keeping the output order
+        independent of completion order.
+
+        Args:
+            activations: PIM activations to process
+            end_time: End of the activity window for every activation
+
+        Returns:
+            Tuple of (activities, assessments), each aligned with ``activations``.
+            An assessment is None when it failed.
+        """
+        la_workers = self.config.log_analytics_max_concurrency
+        openai_workers = self.config.openai_max_concurrency
+
+        activities: list[Sequence[ActivityEvent]] = [[] for _ in activations]
+        assessments: list[Optional[RiskAssessment]] = [None] * len(activations)
+
+        # Keep each user's activations in one chunk so their windows can be merged
+        chunk_count = min(la_workers, len(activations))
+        chunks: list[list[int]] = [[] for _ in range(chunk_count)]
+        user_slots: dict[str, int] = {}
+        for index, activation in enumerate(activations):
+            slot = user_slots.setdefault(activation.user_email, len(user_slots) % chunk_count)
+            chunks[slot].append(index)
+        chunks = [chunk for chunk in chunks if chunk]
+
+        with (
+            ThreadPoolExecutor(max_workers=la_workers, thread_name_prefix="pim-la") as la_pool,
+            ThreadPoolExecutor(
+                max_workers=openai_workers, thread_name_prefix="pim-openai"
+            ) as openai_pool,
+        ):
+            fetches = {
+                la_pool.submit(
+                    contextvars.copy_context().run,
+                    self.activity_correlator.get_activities_for_activations,
+                    [activations[index] for index in chunk],
+                    end_time=end_time,
+                ): chunk
+                for chunk in chunks
+            }
+
+            batch_size = self.config.assessment_batch_size
+            pending_assessments: dict[Future[list[Optional[RiskAssessment]]], list[int]] = {}
+            for fetch in as_completed(fetches):
+                chunk = fetches[fetch]
+                for index, chunk_activities in zip(chunk, fetch.result(), strict=True):
+                    activities[index] = chunk_activities
+                for start in range(0, len(chunk), batch_size):
+                    group = chunk[start : start + batch_size]
+                    future = openai_pool.submit(
+                        contextvars.copy_context().run,
+                        self._assess_group,
+                        [activations[index] for index in group],
+                        [activities[index] for index in group],
+                    )
+                    pending_assessments[future] = group
+
+            for future, group in pending_assessments.items():
+                for index, assessment in zip(group, future.result(), strict=True):
+                    assessments[index] = assessment
+
+        return activities, assessments
+
+    def _assess_group(
+        self,
+        activations: list[PIMActivation],
+        activities: list[Sequence[ActivityEvent]],
+    ) -> list[Optional[RiskAssessment]]:
+        """
+        Assess a group of activations, batching their prompts when enabled.
+
+        Args:
+            activations: PIM activations being assessed
+            activities: Activities recorded during each activation
+
+        Returns:
+            One assessment per activation, None where the assessment failed
+        """
+        if len(activations) == 1:
+            return [self._assess_activation(activations[0], activities[0])]
+
+        with self.tracer.span(
+            "activation_group",
+            activations=len(activations),
+            users=", ".join(sorted({activation.user_email for activation in activations})),
+        ):
+            try:
+                assessments = self.risk_assessor.assess_alignment_batch(
+                    [
+                        (activation.activation_reason, activation_activities)
+                        for activation, activation_activities in zip(
+                            activations, activities, strict=True
+                        )
+                    ],
+                    max_batch_size=self.config.assessment_batch_size,
+                    max_item_tokens=self.config.assessment_batch_max_item_tokens,
+                )
+            except Exception as e:
+                logger.warning(f"Batched assessment of {len(activations)} activations failed: {e}")
+                assessments = [None] * len(activations)
+
+            # Retry only the activations the batch could not assess
+            return [
+                (
+                    assessment
+                    if assessment is not None
+                    else self._assess_activation(activation, activation_activities)
+                )
+                for activation, activation_activities, assessment in zip(
+                    activations, activities, assessments, strict=True
+                )
+            ]
+
+    def _assess_activation(
+        self, activation: PIMActivation, activities: Sequence[ActivityEvent]
+    ) -> Optional[RiskAssessment]:
+        """
+        Assess a single activation, returning None on failure.
+
+        Args:
+            activation: PIM activation being assessed
+            activities: Activities recorded during the activation
+
+        Returns:
+            Risk assessment, or None if the assessment failed
+        """
+        with self.tracer.span(
+            "activation",
+            user=activation.user_email,
+            role=activation.role_name,
+            activities=len(activities),
+        ) as span:
+            try:
+                assessment = self.risk_assessor.assess_alignment(
+                    pim_reason=activation.activation_reason,
+                    activities=activities,
+                )
+            except Exception as e:
+                # Continue with other users even if one assessment fails
+                logger.warning(f"Failed to assess alignment for {activation.user_email}: {e}")
+                span.set_attribute("assessment", "failed")
+                return None
+            span.set_attribute("assessment", assessment.level.value)
+            span.set_attribute("assessment_source", assessment.source)
+            return assessment
+
+    def _generate_empty_report(self, warnings: Sequence[str] = ()) -> str:
         """Generate a report when no activations are found."""
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        warnings_section = (
+            f"{self.markdown_generator.generate_warnings(warnings)}\n\n" if warnings else ""
+        )
         return f"""# PIM Activity Audit Report
 
 **Generated**: {timestamp}
 
-## Executive Summary
+{warnings_section}## Executive Summary
 
 No PIM activations found in the specified time period.
 
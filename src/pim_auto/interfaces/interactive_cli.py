@@ -13,9 +13,11 @@ from pim_auto.azure.log_analytics import LogAnalyticsClient
 from pim_auto.azure.openai_client import OpenAIClient
 from pim_auto.config import Config
 from pim_auto.core.activity_correlator import ActivityCorrelator
+from pim_auto.core.fast_path import FastPathClassifier
 from pim_auto.core.pim_detector import PIMActivation, PIMDetector
 from pim_auto.core.query_generator import QueryGenerator
 from pim_auto.core.risk_assessor import RiskAssessor
+from pim_auto.monitoring.timing import MetricsSink, StageTimer
 from pim_auto.reporting.markdown_generator import MarkdownGenerator
 
 logger = logging.getLogger(__name__)
@@ -29,6 +31,7 @@ class InteractiveCLI:
         log_analytics: LogAnalyticsClient,
         openai_client: OpenAIClient,
         config: Config,
+        monitor: Optional[MetricsSink] = None,
     ):
         """
         Initialize interactive CLI.
@@ -37,15 +40,25 @@ class InteractiveCLI:
             log_analytics: Log Analytics client
             openai_client: OpenAI client
             config: Application configuration
+            monitor: Optional metrics sink receiving query and OpenAI call timings
         """
         self.log_analytics = log_analytics
         self.openai_client = openai_client
         self.config = config
         self.console = Console()
-        self.pim_detector = PIMDetector(log_analytics)
-        self.activity_correlator = ActivityCorrelator(log_analytics)
-        self.risk_assessor = RiskAssessor(openai_client)
-        self.query_generator = QueryGenerator(openai_client)
+        self.timer = StageTimer(monitor)
+        self.pim_detector = PIMDetector(
+            log_analytics, chunk_hours=config.log_analytics_chunk_hours, timer=self.timer
+        )
+        self.activity_correlator = ActivityCorrelator(log_analytics, timer=self.timer)
+        self.risk_assessor = RiskAssessor(
+            openai_client,
+            activity_token_budget=config.assessment_prompt_token_budget,
+            fast_path=FastPathClassifier() if config.assessment_fast_path else None,
+            response_format=config.assessment_response_format,
+            timer=self.timer,
+        )
+        self.query_generator = QueryGenerator(openai_client, timer=self.timer)
         self.markdown_generator = MarkdownGenerator()
 
         # Conversation context
@@ -185,11 +198,10 @@ Type 'scan' to detect PIM activations, ask questions, or 'exit' to quit.
 
         try:
             # Get activities
-            end_time = datetime.now()
             activities = self.activity_correlator.get_user_activities(
                 user_email=user_email,
                 start_time=activation.activation_time,
-                end_time=end_time,
+                end_time=self._elevation_end(activation),
             )
 
             if not activities:
@@ -244,11 +256,10 @@ Type 'scan' to detect PIM activations, ask questions, or 'exit' to quit.
 
         try:
             # Get activities
-            end_time = datetime.now()
             activities = self.activity_correlator.get_user_activities(
                 user_email=user_email,
                 start_time=activation.activation_time,
-                end_time=end_time,
+                end_time=self._elevation_end(activation),
             )
 
             # Assess alignment
@@ -291,11 +302,10 @@ Type 'scan' to detect PIM activations, ask questions, or 'exit' to quit.
             self.console.print(f"\n[bold]🔍 Assessing {activation.user_email}...[/bold]")
 
             try:
-                end_time = datetime.now()
                 activities = self.activity_correlator.get_user_activities(
                     user_email=activation.user_email,
                     start_time=activation.activation_time,
-                    end_time=end_time,
+                    end_time=self._elevation_end(activation),
                 )
 
                 assessment = self.risk_assessor.assess_alignment(
@@ -356,6 +366,21 @@ Type 'scan' to detect PIM activations, ask questions, or 'exit' to quit.
                 return activation
         return None
 
+    def _elevation_end(self, activation: PIMActivation) -> datetime:
+        """
+        Get the end of an activation's elevation window.
+
+        Args:
+            activation: PIM activation
+
+        Returns:
+            Recorded end time, capped at now (UTC)
+        """
+        now = datetime.now(timezone.utc)
+        if activation.end_time is not None:
+            return min(activation.end_time, now)
+        return now
+
     def _format_time_ago(self, timestamp: datetime) -> str:
         """
         Format timestamp as relative time.
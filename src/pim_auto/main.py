@@ -2,6 +2,7 @@
 
 import logging
 import sys
+from datetime import timedelta
 from pathlib import Path
 from typing import Optional
 
@@ -10,12 +11,14 @@ import click
 from pim_auto.azure.auth import get_azure_credential
 from pim_auto.azure.log_analytics import LogAnalyticsClient
 from pim_auto.azure.openai_client import OpenAIClient
+from pim_auto.azure.rate_limiter import RateLimiter, RetryPolicy
 from pim_auto.config import Config
 from pim_auto.interfaces.batch_runner import BatchRunner
 from pim_auto.interfaces.interactive_cli import InteractiveCLI
 from pim_auto.monitoring.app_insights import ApplicationInsightsMonitor
-from pim_auto.monitoring.health import HealthCheck
+from pim_auto.monitoring.health import run_health_check
 from pim_auto.monitoring.logging import StructuredLogger
+from pim_auto.monitoring.tracing import create_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +62,10 @@ def main(
     detailed_health: bool,
 ) -> int:
     """Main application entry point."""
+    if mode.lower() == "health":
+        # Health probes need neither clients nor telemetry
+        return run_health_check(detailed=detailed_health)
+
     try:
         # Load and validate configuration
         config = Config.from_environment()
@@ -90,7 +97,18 @@ def main(
         credential = get_azure_credential()
 
         log_analytics = LogAnalyticsClient(
-            workspace_id=config.log_analytics_workspace_id, credential=credential
+            workspace_id=config.log_analytics_workspace_id,
+            credential=credential,
+            retry_policy=RetryPolicy(max_retries=config.log_analytics_max_retries),
+            chunk_size=(
+                timedelta(hours=config.log_analytics_chunk_hours)
+                if config.log_analytics_chunk_hours
+                else None
+            ),
+            max_chunk_workers=config.log_analytics_chunk_concurrency,
+            additional_workspace_ids=config.log_analytics_additional_workspace_ids,
+            endpoint=config.log_analytics_endpoint,
+            max_concurrent_queries=config.log_analytics_max_concurrency,
         )
 
         openai_client = OpenAIClient(
@@ -98,32 +116,34 @@ def main(
             deployment=config.azure_openai_deployment,
             api_version=config.azure_openai_api_version,
             credential=credential,
+            rate_limiter=(
+                RateLimiter(
+                    requests_per_minute=config.openai_requests_per_minute,
+                    tokens_per_minute=config.openai_tokens_per_minute,
+                )
+                if config.openai_requests_per_minute or config.openai_tokens_per_minute
+                else None
+            ),
+            retry_policy=RetryPolicy(max_retries=config.openai_max_retries),
         )
 
         logger.info("Azure clients initialized successfully")
 
-        # Initialize health check
-        health_check = HealthCheck(
-            workspace_id=config.log_analytics_workspace_id,
-            credential=credential,
-            openai_endpoint=config.azure_openai_endpoint,
-        )
-
         # Route to appropriate interface
-        if mode.lower() == "health":
-            logger.info("Running health check")
-            health_result = health_check.check_health(detailed=detailed_health)
-            import json
-
-            print(json.dumps(health_result, indent=2))
-            return 0 if health_result["status"] in ["healthy", "degraded"] else 1
-        elif mode.lower() == "batch":
+        if mode.lower() == "batch":
             logger.info("Running in batch mode")
-            runner = BatchRunner(log_analytics, openai_client, config)
+            tracer = create_tracer(
+                config.trace_exporter,
+                file_path=config.trace_file_path,
+                connection_string=config.app_insights_connection_string,
+            )
+            runner = BatchRunner(
+                log_analytics, openai_client, config, monitor=monitor, tracer=tracer
+            )
             return runner.run(hours=hours, output_path=output)
         else:
             logger.info("Running in interactive mode")
-            cli = InteractiveCLI(log_analytics, openai_client, config)
+            cli = InteractiveCLI(log_analytics, openai_client, config, monitor=monitor)
             return cli.run()
 
     except Exception as e:
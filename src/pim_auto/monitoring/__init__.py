@@ -1,5 +1,14 @@
 """Monitoring and observability module."""
 
-from pim_auto.monitoring.app_insights import ApplicationInsightsMonitor
+from typing import Any
 
 __all__ = ["ApplicationInsightsMonitor"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import ApplicationInsightsMonitor on first use, keeping opencensus out of light imports."""
+    if name == "ApplicationInsightsMonitor":
+        from pim_auto.monitoring.app_insights import ApplicationInsightsMonitor
+
+        return ApplicationInsightsMonitor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,10 +10,151 @@ from opencensus.stats import aggregation as aggregation_module
 from opencensus.stats import measure as measure_module
 from opencensus.stats import stats as stats_module
 from opencensus.stats import view as view_module
+from opencensus.tags import tag_key as tag_key_module
 from opencensus.tags import tag_map as tag_map_module
+from opencensus.tags import tag_value as tag_value_module
 
 logger = logging.getLogger(__name__)
 
+# Individual observations for Application Insights, kept off the console
+measurement_logger = logging.getLogger(f"{__name__}.measurements")
+measurement_logger.propagate = False
+measurement_logger.setLevel(logging.INFO)
+
+QUERY_TYPE_KEY = tag_key_module.TagKey("query_type")
+STAGE_KEY = tag_key_module.TagKey("stage")
+OUTCOME_KEY = tag_key_module.TagKey("outcome")
+
+# Histogram bucket boundaries
+LATENCY_BOUNDARIES_MS = [
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1000.0,
+    2500.0,
+    5000.0,
+    10000.0,
+    30000.0,
+    60000.0,
+    120000.0,
+]
+TOKEN_BOUNDARIES = [100.0, 250.0, 500.0, 1000.0, 2000.0, 4000.0, 8000.0, 16000.0, 32000.0]
+
+
+def _tag_map(key: tag_key_module.TagKey, value: str, outcome: str) -> tag_map_module.TagMap:
+    """Build the tags of one measurement."""
+    tmap = tag_map_module.TagMap()
+    tmap.insert(key, tag_value_module.TagValue(value))
+    tmap.insert(OUTCOME_KEY, tag_value_module.TagValue(outcome))
+    return tmap
+
+
+# Custom measures, defined once: the stats recorder only accepts the first
+# measure registered under each name
+PIM_ACTIVATIONS_MEASURE = measure_module.MeasureInt(
+    "pim_activations_detected",
+    "Number of PIM activations detected",
+    "activations",
+)
+
+ACTIVITIES_MEASURE = measure_module.MeasureInt(
+    "user_activities_found", "Number of activities found per user", "activities"
+)
+
+QUERY_DURATION_MEASURE = measure_module.MeasureFloat(
+    "query_duration_ms", "Query execution duration", "milliseconds"
+)
+
+OPENAI_CALLS_MEASURE = measure_module.MeasureInt(
+    "openai_api_calls", "Number of OpenAI API calls", "calls"
+)
+
+OPENAI_DURATION_MEASURE = measure_module.MeasureFloat(
+    "openai_call_duration_ms", "OpenAI API call duration", "milliseconds"
+)
+
+OPENAI_PROMPT_TOKENS_MEASURE = measure_module.MeasureInt(
+    "openai_prompt_tokens", "Prompt tokens per OpenAI API call", "tokens"
+)
+
+OPENAI_COMPLETION_TOKENS_MEASURE = measure_module.MeasureInt(
+    "openai_completion_tokens", "Completion tokens per OpenAI API call", "tokens"
+)
+
+STAGE_DURATION_MEASURE = measure_module.MeasureFloat(
+    "stage_duration_ms", "Pipeline stage duration", "milliseconds"
+)
+
+# Metric views, registered once per process
+VIEWS = [
+    # PIM activations count view
+    view_module.View(
+        "pim_activations_view",
+        "Number of PIM activations detected",
+        [],
+        PIM_ACTIVATIONS_MEASURE,
+        aggregation_module.SumAggregation(),
+    ),
+    # Activities count view
+    view_module.View(
+        "activities_view",
+        "Number of activities found per user",
+        [],
+        ACTIVITIES_MEASURE,
+        aggregation_module.SumAggregation(),
+    ),
+    # Query duration histogram
+    view_module.View(
+        "query_duration_view",
+        "Query execution duration",
+        [QUERY_TYPE_KEY, OUTCOME_KEY],
+        QUERY_DURATION_MEASURE,
+        aggregation_module.DistributionAggregation(LATENCY_BOUNDARIES_MS),
+    ),
+    # OpenAI API calls view
+    view_module.View(
+        "openai_calls_view",
+        "Number of OpenAI API calls",
+        [STAGE_KEY, OUTCOME_KEY],
+        OPENAI_CALLS_MEASURE,
+        aggregation_module.CountAggregation(),
+    ),
+    # OpenAI call duration histogram
+    view_module.View(
+        "openai_duration_view",
+        "OpenAI API call duration",
+        [STAGE_KEY, OUTCOME_KEY],
+        OPENAI_DURATION_MEASURE,
+        aggregation_module.DistributionAggregation(LATENCY_BOUNDARIES_MS),
+    ),
+    # OpenAI token histograms
+    view_module.View(
+        "openai_prompt_tokens_view",
+        "Prompt tokens per OpenAI API call",
+        [STAGE_KEY, OUTCOME_KEY],
+        OPENAI_PROMPT_TOKENS_MEASURE,
+        aggregation_module.DistributionAggregation(TOKEN_BOUNDARIES),
+    ),
+    view_module.View(
+        "openai_completion_tokens_view",
+        "Completion tokens per OpenAI API call",
+        [STAGE_KEY, OUTCOME_KEY],
+        OPENAI_COMPLETION_TOKENS_MEASURE,
+        aggregation_module.DistributionAggregation(TOKEN_BOUNDARIES),
+    ),
+    # Pipeline stage duration histogram
+    view_module.View(
+        "stage_duration_view",
+        "Pipeline stage duration",
+        [STAGE_KEY, OUTCOME_KEY],
+        STAGE_DURATION_MEASURE,
+        aggregation_module.DistributionAggregation(LATENCY_BOUNDARIES_MS),
+    ),
+]
+
 
 class ApplicationInsightsMonitor:
     """Application Insights monitoring and metrics collection."""
@@ -43,24 +184,16 @@ class ApplicationInsightsMonitor:
         self.view_manager = self.stats.view_manager
         self.stats_recorder = self.stats.stats_recorder
 
-        # Define custom measures
-        self.pim_activations_measure = measure_module.MeasureInt(
-            "pim_activations_detected",
-            "Number of PIM activations detected",
-            "activations",
-        )
-
-        self.activities_measure = measure_module.MeasureInt(
-            "user_activities_found", "Number of activities found per user", "activities"
-        )
-
-        self.query_duration_measure = measure_module.MeasureFloat(
-            "query_duration_ms", "Query execution duration", "milliseconds"
-        )
-
-        self.openai_calls_measure = measure_module.MeasureInt(
-            "openai_api_calls", "Number of OpenAI API calls", "calls"
-        )
+        # Custom measures
+        self.pim_activations_measure = PIM_ACTIVATIONS_MEASURE
+        self.activities_measure = ACTIVITIES_MEASURE
+        self.query_duration_measure = QUERY_DURATION_MEASURE
+        self.openai_calls_measure = OPENAI_CALLS_MEASURE
+        self.openai_duration_measure = OPENAI_DURATION_MEASURE
+        self.openai_prompt_tokens_measure = OPENAI_PROMPT_TOKENS_MEASURE
+        self.openai_completion_tokens_measure = OPENAI_COMPLETION_TOKENS_MEASURE
+        self.stage_duration_measure = STAGE_DURATION_MEASURE
+        self._log_handler: Optional[logging.Handler] = None
 
         if self.enabled:
             self._setup_metrics_exporter()
@@ -80,46 +213,8 @@ class ApplicationInsightsMonitor:
 
     def _register_views(self) -> None:
         """Register metric views for aggregation."""
-        # PIM activations count view
-        pim_view = view_module.View(
-            "pim_activations_view",
-            "Number of PIM activations detected",
-            [],
-            self.pim_activations_measure,
-            aggregation_module.SumAggregation(),
-        )
-
-        # Activities count view
-        activities_view = view_module.View(
-            "activities_view",
-            "Number of activities found per user",
-            [],
-            self.activities_measure,
-            aggregation_module.SumAggregation(),
-        )
-
-        # Query duration view
-        query_duration_view = view_module.View(
-            "query_duration_view",
-            "Query execution duration",
-            [],
-            self.query_duration_measure,
-            aggregation_module.LastValueAggregation(),
-        )
-
-        # OpenAI API calls view
-        openai_view = view_module.View(
-            "openai_calls_view",
-            "Number of OpenAI API calls",
-            [],
-            self.openai_calls_measure,
-            aggregation_module.CountAggregation(),
-        )
-
-        self.view_manager.register_view(pim_view)
-        self.view_manager.register_view(activities_view)
-        self.view_manager.register_view(query_duration_view)
-        self.view_manager.register_view(openai_view)
+        for view in VIEWS:
+            self.view_manager.register_view(view)
 
         logger.info("Application Insights metric views registered")
 
@@ -161,53 +256,179 @@ class ApplicationInsightsMonitor:
         except Exception as e:
             logger.warning(f"Failed to track user activities: {e}")
 
-    def track_query_duration(self, duration_ms: float, query_type: str) -> None:
+    def track_query_duration(
+        self, duration_ms: float, query_type: str, outcome: str = "success"
+    ) -> None:
         """
         Track query execution duration.
 
         Args:
             duration_ms: Query duration in milliseconds
             query_type: Type of query (e.g., 'pim_detection', 'activity_correlation')
+            outcome: 'success' or 'failure'
         """
         if not self.enabled:
             return
 
         try:
             mmap = self.stats_recorder.new_measurement_map()
-            tmap = tag_map_module.TagMap()
+            tmap = _tag_map(QUERY_TYPE_KEY, query_type, outcome)
             mmap.measure_float_put(self.query_duration_measure, duration_ms)
             mmap.record(tmap)
+            self._log_measurement(
+                "query_duration_ms", duration_ms, query_type=query_type, outcome=outcome
+            )
             logger.debug(f"Tracked {query_type} query duration: {duration_ms}ms")
         except Exception as e:
             logger.warning(f"Failed to track query duration: {e}")
 
-    def track_openai_call(self) -> None:
-        """Track an OpenAI API call."""
+    def track_openai_call(self, request_type: str = "assessment", outcome: str = "success") -> None:
+        """
+        Track an OpenAI API call.
+
+        Args:
+            request_type: Type of request, recorded as the stage tag
+            outcome: 'success' or 'failure'
+        """
         if not self.enabled:
             return
 
         try:
             mmap = self.stats_recorder.new_measurement_map()
-            tmap = tag_map_module.TagMap()
+            tmap = _tag_map(STAGE_KEY, request_type, outcome)
             mmap.measure_int_put(self.openai_calls_measure, 1)
             mmap.record(tmap)
             logger.debug("Tracked OpenAI API call")
         except Exception as e:
             logger.warning(f"Failed to track OpenAI call: {e}")
 
+    def track_openai_duration(
+        self, duration_ms: float, request_type: str, outcome: str = "success"
+    ) -> None:
+        """
+        Track OpenAI API call duration.
+
+        Args:
+            duration_ms: Call duration in milliseconds
+            request_type: Type of request (e.g., 'assessment', 'assessment_batch')
+            outcome: 'success' or 'failure'
+        """
+        if not self.enabled:
+            return
+
+        try:
+            mmap = self.stats_recorder.new_measurement_map()
+            tmap = _tag_map(STAGE_KEY, request_type, outcome)
+            mmap.measure_float_put(self.openai_duration_measure, duration_ms)
+            mmap.record(tmap)
+            self._log_measurement(
+                "openai_call_duration_ms", duration_ms, stage=request_type, outcome=outcome
+            )
+            logger.debug(f"Tracked {request_type} OpenAI call duration: {duration_ms}ms")
+        except Exception as e:
+            logger.warning(f"Failed to track OpenAI call duration: {e}")
+
+    def track_openai_tokens(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        request_type: str,
+        outcome: str = "success",
+    ) -> None:
+        """
+        Track token usage of an OpenAI API call.
+
+        Args:
+            prompt_tokens: Prompt tokens reported by the service
+            completion_tokens: Completion tokens reported by the service
+            request_type: Type of request (e.g., 'assessment', 'assessment_batch')
+            outcome: 'success' or 'failure'
+        """
+        if not self.enabled:
+            return
+
+        try:
+            mmap = self.stats_recorder.new_measurement_map()
+            tmap = _tag_map(STAGE_KEY, request_type, outcome)
+            mmap.measure_int_put(self.openai_prompt_tokens_measure, prompt_tokens)
+            mmap.measure_int_put(self.openai_completion_tokens_measure, completion_tokens)
+            mmap.record(tmap)
+            self._log_measurement(
+                "openai_prompt_tokens", prompt_tokens, stage=request_type, outcome=outcome
+            )
+            self._log_measurement(
+                "openai_completion_tokens", completion_tokens, stage=request_type, outcome=outcome
+            )
+            logger.debug(
+                f"Tracked {request_type} OpenAI tokens: {prompt_tokens} prompt, "
+                f"{completion_tokens} completion"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to track OpenAI tokens: {e}")
+
+    def track_stage_duration(
+        self, duration_ms: float, stage: str, outcome: str = "success"
+    ) -> None:
+        """
+        Track pipeline stage duration.
+
+        Args:
+            duration_ms: Stage duration in milliseconds
+            stage: Pipeline stage (e.g., 'detection', 'report')
+            outcome: 'success' or 'failure'
+        """
+        if not self.enabled:
+            return
+
+        try:
+            mmap = self.stats_recorder.new_measurement_map()
+            tmap = _tag_map(STAGE_KEY, stage, outcome)
+            mmap.measure_float_put(self.stage_duration_measure, duration_ms)
+            mmap.record(tmap)
+            self._log_measurement("stage_duration_ms", duration_ms, stage=stage, outcome=outcome)
+            logger.debug(f"Tracked {stage} stage duration: {duration_ms}ms")
+        except Exception as e:
+            logger.warning(f"Failed to track stage duration: {e}")
+
+    def _log_measurement(self, metric: str, value: float, **tags: str) -> None:
+        """
+        Send one observation to Application Insights as a trace.
+
+        The Azure metrics exporter drops distribution views, so individual
+        observations are also logged, with the metric name, value and tags as
+        custom dimensions, for percentiles to be computed in Log Analytics.
+        They only go to the latest handler from ``get_log_handler``, not the
+        console.
+        """
+        measurement_logger.info(
+            "measurement",
+            extra={"custom_dimensions": {"metric": metric, "value": value, **tags}},
+        )
+
     def get_log_handler(self) -> Optional[logging.Handler]:
         """
         Get Azure Log Handler for logging integration.
 
+        The handler is created once per monitor. Measurement traces go to the
+        most recently created handler only, so each is exported once however
+        many monitors are set up.
+
         Returns:
             AzureLogHandler if enabled, None otherwise
         """
         if not self.enabled or not self.connection_string:
             return None
+        if self._log_handler is not None:
+            return self._log_handler
 
         try:
             handler = AzureLogHandler(connection_string=self.connection_string)
             handler.setLevel(logging.INFO)
+            # Replace, not stack, the handler of an earlier monitor
+            for previous in list(measurement_logger.handlers):
+                measurement_logger.removeHandler(previous)
+            measurement_logger.addHandler(handler)
+            self._log_handler = handler
             logger.info("Application Insights log handler created")
             return handler
         except Exception as e:
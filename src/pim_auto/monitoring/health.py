@@ -1,32 +1,52 @@
-"""Health check endpoint for monitoring and orchestration."""
+"""
+Health check endpoint for monitoring and orchestration.
 
+Run ``python -m pim_auto.monitoring.health`` for a container health probe:
+it only loads the configuration, and imports the Azure SDK only for the
+detailed check, which needs a credential.
+"""
+
+import json
 import logging
+import sys
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from pim_auto.config import Config, is_secure_endpoint
 
-from azure.core.credentials import TokenCredential
+if TYPE_CHECKING:
+    from azure.core.credentials import TokenCredential
 
 logger = logging.getLogger(__name__)
 
 
+def _is_workspace_id(value: str) -> bool:
+    """Check whether a value has the shape of a workspace ID (GUID)."""
+    return len(value) == 36 and value.count("-") == 4
+
+
 class HealthCheck:
     """Health check functionality for the application."""
 
     def __init__(
         self,
         workspace_id: str,
-        credential: TokenCredential,
+        credential: Optional["TokenCredential"],
         openai_endpoint: str,
+        additional_workspace_ids: Optional[Sequence[str]] = None,
     ):
         """
         Initialize health check.
 
         Args:
             workspace_id: Log Analytics workspace ID
-            credential: Azure credential for authentication
+            credential: Azure credential for authentication (None skips the
+                authentication check)
             openai_endpoint: Azure OpenAI endpoint
+            additional_workspace_ids: Further Log Analytics workspaces queried
         """
         self.workspace_id = workspace_id
+        self.additional_workspace_ids = list(additional_workspace_ids or [])
         self.credential = credential
         self.openai_endpoint = openai_endpoint
         self.startup_time = datetime.utcnow()
@@ -81,6 +101,12 @@ class HealthCheck:
 
     def _check_authentication(self) -> Dict[str, Any]:
         """Check Azure authentication."""
+        if self.credential is None:
+            return {
+                "status": "degraded",
+                "message": "Azure authentication not checked",
+            }
+
         try:
             # Attempt to get a token (doesn't actually call service)
             # This validates the credential is properly configured
@@ -111,17 +137,28 @@ class HealthCheck:
             }
 
         # Validate workspace ID format (GUID)
-        if len(self.workspace_id) != 36 or self.workspace_id.count("-") != 4:
+        if not _is_workspace_id(self.workspace_id):
             return {
                 "status": "unhealthy",
                 "message": "Invalid workspace ID format",
             }
 
-        return {
+        invalid = [ws for ws in self.additional_workspace_ids if not _is_workspace_id(ws)]
+        if invalid:
+            return {
+                "status": "unhealthy",
+                "message": f"Invalid additional workspace ID format ({len(invalid)} of "
+                f"{len(self.additional_workspace_ids)})",
+            }
+
+        result: Dict[str, Any] = {
             "status": "healthy",
             "message": "Log Analytics configured",
             "workspace_id": self.workspace_id[:8] + "...",  # Partial ID for security
         }
+        if self.additional_workspace_ids:
+            result["additional_workspaces"] = len(self.additional_workspace_ids)
+        return result
 
     def _check_openai(self) -> Dict[str, Any]:
         """Check Azure OpenAI configuration."""
@@ -131,7 +168,7 @@ class HealthCheck:
                 "message": "OpenAI endpoint not configured",
             }
 
-        if not self.openai_endpoint.startswith("https://"):
+        if not is_secure_endpoint(self.openai_endpoint):
             return {
                 "status": "unhealthy",
                 "message": "Invalid OpenAI endpoint format",
@@ -161,3 +198,50 @@ class HealthCheck:
             Always returns True if code is executing
         """
         return True
+
+
+def run_health_check(detailed: bool = False) -> int:
+    """
+    Check health from the environment configuration and print the result as JSON.
+
+    No Log Analytics or OpenAI clients are built; the Azure credential is only
+    created for the detailed check.
+
+    Args:
+        detailed: Whether to include detailed component checks
+
+    Returns:
+        Exit code (0 for healthy or degraded, 1 otherwise)
+    """
+    try:
+        config = Config.from_environment()
+        config.validate()
+    except ValueError as e:
+        print(json.dumps({"status": "unhealthy", "message": str(e)}, indent=2))
+        return 1
+
+    credential = None
+    if detailed:
+        from pim_auto.azure.auth import get_azure_credential
+
+        credential = get_azure_credential()
+
+    health_check = HealthCheck(
+        workspace_id=config.log_analytics_workspace_id,
+        credential=credential,
+        openai_endpoint=config.azure_openai_endpoint,
+        additional_workspace_ids=config.log_analytics_additional_workspace_ids,
+    )
+    health_result = health_check.check_health(detailed=detailed)
+    print(json.dumps(health_result, indent=2))
+    return 0 if health_result["status"] in ["healthy", "degraded"] else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point of the health probe."""
+    args = sys.argv[1:] if argv is None else argv
+    return run_health_check(detailed="--detailed" in args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Timing instrumentation for pipeline stages, queries and OpenAI calls."""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, ContextManager, Dict, Iterator, Optional, Protocol, Tuple
+
+from pim_auto.monitoring.tracing import KIND_CLIENT, KIND_INTERNAL, Span, Tracer
+
+logger = logging.getLogger(__name__)
+
+# Outcome tag values
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILURE = "failure"
+
+# Pipeline stages timed by BatchRunner
+STAGE_DETECTION = "detection"
+STAGE_CORRELATION = "correlation"
+STAGE_REPORT = "report"
+
+
+class MetricsSink(Protocol):
+    """Metrics methods used by StageTimer (implemented by ApplicationInsightsMonitor)."""
+
+    def track_pim_activations(self, count: int) -> None:
+        """Track number of PIM activations detected."""
+
+    def track_user_activities(self, count: int) -> None:
+        """Track number of activities found for a user."""
+
+    def track_query_duration(
+        self, duration_ms: float, query_type: str, outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Track query execution duration."""
+
+    def track_openai_call(
+        self, request_type: str = "assessment", outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Track an OpenAI API call."""
+
+    def track_openai_duration(
+        self, duration_ms: float, request_type: str, outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Track OpenAI API call duration."""
+
+    def track_openai_tokens(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        request_type: str,
+        outcome: str = OUTCOME_SUCCESS,
+    ) -> None:
+        """Track token usage of an OpenAI API call."""
+
+    def track_stage_duration(
+        self, duration_ms: float, stage: str, outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Track pipeline stage duration."""
+
+
+class NullMonitor:
+    """Metrics sink that discards everything, used when monitoring is disabled."""
+
+    enabled = False
+
+    def track_pim_activations(self, count: int) -> None:
+        """Discard a PIM activation count."""
+
+    def track_user_activities(self, count: int) -> None:
+        """Discard a user activity count."""
+
+    def track_query_duration(
+        self, duration_ms: float, query_type: str, outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Discard a query duration."""
+
+    def track_openai_call(
+        self, request_type: str = "assessment", outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Discard an OpenAI call."""
+
+    def track_openai_duration(
+        self, duration_ms: float, request_type: str, outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Discard an OpenAI call duration."""
+
+    def track_openai_tokens(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        request_type: str,
+        outcome: str = OUTCOME_SUCCESS,
+    ) -> None:
+        """Discard OpenAI token usage."""
+
+    def track_stage_duration(
+        self, duration_ms: float, stage: str, outcome: str = OUTCOME_SUCCESS
+    ) -> None:
+        """Discard a stage duration."""
+
+
+@dataclass
+class OpenAIUsage:
+    """Token usage reported by the OpenAI calls inside one ``openai_call`` block."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+_current_usage: ContextVar[Optional[OpenAIUsage]] = ContextVar("openai_usage", default=None)
+
+
+def record_openai_usage(prompt_tokens: int, completion_tokens: int) -> None:
+    """
+    Report token usage of a completion to the enclosing ``openai_call`` block.
+
+    Called by the OpenAI clients, which see the usage the service reports;
+    does nothing outside an ``openai_call`` block.
+
+    Args:
+        prompt_tokens: Prompt tokens of the completion
+        completion_tokens: Completion tokens of the completion
+    """
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+
+
+class StageTimer:
+    """
+    Times pipeline work and records it to a metrics sink.
+
+    Each context manager records its duration and outcome ('success', or
+    'failure' when the block raised) when the block exits, and also adds the
+    duration to in-process totals so a run can log where its time went. When
+    the tracer is enabled, each block is also a span of the current trace.
+    The context managers work as decorators too, e.g.
+    ``@timer.stage("report")``. A timer is safe to share between threads.
+
+    Args:
+        monitor: Metrics sink (default: NullMonitor, which only keeps totals)
+        tracer: Tracer for spans (default: disabled)
+    """
+
+    def __init__(self, monitor: Optional[MetricsSink] = None, tracer: Optional[Tracer] = None):
+        self.monitor: MetricsSink = monitor if monitor is not None else NullMonitor()
+        self.tracer = tracer or Tracer()
+        self._totals: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, key: str, duration_ms: float) -> None:
+        """Add one timed call to the totals."""
+        with self._lock:
+            count, total = self._totals.get(key, (0, 0.0))
+            self._totals[key] = (count + 1, total + duration_ms)
+
+    @contextmanager
+    def _timed(self, key: str, kind: str, record: Callable[[float, str], None]) -> Iterator[Span]:
+        """Time a block in a span and pass its duration and outcome to ``record``."""
+        with self.tracer.span(key, kind) as span:
+            started = time.perf_counter()
+            outcome = OUTCOME_SUCCESS
+            try:
+                yield span
+            except BaseException:
+                outcome = OUTCOME_FAILURE
+                raise
+            finally:
+                duration_ms = (time.perf_counter() - started) * 1000
+                self._add(key, duration_ms)
+                record(duration_ms, outcome)
+
+    def stage(self, name: str) -> ContextManager[Span]:
+        """
+        Time a pipeline stage.
+
+        Args:
+            name: Stage name (e.g., STAGE_DETECTION)
+        """
+        return self._timed(
+            f"stage:{name}",
+            KIND_INTERNAL,
+            lambda duration_ms, outcome: self.monitor.track_stage_duration(
+                duration_ms, name, outcome
+            ),
+        )
+
+    def query(self, query_type: str) -> ContextManager[Span]:
+        """
+        Time a Log Analytics query, including reading its results.
+
+        Args:
+            query_type: Type of query (e.g., 'pim_detection', 'activity_correlation')
+        """
+        return self._timed(
+            f"query:{query_type}",
+            KIND_CLIENT,
+            lambda duration_ms, outcome: self.monitor.track_query_duration(
+                duration_ms, query_type, outcome
+            ),
+        )
+
+    @contextmanager
+    def openai_call(self, request_type: str) -> Iterator[Span]:
+        """
+        Time an OpenAI API call and record the token usage it reports.
+
+        Args:
+            request_type: Type of request (e.g., 'assessment', 'assessment_batch')
+
+        Yields:
+            The call's span
+        """
+        usage = OpenAIUsage()
+
+        def record(duration_ms: float, outcome: str) -> None:
+            self.monitor.track_openai_call(request_type, outcome)
+            self.monitor.track_openai_duration(duration_ms, request_type, outcome)
+            if usage.prompt_tokens or usage.completion_tokens:
+                self.monitor.track_openai_tokens(
+                    usage.prompt_tokens, usage.completion_tokens, request_type, outcome
+                )
+
+        token = _current_usage.set(usage)
+        try:
+            with self._timed(f"openai:{request_type}", KIND_CLIENT, record) as span:
+                try:
+                    yield span
+                finally:
+                    if usage.prompt_tokens or usage.completion_tokens:
+                        span.set_attribute("prompt_tokens", usage.prompt_tokens)
+                        span.set_attribute("completion_tokens", usage.completion_tokens)
+        finally:
+            _current_usage.reset(token)
+
+    @property
+    def totals(self) -> Dict[str, Tuple[int, float]]:
+        """(call count, total milliseconds) per timed key, e.g. ``query:pim_detection``."""
+        with self._lock:
+            return dict(self._totals)
+
+    def summary(self) -> str:
+        """Format the totals for a log line, slowest first."""
+        totals = sorted(self.totals.items(), key=lambda item: item[1][1], reverse=True)
+        return ", ".join(f"{key}={total:.0f}ms/{count}" for key, (count, total) in totals)
@@ -0,0 +1,293 @@
+"""Lightweight tracing of batch runs, exportable to a file or Application Insights."""
+
+import json
+import logging
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Protocol, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Span kinds, mapped to Application Insights requests (server) and dependencies
+KIND_SERVER = "server"
+KIND_CLIENT = "client"
+KIND_INTERNAL = "internal"
+
+_attribute_lock = threading.Lock()
+
+
+@dataclass
+class Span:
+    """
+    One timed operation of a trace.
+
+    Attributes:
+        name: Operation name, e.g. ``query:activity_correlation``
+        trace_id: 32 hex digit ID shared by all spans of a trace
+        span_id: 16 hex digit ID of this span
+        parent_id: Span ID of the parent, None for the root span
+        kind: KIND_SERVER, KIND_CLIENT or KIND_INTERNAL
+        start_time: When the operation started (UTC)
+        end_time: When the operation ended (None while running)
+        attributes: Details such as row counts, token usage and retries
+        error: "<type>: <message>" of the exception that ended the span, if any
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: str = KIND_INTERNAL
+    start_time: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    end_time: Optional[datetime] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Duration in milliseconds, or None while the span is running."""
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time).total_seconds() * 1000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set one attribute."""
+        with _attribute_lock:
+            self.attributes[key] = value
+
+    def increment(self, key: str, amount: int = 1) -> None:
+        """Add to a counter attribute, safely across threads."""
+        with _attribute_lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        with _attribute_lock:
+            attributes = dict(self.attributes)
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_time": self.start_time.isoformat(),
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "duration_ms": self.duration_ms,
+            "attributes": attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan(Span):
+    """Span handed out by a disabled tracer; records nothing."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore the attribute."""
+
+    def increment(self, key: str, amount: int = 1) -> None:
+        """Ignore the counter."""
+
+
+NOOP_SPAN = _NoopSpan(name="noop", trace_id="0" * 32, span_id="0" * 16)
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """Get the innermost active span of the current context, if any."""
+    return _current_span.get()
+
+
+def set_span_attribute(key: str, value: Any) -> None:
+    """Set an attribute on the active span; does nothing when no span is active."""
+    span = _current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+
+def increment_span_attribute(key: str, amount: int = 1) -> None:
+    """Add to a counter attribute of the active span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.increment(key, amount)
+
+
+class SpanExporter(Protocol):
+    """Receives finished spans."""
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Export finished spans."""
+
+
+class FileSpanExporter:
+    """
+    Appends finished spans to a JSON Lines file.
+
+    Args:
+        path: File to append to (parent directories are created)
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Append spans to the file, one JSON object per line."""
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+class AppInsightsSpanExporter:
+    """
+    Sends finished spans to Application Insights.
+
+    The root span becomes a request and the other spans dependencies, so a
+    run shows up as one end-to-end transaction. The opencensus exporter is
+    imported on construction, keeping it out of processes that never trace.
+
+    Args:
+        connection_string: Application Insights connection string
+    """
+
+    def __init__(self, connection_string: str):
+        from opencensus.ext.azure.trace_exporter import AzureExporter
+
+        self._exporter = AzureExporter(connection_string=connection_string)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Queue spans for upload."""
+        self._exporter.export([self._to_span_data(span) for span in spans])
+
+    @staticmethod
+    def _to_span_data(span: Span) -> Any:
+        """Convert a span to opencensus SpanData."""
+        from opencensus.trace import span_context, span_data, status
+        from opencensus.trace.span import SpanKind
+
+        kinds = {KIND_SERVER: SpanKind.SERVER, KIND_CLIENT: SpanKind.CLIENT}
+        attributes = {key: str(value) for key, value in span.to_dict()["attributes"].items()}
+        end_time = span.end_time or span.start_time
+        return span_data.SpanData(
+            name=span.name,
+            context=span_context.SpanContext(trace_id=span.trace_id, span_id=span.span_id),
+            span_id=span.span_id,
+            parent_span_id=span.parent_id,
+            attributes=attributes,
+            start_time=span.start_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            end_time=end_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            child_span_count=0,
+            stack_trace=None,
+            annotations=None,
+            message_events=None,
+            links=None,
+            status=(
+                status.Status(code=2, message=span.error) if span.error else status.Status(code=0)
+            ),
+            same_process_as_parent_span=None,
+            span_kind=kinds.get(span.kind, SpanKind.UNSPECIFIED),
+        )
+
+
+class Tracer:
+    """
+    Creates nested spans and hands them to an exporter when they end.
+
+    The active span is kept in a context variable, so spans opened inside a
+    span become its children. Work submitted to thread pools should run in a
+    copy of the submitting context (``contextvars.copy_context().run``) to
+    stay in the same trace. Without an exporter the tracer is disabled and
+    ``span`` hands out a no-op span at negligible cost.
+
+    Args:
+        exporter: Destination of finished spans (None disables tracing)
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        """Whether spans are recorded."""
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, kind: str = KIND_INTERNAL, **attributes: Any) -> Iterator[Span]:
+        """
+        Open a span for the duration of the block.
+
+        Args:
+            name: Operation name
+            kind: KIND_SERVER, KIND_CLIENT or KIND_INTERNAL
+            **attributes: Initial attributes
+
+        Yields:
+            The span, for adding attributes
+        """
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent is not None else None,
+            kind=kind,
+            attributes=dict(attributes),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_time = datetime.now(timezone.utc)
+            _current_span.reset(token)
+            self._export(span)
+
+    def _export(self, span: Span) -> None:
+        """Export a finished span; failures are logged, never raised."""
+        if self.exporter is None:
+            return
+        try:
+            self.exporter.export([span])
+        except Exception as e:
+            logger.warning(f"Failed to export span {span.name}: {e}")
+
+
+def create_tracer(
+    exporter: Optional[str],
+    file_path: Union[str, Path] = "pim-auto-traces.jsonl",
+    connection_string: Optional[str] = None,
+) -> Tracer:
+    """
+    Build a tracer for the configured exporter.
+
+    Args:
+        exporter: "file", "app_insights", or None to disable tracing
+        file_path: Output file of the file exporter
+        connection_string: Application Insights connection string
+
+    Returns:
+        Tracer (disabled when ``exporter`` is None)
+    """
+    if exporter is None:
+        return Tracer()
+    if exporter == "file":
+        logger.info(f"Writing trace spans to {file_path}")
+        return Tracer(FileSpanExporter(file_path))
+    if exporter == "app_insights":
+        if not connection_string:
+            raise ValueError("Application Insights trace export needs a connection string")
+        logger.info("Exporting trace spans to Application Insights")
+        return Tracer(AppInsightsSpanExporter(connection_string))
+    raise ValueError(f"Unsupported trace exporter: {exporter}")
@@ -3,7 +3,7 @@
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Mapping, Optional, Sequence
 
 from pim_auto.core.activity_correlator import ActivityEvent
 from pim_auto.core.pim_detector import PIMActivation
@@ -18,9 +18,10 @@ class MarkdownGenerator:
     def generate_report(
         self,
         activations: list[PIMActivation],
-        activities_by_user: dict[str, list[ActivityEvent]],
+        activities_by_user: Mapping[str, Sequence[ActivityEvent]],
         assessments_by_user: dict[str, RiskAssessment],
         output_path: Optional[Path] = None,
+        warnings: Sequence[str] = (),
     ) -> str:
         """
         Generate a comprehensive Markdown report.
@@ -30,6 +31,7 @@ class MarkdownGenerator:
             activities_by_user: Dictionary mapping user emails to their activities
             assessments_by_user: Dictionary mapping user emails to risk assessments
             output_path: Optional path to write report file
+            warnings: Data completeness warnings shown below the header
 
         Returns:
             Generated markdown content as string
@@ -38,6 +40,7 @@ class MarkdownGenerator:
 
         sections = [
             self._generate_header(),
+            *([self.generate_warnings(warnings)] if warnings else []),
             self._generate_summary(activations, assessments_by_user),
             self._generate_activations_table(activations),
             self._generate_detailed_analysis(activations, activities_by_user, assessments_by_user),
@@ -57,6 +60,17 @@ class MarkdownGenerator:
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
         return f"# PIM Activity Audit Report\n\n**Generated**: {timestamp}"
 
+    def generate_warnings(self, warnings: Sequence[str]) -> str:
+        """Generate the section listing why the report's data may be incomplete."""
+        lines = [
+            "## Incomplete Data",
+            "",
+            "Some queries returned partial results, so activations or activities may be missing:",
+            "",
+        ]
+        lines.extend(f"- {warning}" for warning in warnings)
+        return "\n".join(lines)
+
     def _generate_summary(
         self,
         activations: list[PIMActivation],
@@ -104,7 +118,7 @@ class MarkdownGenerator:
     def _generate_detailed_analysis(
         self,
         activations: list[PIMActivation],
-        activities_by_user: dict[str, list[ActivityEvent]],
+        activities_by_user: Mapping[str, Sequence[ActivityEvent]],
         assessments_by_user: dict[str, RiskAssessment],
     ) -> str:
         """Generate detailed analysis for each user."""
@@ -122,7 +136,7 @@ class MarkdownGenerator:
     def _generate_user_section(
         self,
         activation: PIMActivation,
-        activities: list[ActivityEvent],
+        activities: Sequence[ActivityEvent],
         assessment: Optional[RiskAssessment],
     ) -> str:
         """Generate detailed section for a single user."""
@@ -195,7 +209,7 @@ class MarkdownGenerator:
 
         return "\n".join(lines)
 
-    def format_activities(self, activities: list[ActivityEvent]) -> str:
+    def format_activities(self, activities: Sequence[ActivityEvent]) -> str:
         """
         Format activities for console output.
 
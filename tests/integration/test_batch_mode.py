@@ -100,10 +100,12 @@ def test_batch_mode_end_to_end(mock_env, sample_data, tmp_path):
     runner.pim_detector.detect_activations = Mock(return_value=activations)
 
     # Mock activity correlator
-    def mock_get_activities(user_email, start_time, end_time):
-        return activities_by_user.get(user_email, [])
+    def mock_get_activities(activations, end_time=None):
+        return [activities_by_user.get(a.user_email, []) for a in activations]
 
-    runner.activity_correlator.get_user_activities = Mock(side_effect=mock_get_activities)
+    runner.activity_correlator.get_activities_for_activations = Mock(
+        side_effect=mock_get_activities
+    )
 
     # Mock risk assessor
     assessment_calls = []
@@ -205,8 +207,10 @@ def test_batch_mode_stdout_output(mock_env, sample_data):
 
     # Mock the detections
     runner.pim_detector.detect_activations = Mock(return_value=activations)
-    runner.activity_correlator.get_user_activities = Mock(
-        side_effect=lambda user_email, start_time, end_time: activities_by_user.get(user_email, [])
+    runner.activity_correlator.get_activities_for_activations = Mock(
+        side_effect=lambda activations, end_time=None: [
+            activities_by_user.get(a.user_email, []) for a in activations
+        ]
     )
     runner.risk_assessor.assess_alignment = Mock(
         side_effect=lambda pim_reason, activities: RiskAssessment(AlignmentLevel.ALIGNED, "Test")
@@ -0,0 +1,43 @@
+"""Tests for the end-to-end batch pipeline benchmarks."""
+
+import pytest
+
+from benchmarks.run_benchmarks import compare_to_baseline, run_scale
+
+BASELINE = [
+    {
+        "activations": 100,
+        "exit_code": 0,
+        "wall_seconds": 2.0,
+        "peak_rss_mb": 100.0,
+        "log_analytics_queries": 2,
+        "openai_calls": 100,
+        "openai_tokens": 60000,
+    }
+]
+
+
+@pytest.mark.slow
+def test_run_scale_measures_batch_run() -> None:
+    """Test a small benchmark run completes and counts its calls."""
+    result = run_scale(10, seed=0)
+
+    assert result["exit_code"] == 0
+    assert result["wall_seconds"] > 0
+    assert result["peak_rss_mb"] > 0
+    assert result["log_analytics_queries"] == 2
+    assert result["openai_calls"] == 10
+    assert result["openai_tokens"] > 0
+
+
+def test_compare_to_baseline() -> None:
+    """Test timing tolerance and strict call counts."""
+    within = dict(BASELINE[0], wall_seconds=2.4, peak_rss_mb=105.0)
+    slower = dict(BASELINE[0], wall_seconds=3.0, openai_calls=101)
+
+    assert compare_to_baseline([within], BASELINE) == []
+    regressions = compare_to_baseline([slower], BASELINE)
+    assert len(regressions) == 2
+    assert "wall_seconds" in regressions[0]
+    assert "openai_calls" in regressions[1]
+    assert compare_to_baseline([dict(slower, activations=10)], BASELINE) == []
@@ -0,0 +1,108 @@
+"""Integration tests running the real clients against the local stand-in server."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.standin_server import (
+    FaultProfile,
+    StandinDataset,
+    StandinServer,
+    parse_timespan,
+    standin_clients,
+)
+from pim_auto.azure.rate_limiter import RetryPolicy
+from pim_auto.config import Config
+from pim_auto.core.activity_correlator import ActivityCorrelator
+from pim_auto.core.pim_detector import PIMDetector
+from pim_auto.core.risk_assessor import AlignmentLevel, RiskAssessor
+from pim_auto.interfaces.batch_runner import BatchRunner
+
+NO_SLEEP = {"retry_policy": RetryPolicy(max_retries=10, sleep=lambda _: None)}
+
+
+@pytest.fixture
+def dataset() -> StandinDataset:
+    """Small synthetic dataset."""
+    return StandinDataset.synthetic(activation_count=6, activities_per_activation=4, seed=1)
+
+
+def test_parse_timespan() -> None:
+    """Test the timespan formats sent by the Logs query SDK."""
+    now = datetime(2026, 2, 10, 12, 0, 0, tzinfo=timezone.utc)
+
+    assert parse_timespan("PT3600.0S", now=now) == (now - timedelta(hours=1), now)
+    assert parse_timespan("2026-02-10T10:00:00.000Z/2026-02-10T11:00:00.000Z") == (
+        datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc),
+        datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc),
+    )
+
+
+def test_detect_correlate_assess(dataset: StandinDataset) -> None:
+    """Test the detection pipeline end to end over HTTP."""
+    with StandinServer(dataset) as server:
+        log_analytics, openai_client = standin_clients(server)
+
+        activations = PIMDetector(log_analytics).detect_activations(hours=24)
+        batches = ActivityCorrelator(log_analytics).get_activities_for_activations(activations)
+        assessment = RiskAssessor(openai_client).assess_alignment(
+            activations[0].activation_reason, list(batches[0])
+        )
+
+    assert len(activations) == 6
+    assert all(activation.end_time is not None for activation in activations)
+    assert sum(len(batch) for batch in batches) >= 24
+    assert assessment.level != AlignmentLevel.UNKNOWN
+    assert server.stats.log_queries == 2
+    assert server.stats.completions == 1
+
+
+def test_injected_throttling_is_retried(dataset: StandinDataset) -> None:
+    """Test injected 429s are retried by the clients' retry policies."""
+    faults = FaultProfile(error_rate=0.5, retry_after_seconds=0)
+    with StandinServer(dataset, logs_faults=faults, openai_faults=faults, seed=3) as server:
+        log_analytics, openai_client = standin_clients(server, NO_SLEEP, NO_SLEEP)
+
+        activations = PIMDetector(log_analytics).detect_activations(hours=24)
+        for activation in activations:
+            RiskAssessor(openai_client).assess_alignment(activation.activation_reason, [])
+
+    assert len(activations) == 6
+    assert server.stats.injected_errors > 0
+    assert server.stats.completions == 6
+
+
+def test_row_limit_returns_partial_results(dataset: StandinDataset) -> None:
+    """Test the row limit produces partial results that split_on_limit recovers from."""
+    user = dataset.activities[0]["Caller"]
+    start = min(a["TimeGenerated"] for a in dataset.activities)
+    end = max(a["TimeGenerated"] for a in dataset.activities)
+    expected = len(dataset.activities_between(user, start, end))
+
+    with StandinServer(dataset, max_rows=4) as server:
+        log_analytics, _ = standin_clients(server)
+        activities = ActivityCorrelator(log_analytics).get_user_activities(user, start, end)
+
+    assert expected > 4
+    assert len(activities) == expected
+    assert server.stats.log_queries > 1
+
+
+def test_batch_runner_against_standin(dataset: StandinDataset, tmp_path) -> None:
+    """Test a full batch run writes a report from stand-in data."""
+    config = Config(
+        azure_openai_endpoint="https://standin.openai.azure.com",
+        azure_openai_deployment="standin",
+        log_analytics_workspace_id="00000000-0000-0000-0000-000000000000",
+    )
+    output = tmp_path / "report.md"
+
+    with StandinServer(dataset) as server:
+        log_analytics, openai_client = standin_clients(server)
+        exit_code = BatchRunner(log_analytics, openai_client, config).run(
+            hours=24, output_path=output
+        )
+
+    assert exit_code == 0
+    assert "user0@contoso.com" in output.read_text()
+    assert server.stats.completions == 6
@@ -1,37 +1,55 @@
 """Tests for activity correlator module."""
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from unittest.mock import Mock
 
 import pytest
 
-from src.pim_auto.core.activity_correlator import ActivityCorrelator, ActivityEvent
+from src.pim_auto.azure.log_analytics import QueryRowStream
+from src.pim_auto.core.activity_correlator import (
+    ActivityBatch,
+    ActivityCorrelator,
+    ActivityEvent,
+)
+from src.pim_auto.core.pim_detector import PIMActivation
+
+
+def _stream_rows(client: Mock, rows: list) -> None:
+    """Make the mock client stream the given row dictionaries as tuples."""
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    client.stream_query.side_effect = lambda query, **kwargs: QueryRowStream(
+        columns, [tuple(row.get(column) for column in columns) for row in rows]
+    )
 
 
 @pytest.fixture
 def mock_log_analytics() -> Mock:
     """Mock Log Analytics client."""
     client = Mock()
-    client.execute_query.return_value = [
-        {
-            "TimeGenerated": datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc),
-            "OperationName": "Create Storage Account",
-            "ResourceProviderValue": "Microsoft.Storage/storageAccounts",
-            "Resource": "mystorageaccount",
-            "ActivityStatusValue": "Success",
-            "ResourceGroup": "rg-production",
-            "SubscriptionId": "abc123-def456-ghi789",
-        },
-        {
-            "TimeGenerated": datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc),
-            "OperationName": "Update Resource Group",
-            "ResourceProviderValue": "Microsoft.Resources/resourceGroups",
-            "Resource": "my-rg",
-            "ActivityStatusValue": "Success",
-            "ResourceGroup": "my-rg",
-            "SubscriptionId": "abc123-def456-ghi789",
-        },
-    ]
+    _stream_rows(
+        client,
+        [
+            {
+                "TimeGenerated": datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc),
+                "OperationName": "Create Storage Account",
+                "OperationNameValue": "MICROSOFT.STORAGE/STORAGEACCOUNTS/WRITE",
+                "ResourceProviderValue": "Microsoft.Storage/storageAccounts",
+                "Resource": "mystorageaccount",
+                "ActivityStatusValue": "Success",
+                "ResourceGroup": "rg-production",
+                "SubscriptionId": "abc123-def456-ghi789",
+            },
+            {
+                "TimeGenerated": datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc),
+                "OperationName": "Update Resource Group",
+                "ResourceProviderValue": "Microsoft.Resources/resourceGroups",
+                "Resource": "my-rg",
+                "ActivityStatusValue": "Success",
+                "ResourceGroup": "my-rg",
+                "SubscriptionId": "abc123-def456-ghi789",
+            },
+        ],
+    )
     return client
 
 
@@ -49,12 +67,14 @@ def test_get_user_activities(mock_log_analytics: Mock) -> None:
     assert len(activities) == 2
     assert activities[0].operation_name == "Create Storage Account"
     assert activities[0].resource_type == "Microsoft.Storage/storageAccounts"
+    assert activities[0].operation_value == "MICROSOFT.STORAGE/STORAGEACCOUNTS/WRITE"
     assert activities[1].operation_name == "Update Resource Group"
+    assert activities[1].operation_value is None
 
 
 def test_get_user_activities_empty(mock_log_analytics: Mock) -> None:
     """Test getting user activities with no results."""
-    mock_log_analytics.execute_query.return_value = []
+    _stream_rows(mock_log_analytics, [])
 
     correlator = ActivityCorrelator(mock_log_analytics)
 
@@ -70,7 +90,7 @@ def test_get_user_activities_empty(mock_log_analytics: Mock) -> None:
 
 def test_get_user_activities_query_format(mock_log_analytics: Mock) -> None:
     """Test that the query is formatted correctly."""
-    mock_log_analytics.execute_query.return_value = []
+    _stream_rows(mock_log_analytics, [])
 
     correlator = ActivityCorrelator(mock_log_analytics)
 
@@ -82,10 +102,13 @@ def test_get_user_activities_query_format(mock_log_analytics: Mock) -> None:
     )
 
     # Verify query contains correct parameters
-    call_args = mock_log_analytics.execute_query.call_args
+    call_args = mock_log_analytics.stream_query.call_args
     query = call_args.kwargs["query"]
     assert "AzureActivity" in query
     assert "test@example.com" in query
+    assert call_args.kwargs["timespan"] == (start_time, datetime(2026, 2, 10, 12, 0, 1))
+    assert call_args.kwargs["split_on_limit"] is True
+    assert call_args.kwargs["chunked"] is True
 
 
 def test_activity_event_dataclass() -> None:
@@ -107,15 +130,87 @@ def test_activity_event_dataclass() -> None:
     assert event.subscription_id == "test-sub-id"
 
 
+def test_activity_event_is_frozen_and_slotted() -> None:
+    """Test ActivityEvent is immutable and has no per-instance dict."""
+    event = ActivityEvent(
+        timestamp=datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc),
+        operation_name="Test Operation",
+        resource_type="Microsoft.Test/resources",
+        resource_name="test-resource",
+        status="Succeeded",
+        resource_group="test-rg",
+        subscription_id="test-sub-id",
+    )
+
+    assert not hasattr(event, "__dict__")
+    with pytest.raises(AttributeError):
+        event.status = "Failed"  # type: ignore[misc]
+
+
+def test_activity_batch_round_trip() -> None:
+    """Test ActivityBatch stores events compactly and returns them unchanged."""
+    events = [
+        ActivityEvent(
+            timestamp=datetime(2026, 2, 10, 10, minute, 0, tzinfo=timezone.utc),
+            operation_name=f"Operation {minute % 2}",
+            resource_type="Microsoft.Storage/storageAccounts",
+            resource_name=f"account{minute}",
+            status="Success",
+            resource_group="rg-production",
+            subscription_id="abc123-def456-ghi789",
+        )
+        for minute in range(10)
+    ]
+
+    batch = ActivityBatch(events)
+
+    assert len(batch) == 10
+    assert list(batch) == events
+    assert batch == events
+    assert batch[3] == events[3]
+    assert batch[-1] == events[-1]
+    assert list(batch[2:4]) == events[2:4]
+    assert list(batch.timestamps) == [event.timestamp for event in events]
+    # 2 operations + 10 resource names + provider, status, group, subscription, operation value
+    assert "17 distinct values" in repr(batch)
+
+
+def test_activity_batch_take_shares_values() -> None:
+    """Test take selects events by position."""
+    batch = ActivityBatch()
+    for minute in range(3):
+        batch.append_values(
+            datetime(2026, 2, 10, 10, minute, 0, tzinfo=timezone.utc),
+            "Read",
+            "Microsoft.Compute/virtualMachines",
+            "vm1",
+            "Success",
+            "rg",
+            None,
+            "Microsoft.Compute/virtualMachines/read",
+        )
+
+    selected = batch.take([2, 0])
+
+    assert [event.timestamp.minute for event in selected] == [2, 0]
+    assert selected[0].subscription_id is None
+    assert selected[0].operation_value == "Microsoft.Compute/virtualMachines/read"
+    with pytest.raises(ValueError):
+        batch.append_values(datetime(2026, 2, 10, tzinfo=timezone.utc), "too few")
+
+
 def test_get_user_activities_missing_fields(mock_log_analytics: Mock) -> None:
     """Test handling of missing optional fields."""
-    mock_log_analytics.execute_query.return_value = [
-        {
-            "TimeGenerated": datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc),
-            "OperationName": "Test Operation",
-            # Missing ResourceProviderValue, Resource, ActivityStatusValue, ResourceGroup, SubscriptionId
-        }
-    ]
+    _stream_rows(
+        mock_log_analytics,
+        [
+            {
+                "TimeGenerated": datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc),
+                "OperationName": "Test Operation",
+                # Missing ResourceProviderValue, Resource, ActivityStatusValue, ResourceGroup, SubscriptionId
+            }
+        ],
+    )
 
     correlator = ActivityCorrelator(mock_log_analytics)
 
@@ -132,3 +227,218 @@ def test_get_user_activities_missing_fields(mock_log_analytics: Mock) -> None:
     assert activities[0].status == "Unknown"
     assert activities[0].resource_group == "Unknown"
     assert activities[0].subscription_id == "Unknown"
+
+
+def _activation(user_email: str, hour: int) -> PIMActivation:
+    return PIMActivation(
+        user_email=user_email,
+        role_name="Contributor",
+        activation_reason="test reason",
+        activation_time=datetime(2026, 2, 10, hour, 0, 0, tzinfo=timezone.utc),
+        duration_hours=24,
+    )
+
+
+def test_get_activities_for_activations_single_query(mock_log_analytics: Mock) -> None:
+    """Test that bulk correlation issues one query and groups rows per activation."""
+    _stream_rows(
+        mock_log_analytics,
+        [
+            {
+                "WindowIndex": 1,
+                "TimeGenerated": datetime(2026, 2, 10, 11, 30, 0, tzinfo=timezone.utc),
+                "OperationName": "Delete Virtual Machine",
+            },
+            {
+                "WindowIndex": 0,
+                "TimeGenerated": datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc),
+                "OperationName": "Create Storage Account",
+            },
+            {
+                "WindowIndex": 0,
+                "TimeGenerated": datetime(2026, 2, 10, 10, 45, 0, tzinfo=timezone.utc),
+                "OperationName": "Update Storage Account",
+            },
+        ],
+    )
+
+    correlator = ActivityCorrelator(mock_log_analytics)
+    activations = [
+        _activation("alice@example.com", 10),
+        _activation("bob@example.com", 11),
+        _activation("carol@example.com", 12),
+    ]
+
+    grouped = correlator.get_activities_for_activations(
+        activations, end_time=datetime(2026, 2, 10, 14, 0, 0, tzinfo=timezone.utc)
+    )
+
+    mock_log_analytics.stream_query.assert_called_once()
+    assert [len(group) for group in grouped] == [2, 1, 0]
+    assert grouped[0][0].operation_name == "Create Storage Account"
+    assert grouped[1][0].operation_name == "Delete Virtual Machine"
+
+
+def test_get_activities_for_activations_query_format(mock_log_analytics: Mock) -> None:
+    """Test that the bulk query embeds every activation window."""
+    _stream_rows(mock_log_analytics, [])
+
+    correlator = ActivityCorrelator(mock_log_analytics)
+    correlator.get_activities_for_activations(
+        [_activation("alice@example.com", 10), _activation('o"brien@example.com', 11)],
+        end_time=datetime(2026, 2, 10, 14, 0, 0, tzinfo=timezone.utc),
+    )
+
+    query = mock_log_analytics.stream_query.call_args.kwargs["query"]
+    assert "datatable(" in query
+    assert "join kind=inner windows on Caller" in query
+    assert '0, "alice@example.com", datetime(2026-02-10T10:00:00+00:00)' in query
+    assert '"o\\"brien@example.com"' in query
+
+
+def test_activity_queries_dedup_overlapping_workspaces(mock_log_analytics: Mock) -> None:
+    """Test events mirrored to several workspaces are collapsed by EventDataId."""
+    _stream_rows(mock_log_analytics, [])
+    correlator = ActivityCorrelator(mock_log_analytics)
+    start_time = datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc)
+
+    correlator.get_user_activities("alice@example.com", start_time, start_time + timedelta(hours=1))
+    correlator.get_activities_for_activations(
+        [_activation("alice@example.com", 10)],
+        end_time=datetime(2026, 2, 10, 14, 0, 0, tzinfo=timezone.utc),
+    )
+
+    single, bulk = (call.kwargs["query"] for call in mock_log_analytics.stream_query.call_args_list)
+    assert "summarize arg_max(TimeGenerated, *) by EventDataId" in single
+    assert bulk.index("by EventDataId") < bulk.index("join kind=inner windows")
+
+
+def test_get_activities_for_activations_empty(mock_log_analytics: Mock) -> None:
+    """Test that no query is issued when there are no activations."""
+    correlator = ActivityCorrelator(mock_log_analytics)
+
+    assert correlator.get_activities_for_activations([]) == []
+    mock_log_analytics.stream_query.assert_not_called()
+
+
+def test_get_activities_for_activations_uses_elevation_end(mock_log_analytics: Mock) -> None:
+    """Test that each window ends at the activation's end time, capped at end_time."""
+    _stream_rows(mock_log_analytics, [])
+
+    ended = _activation("alice@example.com", 10)
+    ended.end_time = datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc)
+    late = _activation("bob@example.com", 11)
+    late.end_time = datetime(2026, 2, 10, 20, 0, 0, tzinfo=timezone.utc)
+
+    correlator = ActivityCorrelator(mock_log_analytics)
+    correlator.get_activities_for_activations(
+        [ended, late], end_time=datetime(2026, 2, 10, 14, 0, 0, tzinfo=timezone.utc)
+    )
+
+    query = mock_log_analytics.stream_query.call_args.kwargs["query"]
+    assert (
+        '0, "alice@example.com", datetime(2026-02-10T10:00:00+00:00), '
+        "datetime(2026-02-10T11:00:00+00:00)" in query
+    )
+    assert (
+        '1, "bob@example.com", datetime(2026-02-10T11:00:00+00:00), '
+        "datetime(2026-02-10T14:00:00+00:00)" in query
+    )
+
+
+def test_get_activities_for_activations_merges_overlapping_windows(
+    mock_log_analytics: Mock,
+) -> None:
+    """Test that overlapping activations are fetched once and attributed to each."""
+    first = _activation("alice@example.com", 10)
+    first.end_time = datetime(2026, 2, 10, 12, 0, 0, tzinfo=timezone.utc)
+    second = _activation("alice@example.com", 11)
+    second.end_time = datetime(2026, 2, 10, 13, 0, 0, tzinfo=timezone.utc)
+
+    _stream_rows(
+        mock_log_analytics,
+        [
+            {
+                "WindowIndex": 0,
+                "TimeGenerated": datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc),
+                "OperationName": "first only",
+            },
+            {
+                "WindowIndex": 0,
+                "TimeGenerated": datetime(2026, 2, 10, 11, 30, 0, tzinfo=timezone.utc),
+                "OperationName": "both",
+            },
+            {
+                "WindowIndex": 0,
+                "TimeGenerated": datetime(2026, 2, 10, 12, 30, 0, tzinfo=timezone.utc),
+                "OperationName": "second only",
+            },
+        ],
+    )
+
+    correlator = ActivityCorrelator(mock_log_analytics)
+    grouped = correlator.get_activities_for_activations(
+        [first, second], end_time=datetime(2026, 2, 10, 14, 0, 0, tzinfo=timezone.utc)
+    )
+
+    query = mock_log_analytics.stream_query.call_args.kwargs["query"]
+    assert query.count('"alice@example.com", datetime(') == 1
+    assert (
+        '0, "alice@example.com", datetime(2026-02-10T10:00:00+00:00), '
+        "datetime(2026-02-10T13:00:00+00:00)" in query
+    )
+    assert [e.operation_name for e in grouped[0]] == ["first only", "both"]
+    assert [e.operation_name for e in grouped[1]] == ["both", "second only"]
+    assert grouped[0][1] == grouped[1][0]
+
+
+def test_get_user_activities_without_stream_query() -> None:
+    """Test clients without stream_query are queried with execute_query."""
+    client = Mock(spec=["execute_query"])
+    client.execute_query.return_value = [
+        {
+            "TimeGenerated": datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc),
+            "OperationName": "Create Storage Account",
+            "ResourceProviderValue": "Microsoft.Storage/storageAccounts",
+            "Resource": "mystorageaccount",
+            "ActivityStatusValue": "Success",
+            "ResourceGroup": "rg-production",
+            "SubscriptionId": "abc123-def456-ghi789",
+        }
+    ]
+    correlator = ActivityCorrelator(client)
+
+    activities = correlator.get_user_activities(
+        "john.doe@contoso.com",
+        datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc),
+        datetime(2026, 2, 10, 12, 0, 0, tzinfo=timezone.utc),
+    )
+
+    assert len(activities) == 1
+    assert activities[0].resource_name == "mystorageaccount"
+
+
+def _event(minute: int, resource: str = "vm1") -> ActivityEvent:
+    return ActivityEvent(
+        timestamp=datetime(2026, 2, 10, 10, minute, 0, tzinfo=timezone.utc),
+        operation_name="Read",
+        resource_type="Microsoft.Compute/virtualMachines",
+        resource_name=resource,
+        status="Success",
+        resource_group="rg",
+        subscription_id="sub",
+    )
+
+
+def test_activity_batch_union_keeps_overlap_once() -> None:
+    """Test union of overlapping windows keeps shared events once, in time order."""
+    source = ActivityBatch([_event(0), _event(1), _event(1), _event(2)])
+    first = source.take([0, 1, 2])
+    second = source.take([1, 2, 3])
+    # A batch from another window has its own vocabulary
+    other = ActivityBatch([_event(3, "vm2"), _event(0)])
+
+    merged = ActivityBatch.union([first, second, other])
+
+    assert list(merged) == [_event(0), _event(1), _event(1), _event(2), _event(3, "vm2")]
+    assert merged._vocabulary is source._vocabulary
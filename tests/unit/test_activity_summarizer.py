@@ -0,0 +1,96 @@
+"""Tests for activity summarizer module."""
+
+from datetime import datetime, timedelta, timezone
+
+from pim_auto.core.activity_correlator import ActivityEvent
+from pim_auto.core.activity_summarizer import (
+    estimate_tokens,
+    group_activities,
+    summarize_activities,
+)
+
+START = datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc)
+
+
+def _event(
+    minute: int,
+    operation: str = "Microsoft.Resources/deployments/write",
+    provider: str = "Microsoft.Resources",
+    resource_group: str = "rg-prod",
+    resource_name: str = "deployment",
+) -> ActivityEvent:
+    return ActivityEvent(
+        timestamp=START + timedelta(minutes=minute),
+        operation_name=operation,
+        resource_type=provider,
+        resource_name=resource_name,
+        status="Success",
+        resource_group=resource_group,
+        subscription_id="sub-123",
+    )
+
+
+def test_estimate_tokens() -> None:
+    """Test token estimation rounds characters up to tokens."""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_small_activity_sets_are_listed_in_full() -> None:
+    """Test activities are listed one per line when they fit the budget."""
+    activities = [_event(0, resource_name="vm1"), _event(5, resource_name="vm2")]
+
+    text = summarize_activities(activities, token_budget=2000)
+
+    assert text.splitlines() == [
+        "- 2026-02-10 10:00:00: Microsoft.Resources/deployments/write on Microsoft.Resources/vm1",
+        "- 2026-02-10 10:05:00: Microsoft.Resources/deployments/write on Microsoft.Resources/vm2",
+    ]
+
+
+def test_group_activities() -> None:
+    """Test grouping by operation, provider and resource group."""
+    activities = [
+        _event(3, resource_name="b"),
+        _event(1, resource_name="a"),
+        _event(2, operation="Microsoft.Storage/storageAccounts/delete"),
+        _event(4, resource_name="c"),
+        _event(5, resource_name="d"),
+    ]
+
+    groups = group_activities(activities, max_samples=3)
+
+    assert [(g.operation_name, g.count) for g in groups] == [
+        ("Microsoft.Resources/deployments/write", 4),
+        ("Microsoft.Storage/storageAccounts/delete", 1),
+    ]
+    assert groups[0].first_time == START + timedelta(minutes=1)
+    assert groups[0].last_time == START + timedelta(minutes=5)
+    assert groups[0].samples == ["b", "a", "c"]
+
+
+def test_large_activity_sets_are_summarized_within_budget() -> None:
+    """Test a large deployment script collapses into grouped lines."""
+    activities = [_event(i % 600, resource_name=f"res{i}") for i in range(5000)]
+    activities.append(_event(30, operation="Microsoft.Authorization/roleAssignments/write"))
+
+    text = summarize_activities(activities, token_budget=500)
+
+    assert estimate_tokens(text) <= 500
+    assert text.startswith("5001 activities summarized into 2 groups:")
+    assert "Microsoft.Resources/deployments/write on Microsoft.Resources in rg-prod: 5000x" in text
+    assert "Microsoft.Authorization/roleAssignments/write" in text
+    assert "(e.g. res0, res1, res2)" in text
+    assert summarize_activities(activities, token_budget=500) == text
+
+
+def test_summary_truncates_groups_to_fit_budget() -> None:
+    """Test prompt size stays bounded however many distinct groups there are."""
+    activities = [_event(i, resource_group=f"rg-{i}") for i in range(2000)]
+
+    text = summarize_activities(activities, token_budget=300)
+
+    assert estimate_tokens(text) <= 300
+    assert text.splitlines()[-1].endswith("activities) omitted")
+    assert "rg-0:" in text
@@ -0,0 +1,169 @@
+"""Tests for assessment cache module."""
+
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from pim_auto.core.activity_correlator import ActivityEvent
+from pim_auto.core.assessment_cache import AssessmentCache
+from pim_auto.core.risk_assessor import AlignmentLevel, RiskAssessment, RiskAssessor
+
+
+def _activity(operation_name: str, minute: int = 30) -> ActivityEvent:
+    return ActivityEvent(
+        timestamp=datetime(2026, 2, 10, 10, minute, tzinfo=timezone.utc),
+        operation_name=operation_name,
+        resource_type="Microsoft.Storage/storageAccounts",
+        resource_name="mystorageaccount",
+        status="Succeeded",
+        resource_group="rg-prod",
+        subscription_id="sub-123",
+    )
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> AssessmentCache:
+    """Create a cache in a temporary directory."""
+    cache = AssessmentCache(tmp_path / "cache" / "assessments.db", ttl_hours=1)
+    yield cache
+    cache.close()
+
+
+def test_make_key_ignores_activity_order() -> None:
+    """Test that the key is stable for the same activities in any order."""
+    first = [_activity("Create", 10), _activity("Update", 20)]
+    key_a = AssessmentCache.make_key("gpt-4", "1", "add storage", first)
+    key_b = AssessmentCache.make_key("gpt-4", "1", "add storage", list(reversed(first)))
+
+    assert key_a == key_b
+
+
+def test_make_key_changes_with_inputs() -> None:
+    """Test that every input contributes to the key."""
+    activities = [_activity("Create")]
+    base = AssessmentCache.make_key("gpt-4", "1", "add storage", activities)
+
+    assert base != AssessmentCache.make_key("gpt-4o", "1", "add storage", activities)
+    assert base != AssessmentCache.make_key("gpt-4", "2", "add storage", activities)
+    assert base != AssessmentCache.make_key("gpt-4", "1", "fix network", activities)
+    assert base != AssessmentCache.make_key("gpt-4", "1", "add storage", [_activity("Delete")])
+
+
+def test_put_and_get(cache: AssessmentCache) -> None:
+    """Test storing and retrieving an assessment."""
+    cache.put("key", RiskAssessment(AlignmentLevel.NOT_ALIGNED, "Deleted a VM"))
+
+    cached = cache.get("key")
+
+    assert cached is not None
+    assert cached.level == AlignmentLevel.NOT_ALIGNED
+    assert cached.explanation == "Deleted a VM"
+    assert cache.get("missing") is None
+
+
+def test_put_and_get_structured_fields(cache: AssessmentCache) -> None:
+    """Test confidence and reasons of structured verdicts are cached too."""
+    cache.put(
+        "key",
+        RiskAssessment(
+            AlignmentLevel.ALIGNED, "Created storage", confidence=0.9, reasons=["Created storage"]
+        ),
+    )
+
+    cached = cache.get("key")
+
+    assert cached is not None
+    assert cached.confidence == 0.9
+    assert cached.reasons == ["Created storage"]
+
+
+def test_cache_upgrades_old_database(tmp_path: Path) -> None:
+    """Test a database without the structured verdict columns is upgraded."""
+    path = tmp_path / "assessments.db"
+    connection = sqlite3.connect(str(path))
+    with connection:
+        connection.execute(
+            "CREATE TABLE assessments (key TEXT PRIMARY KEY, level TEXT NOT NULL, "
+            "explanation TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO assessments VALUES ('old', 'aligned', 'ok', ?)", (time.time(),)
+        )
+    connection.close()
+
+    with AssessmentCache(path) as cache:
+        old = cache.get("old")
+        cache.put("new", RiskAssessment(AlignmentLevel.ALIGNED, "ok", confidence=0.5))
+        new = cache.get("new")
+
+    assert old is not None and old.confidence is None and old.reasons == []
+    assert new is not None and new.confidence == 0.5
+
+
+def test_cache_persists_across_instances(tmp_path: Path) -> None:
+    """Test that assessments survive reopening the database."""
+    path = tmp_path / "assessments.db"
+    first = AssessmentCache(path)
+    first.put("key", RiskAssessment(AlignmentLevel.ALIGNED, "ok"))
+    first.close()
+
+    second = AssessmentCache(path)
+    cached = second.get("key")
+    second.close()
+
+    assert cached is not None
+    assert cached.level == AlignmentLevel.ALIGNED
+
+
+def test_expired_entries_are_ignored(
+    cache: AssessmentCache, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that entries older than the TTL are treated as misses."""
+    cache.put("old", RiskAssessment(AlignmentLevel.ALIGNED, "ok"))
+    cache.put("older", RiskAssessment(AlignmentLevel.ALIGNED, "ok"))
+
+    later = time.time() + 2 * 3600
+    monkeypatch.setattr("pim_auto.core.assessment_cache.time.time", lambda: later)
+
+    assert cache.get("old") is None
+    assert cache.purge_expired() == 1
+
+
+def test_risk_assessor_uses_cache(cache: AssessmentCache) -> None:
+    """Test that a repeated assessment is served from the cache."""
+    mock_openai = Mock()
+    mock_openai.deployment = "gpt-4"
+    mock_openai.generate_completion.return_value = "ALIGNED: created storage"
+
+    assessor = RiskAssessor(mock_openai, cache=cache)
+    activities = [_activity("Create Storage Account")]
+
+    first = assessor.assess_alignment("add storage", activities)
+    second = assessor.assess_alignment("add storage", list(activities))
+    assessor.assess_alignment("different reason", activities)
+
+    assert first.level == AlignmentLevel.ALIGNED
+    assert second.level == AlignmentLevel.ALIGNED
+    assert second.explanation == first.explanation
+    assert mock_openai.generate_completion.call_count == 2
+
+
+def test_risk_assessor_ignores_cache_errors() -> None:
+    """Test that cache failures fall back to the model."""
+    broken_cache = Mock()
+    broken_cache.make_key.return_value = "key"
+    broken_cache.get.side_effect = Exception("disk error")
+    broken_cache.put.side_effect = Exception("disk error")
+
+    mock_openai = Mock()
+    mock_openai.generate_completion.return_value = "NOT_ALIGNED"
+
+    assessor = RiskAssessor(mock_openai, cache=broken_cache)
+    assessment = assessor.assess_alignment("add storage", [])
+
+    assert assessment.level == AlignmentLevel.NOT_ALIGNED
+    mock_openai.generate_completion.assert_called_once()
@@ -4,7 +4,7 @@ from unittest.mock import MagicMock, patch
 
 from azure.identity import DefaultAzureCredential
 
-from src.pim_auto.azure.auth import get_azure_credential
+from src.pim_auto.azure.auth import get_async_azure_credential, get_azure_credential
 
 
 @patch("src.pim_auto.azure.auth.DefaultAzureCredential")
@@ -17,3 +17,15 @@ def test_get_azure_credential(mock_credential_class: MagicMock) -> None:
 
     assert credential == mock_instance
     mock_credential_class.assert_called_once()
+
+
+@patch("src.pim_auto.azure.auth.AsyncDefaultAzureCredential")
+def test_get_async_azure_credential(mock_credential_class: MagicMock) -> None:
+    """Test getting async Azure credential."""
+    mock_instance = MagicMock()
+    mock_credential_class.return_value = mock_instance
+
+    credential = get_async_azure_credential()
+
+    assert credential == mock_instance
+    mock_credential_class.assert_called_once()
@@ -1,6 +1,8 @@
 """Unit tests for batch runner."""
 
-from datetime import datetime, timezone
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -10,7 +12,9 @@ from pim_auto.config import Config
 from pim_auto.core.activity_correlator import ActivityEvent
 from pim_auto.core.pim_detector import PIMActivation
 from pim_auto.core.risk_assessor import AlignmentLevel, RiskAssessment
-from pim_auto.interfaces.batch_runner import BatchRunner
+from pim_auto.core.scan_state import ScanState, ScanWatermark
+from pim_auto.interfaces.batch_runner import EXIT_INCOMPLETE, BatchRunner
+from pim_auto.monitoring.tracing import Tracer
 
 
 @pytest.fixture
@@ -30,7 +34,19 @@ def mock_config():
     """Create mock config."""
     config = Mock(spec=Config)
     config.default_scan_hours = 24
+    config.log_analytics_chunk_hours = None
     config.batch_output_path = None
+    config.log_analytics_max_concurrency = 1
+    config.openai_max_concurrency = 1
+    config.assessment_cache_path = None
+    config.assessment_cache_ttl_hours = 24
+    config.assessment_prompt_token_budget = 2000
+    config.assessment_fast_path = False
+    config.assessment_batch_size = 1
+    config.assessment_batch_max_item_tokens = 300
+    config.assessment_response_format = "text"
+    config.scan_state_path = None
+    config.scan_overlap_minutes = 30
     return config
 
 
@@ -92,13 +108,50 @@ def test_batch_runner_initialization(
     assert batch_runner.markdown_generator is not None
 
 
+def test_batch_runner_creates_assessment_cache(
+    mock_log_analytics, mock_openai_client, mock_config, tmp_path
+):
+    """Test that configuring a cache path wires a cache into the risk assessor."""
+    mock_config.assessment_cache_path = str(tmp_path / "assessments.db")
+
+    runner = BatchRunner(mock_log_analytics, mock_openai_client, mock_config)
+
+    assert runner.assessment_cache is not None
+    assert runner.risk_assessor.cache is runner.assessment_cache
+    runner.assessment_cache.close()
+
+
+def test_run_closes_assessment_cache(mock_log_analytics, mock_openai_client, mock_config, tmp_path):
+    """Test the cache connection is closed when the run ends."""
+    mock_config.assessment_cache_path = str(tmp_path / "assessments.db")
+    runner = BatchRunner(mock_log_analytics, mock_openai_client, mock_config)
+    runner.pim_detector.detect_activations = Mock(return_value=[])
+
+    with patch("builtins.print"):
+        runner.run(hours=24)
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        runner.assessment_cache.get("key")
+
+
+def test_batch_runner_enables_fast_path(mock_log_analytics, mock_openai_client, mock_config):
+    """Test that the fast-path setting wires a classifier into the risk assessor."""
+    mock_config.assessment_fast_path = True
+
+    runner = BatchRunner(mock_log_analytics, mock_openai_client, mock_config)
+
+    assert runner.risk_assessor.fast_path is not None
+
+
 def test_run_with_activations(
     batch_runner, sample_activations, sample_activities, sample_assessment
 ):
     """Test running batch mode with activations."""
     # Mock the dependencies
     batch_runner.pim_detector.detect_activations = Mock(return_value=sample_activations)
-    batch_runner.activity_correlator.get_user_activities = Mock(return_value=sample_activities)
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[sample_activities]
+    )
     batch_runner.risk_assessor.assess_alignment = Mock(return_value=sample_assessment)
     batch_runner.markdown_generator.generate_report = Mock(return_value="# Report")
 
@@ -107,7 +160,7 @@ def test_run_with_activations(
 
     # Verify calls
     batch_runner.pim_detector.detect_activations.assert_called_once_with(hours=24)
-    batch_runner.activity_correlator.get_user_activities.assert_called_once()
+    batch_runner.activity_correlator.get_activities_for_activations.assert_called_once()
     batch_runner.risk_assessor.assess_alignment.assert_called_once()
     batch_runner.markdown_generator.generate_report.assert_called_once()
 
@@ -133,7 +186,7 @@ def test_run_without_activations(batch_runner):
 def test_run_with_custom_hours(batch_runner, sample_activations):
     """Test running with custom hours parameter."""
     batch_runner.pim_detector.detect_activations = Mock(return_value=sample_activations)
-    batch_runner.activity_correlator.get_user_activities = Mock(return_value=[])
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(return_value=[[]])
     batch_runner.risk_assessor.assess_alignment = Mock(
         return_value=RiskAssessment(AlignmentLevel.UNKNOWN, "")
     )
@@ -152,7 +205,7 @@ def test_run_with_output_file(batch_runner, sample_activations, tmp_path):
     output_path = tmp_path / "report.md"
 
     batch_runner.pim_detector.detect_activations = Mock(return_value=sample_activations)
-    batch_runner.activity_correlator.get_user_activities = Mock(return_value=[])
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(return_value=[[]])
     batch_runner.risk_assessor.assess_alignment = Mock(
         return_value=RiskAssessment(AlignmentLevel.UNKNOWN, "")
     )
@@ -199,7 +252,9 @@ def test_run_continues_on_assessment_failure(batch_runner, sample_activities):
     ]
 
     batch_runner.pim_detector.detect_activations = Mock(return_value=activations)
-    batch_runner.activity_correlator.get_user_activities = Mock(return_value=sample_activities)
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[sample_activities, sample_activities]
+    )
 
     # First assessment fails, second succeeds
     batch_runner.risk_assessor.assess_alignment = Mock(
@@ -218,6 +273,404 @@ def test_run_continues_on_assessment_failure(batch_runner, sample_activities):
     batch_runner.markdown_generator.generate_report.assert_called_once()
 
 
+def test_run_fetches_activities_in_one_call(batch_runner, sample_activities):
+    """Test that activities for all activations are fetched with one bulk call."""
+    activations = [
+        PIMActivation(
+            user_email=f"user{i}@example.com",
+            role_name="Reader",
+            activation_reason="Review",
+            activation_time=datetime(2026, 2, 11, 10, i, 0, tzinfo=timezone.utc),
+            duration_hours=24,
+        )
+        for i in range(3)
+    ]
+
+    batch_runner.pim_detector.detect_activations = Mock(return_value=activations)
+    batch_runner.activity_correlator.get_user_activities = Mock()
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[sample_activities, [], sample_activities]
+    )
+    batch_runner.risk_assessor.assess_alignment = Mock(
+        return_value=RiskAssessment(AlignmentLevel.ALIGNED, "Test")
+    )
+    batch_runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    result = batch_runner.run()
+
+    assert result == 0
+    batch_runner.activity_correlator.get_user_activities.assert_not_called()
+    batch_runner.activity_correlator.get_activities_for_activations.assert_called_once()
+    call_args = batch_runner.markdown_generator.generate_report.call_args
+    activities_by_user = call_args.kwargs["activities_by_user"]
+    assert activities_by_user["user0@example.com"] == sample_activities
+    assert activities_by_user["user1@example.com"] == []
+    assert batch_runner.risk_assessor.assess_alignment.call_count == 3
+
+
+def test_run_concurrent_keeps_activation_order(batch_runner, mock_config):
+    """Test that concurrent mode stores results in activation order."""
+    mock_config.log_analytics_max_concurrency = 3
+    mock_config.openai_max_concurrency = 4
+
+    activations = [
+        PIMActivation(
+            user_email=f"user{i}@example.com",
+            role_name="Reader",
+            activation_reason=f"reason-{i}",
+            activation_time=datetime(2026, 2, 11, 10, i, 0, tzinfo=timezone.utc),
+            duration_hours=24,
+        )
+        for i in range(10)
+    ]
+
+    def fake_correlate(chunk, end_time=None):
+        # Later chunks finish first to exercise out-of-order completion
+        time.sleep(0.01 * (3 - len(chunk) % 3))
+        return [
+            [
+                ActivityEvent(
+                    timestamp=activation.activation_time,
+                    operation_name=f"op-{activation.user_email}",
+                    resource_type="Microsoft.Test/resources",
+                    resource_name="res",
+                    status="Success",
+                    resource_group="rg",
+                    subscription_id="sub",
+                )
+            ]
+            for activation in chunk
+        ]
+
+    def fake_assess(pim_reason, activities):
+        if pim_reason == "reason-4":
+            raise Exception("Assessment failed")
+        return RiskAssessment(AlignmentLevel.ALIGNED, pim_reason)
+
+    batch_runner.pim_detector.detect_activations = Mock(return_value=activations)
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        side_effect=fake_correlate
+    )
+    batch_runner.risk_assessor.assess_alignment = Mock(side_effect=fake_assess)
+    batch_runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    result = batch_runner.run()
+
+    assert result == 0
+    assert batch_runner.activity_correlator.get_activities_for_activations.call_count == 3
+    call_args = batch_runner.markdown_generator.generate_report.call_args
+    activities_by_user = call_args.kwargs["activities_by_user"]
+    assessments_by_user = call_args.kwargs["assessments_by_user"]
+    assert list(activities_by_user) == [a.user_email for a in activations]
+    for activation in activations:
+        events = activities_by_user[activation.user_email]
+        assert events[0].operation_name == f"op-{activation.user_email}"
+    assert "user4@example.com" not in assessments_by_user
+    assert assessments_by_user["user7@example.com"].explanation == "reason-7"
+
+
+def test_run_incremental_uses_watermark_and_open_activations(
+    mock_log_analytics, mock_openai_client, mock_config, tmp_path
+):
+    """Test that incremental runs scan from the watermark and keep open activations."""
+    mock_config.scan_state_path = str(tmp_path / "state.json")
+    runner = BatchRunner(mock_log_analytics, mock_openai_client, mock_config)
+
+    now = datetime.now(timezone.utc)
+    previous_open = PIMActivation(
+        user_email="open@example.com",
+        role_name="Owner",
+        activation_reason="Long maintenance",
+        activation_time=now - timedelta(hours=2),
+        duration_hours=8,
+        record_id="record-1",
+    )
+    previous_closed = PIMActivation(
+        user_email="closed@example.com",
+        role_name="Owner",
+        activation_reason="Short fix",
+        activation_time=now - timedelta(hours=5),
+        duration_hours=1,
+        record_id="record-0",
+    )
+    watermark = ScanWatermark(time_generated=now - timedelta(hours=2), record_id="record-1")
+    runner.scan_state_store.save(
+        ScanState(watermark=watermark, open_activations=[previous_open, previous_closed])
+    )
+
+    new_activation = PIMActivation(
+        user_email="new@example.com",
+        role_name="Contributor",
+        activation_reason="Add storage account",
+        activation_time=now - timedelta(minutes=30),
+        duration_hours=8,
+        record_id="record-2",
+    )
+    runner.pim_detector.detect_activations = Mock(return_value=[new_activation])
+    runner.activity_correlator.get_activities_for_activations = Mock(
+        side_effect=lambda activations, end_time=None: [[] for _ in activations]
+    )
+    runner.risk_assessor.assess_alignment = Mock(
+        return_value=RiskAssessment(AlignmentLevel.ALIGNED, "Test")
+    )
+    runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    result = runner.run()
+
+    assert result == 0
+    runner.pim_detector.detect_activations.assert_called_once_with(
+        hours=24, since=watermark, overlap=timedelta(minutes=30)
+    )
+    reported = runner.markdown_generator.generate_report.call_args.kwargs["activations"]
+    assert [a.user_email for a in reported] == ["new@example.com", "open@example.com"]
+
+    state = runner.scan_state_store.load()
+    assert state.watermark.record_id == "record-2"
+    assert {a.record_id for a in state.open_activations} == {"record-1", "record-2"}
+
+
+def test_run_incremental_picks_up_late_records_once(
+    mock_log_analytics, mock_openai_client, mock_config, tmp_path
+):
+    """Test records ingested after a run but older than its watermark are processed once."""
+    mock_config.scan_state_path = str(tmp_path / "state.json")
+    now = datetime.now(timezone.utc)
+
+    def activation(record_id: str, minutes_ago: int) -> PIMActivation:
+        return PIMActivation(
+            user_email=f"{record_id}@example.com",
+            role_name="Contributor",
+            activation_reason="Add storage account",
+            activation_time=now - timedelta(minutes=minutes_ago),
+            duration_hours=1,
+            record_id=record_id,
+            end_time=now - timedelta(minutes=1),
+        )
+
+    def run(detected):
+        runner = BatchRunner(mock_log_analytics, mock_openai_client, mock_config)
+        runner.pim_detector.detect_activations = Mock(return_value=detected)
+        runner.activity_correlator.get_activities_for_activations = Mock(
+            side_effect=lambda activations, end_time=None: [[] for _ in activations]
+        )
+        runner.risk_assessor.assess_alignment = Mock(
+            return_value=RiskAssessment(AlignmentLevel.ALIGNED, "Test")
+        )
+        runner.markdown_generator.generate_report = Mock(return_value="# Report")
+        assert runner.run() == 0
+        reported = runner.markdown_generator.generate_report.call_args.kwargs["activations"]
+        return sorted(a.record_id for a in reported)
+
+    assert run([activation("record-1", 20), activation("record-2", 10)]) == [
+        "record-1",
+        "record-2",
+    ]
+    # record-3 was ingested late: older than the watermark (record-2), inside the overlap
+    late = activation("record-3", 15)
+    assert run([activation("record-1", 20), activation("record-2", 10), late]) == ["record-3"]
+
+    state = BatchRunner(mock_log_analytics, mock_openai_client, mock_config).scan_state_store.load()
+    assert state.watermark.record_id == "record-2"
+    assert set(state.recent_records) == {"record-1", "record-2", "record-3"}
+
+
+def test_run_incremental_does_not_save_state_on_failure(
+    mock_log_analytics, mock_openai_client, mock_config, tmp_path
+):
+    """Test that a failed run leaves the watermark untouched."""
+    mock_config.scan_state_path = str(tmp_path / "state.json")
+    runner = BatchRunner(mock_log_analytics, mock_openai_client, mock_config)
+
+    runner.pim_detector.detect_activations = Mock(
+        return_value=[
+            PIMActivation(
+                user_email="new@example.com",
+                role_name="Contributor",
+                activation_reason="Add storage account",
+                activation_time=datetime.now(timezone.utc),
+                duration_hours=8,
+                record_id="record-2",
+            )
+        ]
+    )
+    runner.activity_correlator.get_activities_for_activations = Mock(
+        side_effect=Exception("API Error")
+    )
+
+    result = runner.run()
+
+    assert result == 1
+    assert not (tmp_path / "state.json").exists()
+
+
+def test_run_batches_assessments(batch_runner, mock_config, sample_assessment):
+    """Test that a batch size above one assesses activations together."""
+    mock_config.assessment_batch_size = 10
+    activations = [
+        PIMActivation(
+            user_email=f"user{i}@example.com",
+            role_name="Reader",
+            activation_reason=f"Reason {i}",
+            activation_time=datetime(2026, 2, 11, 10, i, 0, tzinfo=timezone.utc),
+            duration_hours=1,
+        )
+        for i in range(3)
+    ]
+    batch_runner.pim_detector.detect_activations = Mock(return_value=activations)
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[[] for _ in activations]
+    )
+    batch_runner.risk_assessor.assess_alignment_batch = Mock(
+        return_value=[sample_assessment for _ in activations]
+    )
+    batch_runner.risk_assessor.assess_alignment = Mock()
+
+    assert batch_runner.run() == 0
+
+    batch_runner.risk_assessor.assess_alignment_batch.assert_called_once()
+    items = batch_runner.risk_assessor.assess_alignment_batch.call_args[0][0]
+    assert [reason for reason, _ in items] == ["Reason 0", "Reason 1", "Reason 2"]
+    batch_runner.risk_assessor.assess_alignment.assert_not_called()
+
+
+def test_run_retries_only_failed_batch_assessments(batch_runner, mock_config, sample_assessment):
+    """Test that only activations the batch could not assess are assessed again."""
+    mock_config.assessment_batch_size = 10
+    activations = [
+        PIMActivation(
+            user_email=f"user{i}@example.com",
+            role_name="Reader",
+            activation_reason=f"Reason {i}",
+            activation_time=datetime(2026, 2, 11, 10, i, 0, tzinfo=timezone.utc),
+            duration_hours=1,
+        )
+        for i in range(3)
+    ]
+    batch_runner.pim_detector.detect_activations = Mock(return_value=activations)
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[[] for _ in activations]
+    )
+    batch_runner.risk_assessor.assess_alignment_batch = Mock(
+        return_value=[sample_assessment, None, sample_assessment]
+    )
+    batch_runner.risk_assessor.assess_alignment = Mock(return_value=sample_assessment)
+    batch_runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    assert batch_runner.run() == 0
+
+    batch_runner.risk_assessor.assess_alignment.assert_called_once()
+    assert batch_runner.risk_assessor.assess_alignment.call_args.kwargs["pim_reason"] == "Reason 1"
+    assessments = batch_runner.markdown_generator.generate_report.call_args.kwargs[
+        "assessments_by_user"
+    ]
+    assert len(assessments) == 3
+
+
+def test_run_combines_activities_for_repeat_user(batch_runner):
+    """Test that a user's activities from several activations are not overwritten."""
+    activations = [
+        PIMActivation(
+            user_email="user1@example.com",
+            role_name=role,
+            activation_reason="Maintenance",
+            activation_time=datetime(2026, 2, 11, 10 + i, 0, 0, tzinfo=timezone.utc),
+            duration_hours=2,
+        )
+        for i, role in enumerate(["Contributor", "Owner"])
+    ]
+    events = [
+        ActivityEvent(
+            timestamp=datetime(2026, 2, 11, 10, minute, 0, tzinfo=timezone.utc),
+            operation_name=f"op-{minute}",
+            resource_name="res",
+            resource_type="Microsoft.Test/resources",
+            status="Success",
+            resource_group="rg",
+            subscription_id="sub",
+        )
+        for minute in (10, 20, 30)
+    ]
+
+    batch_runner.pim_detector.detect_activations = Mock(return_value=activations)
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[[events[0], events[1]], [events[1], events[2]]]
+    )
+    batch_runner.risk_assessor.assess_alignment = Mock(
+        return_value=RiskAssessment(AlignmentLevel.ALIGNED, "Test")
+    )
+    batch_runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    assert batch_runner.run() == 0
+
+    call_args = batch_runner.markdown_generator.generate_report.call_args
+    user_activities = call_args.kwargs["activities_by_user"]["user1@example.com"]
+    assert [e.operation_name for e in user_activities] == ["op-10", "op-20", "op-30"]
+
+
+def test_run_keeps_most_severe_assessment_for_repeat_user(batch_runner):
+    """Test that a later aligned verdict does not replace an earlier misaligned one."""
+    activations = [
+        PIMActivation(
+            user_email="user1@example.com",
+            role_name=role,
+            activation_reason="Maintenance",
+            activation_time=datetime(2026, 2, 11, 10 + i, 0, 0, tzinfo=timezone.utc),
+            duration_hours=1,
+        )
+        for i, role in enumerate(["Owner", "Reader"])
+    ]
+    batch_runner.pim_detector.detect_activations = Mock(return_value=activations)
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(return_value=[[], []])
+    batch_runner.risk_assessor.assess_alignment = Mock(
+        side_effect=[
+            RiskAssessment(AlignmentLevel.NOT_ALIGNED, "Deleted a vault"),
+            RiskAssessment(AlignmentLevel.ALIGNED, "Read logs"),
+        ]
+    )
+    batch_runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    assert batch_runner.run() == 0
+
+    assessments = batch_runner.markdown_generator.generate_report.call_args.kwargs[
+        "assessments_by_user"
+    ]
+    assessment = assessments["user1@example.com"]
+    assert assessment.level == AlignmentLevel.NOT_ALIGNED
+    assert "Owner at 2026-02-11 10:00: not_aligned] Deleted a vault" in assessment.explanation
+    assert "Reader at 2026-02-11 11:00: aligned] Read logs" in assessment.explanation
+
+
+def test_run_flags_partial_results(batch_runner, sample_activations, sample_assessment):
+    """Test that partial query results are reported and fail the run without saving state."""
+    batch_runner.scan_state_store = Mock()
+    batch_runner.scan_state_store.load.return_value = ScanState()
+    batch_runner.pim_detector.detect_activations = Mock(return_value=sample_activations)
+    batch_runner.pim_detector.partial_errors.append("pim_detection: Query exceeded the time limit")
+    batch_runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[[] for _ in sample_activations]
+    )
+    batch_runner.risk_assessor.assess_alignment = Mock(return_value=sample_assessment)
+    batch_runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    assert batch_runner.run() == EXIT_INCOMPLETE
+
+    warnings = batch_runner.markdown_generator.generate_report.call_args.kwargs["warnings"]
+    assert warnings == ["pim_detection: Query exceeded the time limit"]
+    batch_runner.scan_state_store.save.assert_not_called()
+
+
+def test_run_flags_partial_results_without_activations(batch_runner, capsys):
+    """Test that an empty report from partial results says the data is incomplete."""
+    batch_runner.pim_detector.detect_activations = Mock(return_value=[])
+    batch_runner.pim_detector.partial_errors.append("pim_detection: Some shards failed")
+
+    assert batch_runner.run() == EXIT_INCOMPLETE
+
+    output = capsys.readouterr().out
+    assert "## Incomplete Data" in output
+    assert "- pim_detection: Some shards failed" in output
+
+
 def test_generate_empty_report(batch_runner):
     """Test generating empty report."""
     report = batch_runner._generate_empty_report()
@@ -249,3 +702,69 @@ def test_output_report_to_file(batch_runner):
     # Just verify the method completes without error
     # Actual file writing is done in markdown_generator.generate_report
     batch_runner._output_report(report, output_path)
+
+
+def test_run_records_stage_timings(
+    mock_log_analytics,
+    mock_openai_client,
+    mock_config,
+    sample_activations,
+    sample_activities,
+    sample_assessment,
+):
+    """Test a batch run reports stage timings and counts to the monitor."""
+    monitor = Mock()
+    runner = BatchRunner(mock_log_analytics, mock_openai_client, mock_config, monitor=monitor)
+    runner.pim_detector.detect_activations = Mock(return_value=sample_activations)
+    runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[sample_activities]
+    )
+    runner.risk_assessor.assess_alignment = Mock(return_value=sample_assessment)
+    runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    with patch("builtins.print"):
+        assert runner.run(hours=24) == 0
+
+    stages = [call.args[1] for call in monitor.track_stage_duration.call_args_list]
+    assert stages == ["detection", "correlation", "report"]
+    monitor.track_pim_activations.assert_called_once_with(1)
+    monitor.track_user_activities.assert_called_once_with(1)
+
+
+def test_run_traces_stages_and_activations(
+    mock_log_analytics,
+    mock_openai_client,
+    mock_config,
+    sample_activations,
+    sample_activities,
+    sample_assessment,
+):
+    """Test a traced batch run nests stage and activation spans under one root."""
+    spans = []
+    exporter = Mock()
+    exporter.export.side_effect = spans.extend
+    runner = BatchRunner(
+        mock_log_analytics, mock_openai_client, mock_config, tracer=Tracer(exporter)
+    )
+    runner.pim_detector.detect_activations = Mock(return_value=sample_activations)
+    runner.activity_correlator.get_activities_for_activations = Mock(
+        return_value=[sample_activities]
+    )
+    runner.risk_assessor.assess_alignment = Mock(return_value=sample_assessment)
+    runner.markdown_generator.generate_report = Mock(return_value="# Report")
+
+    with patch("builtins.print"):
+        assert runner.run(hours=24) == 0
+
+    by_name = {span.name: span for span in spans}
+    root = by_name["batch_run"]
+    assert root.parent_id is None
+    assert root.attributes["activations"] == 1
+    assert root.attributes["exit_code"] == 0
+    for name in ("stage:detection", "stage:correlation", "stage:report"):
+        assert by_name[name].parent_id == root.span_id
+        assert by_name[name].trace_id == root.trace_id
+    activation = by_name["activation"]
+    assert activation.parent_id == by_name["stage:correlation"].span_id
+    assert activation.attributes["user"] == "user1@example.com"
+    assert activation.attributes["assessment"] == "aligned"
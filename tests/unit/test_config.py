@@ -84,6 +84,112 @@ def test_config_validation_log_level() -> None:
         config.validate()
 
 
+def test_config_concurrency_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test loading batch concurrency limits from environment variables."""
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
+    monkeypatch.setenv("LOG_ANALYTICS_WORKSPACE_ID", "test-workspace-id")
+    monkeypatch.setenv("LOG_ANALYTICS_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("OPENAI_MAX_CONCURRENCY", "8")
+
+    config = Config.from_environment()
+
+    assert config.log_analytics_max_concurrency == 4
+    assert config.openai_max_concurrency == 8
+
+
+def test_config_validation_concurrency() -> None:
+    """Test concurrency limit validation."""
+    config = Config(
+        azure_openai_endpoint="https://test.openai.azure.com",
+        azure_openai_deployment="gpt-4",
+        log_analytics_workspace_id="test-id",
+        openai_max_concurrency=0,
+    )
+
+    with pytest.raises(ValueError, match="OpenAI max concurrency"):
+        config.validate()
+
+
+def test_config_additional_workspaces_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test loading additional workspace IDs from a comma-separated variable."""
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
+    monkeypatch.setenv("LOG_ANALYTICS_WORKSPACE_ID", "test-workspace-id")
+    monkeypatch.setenv("LOG_ANALYTICS_ADDITIONAL_WORKSPACE_IDS", " workspace-b, ,workspace-c ")
+
+    config = Config.from_environment()
+
+    assert config.log_analytics_additional_workspace_ids == ["workspace-b", "workspace-c"]
+
+    config.log_analytics_additional_workspace_ids.append("test-workspace-id")
+    with pytest.raises(ValueError, match="primary workspace"):
+        config.validate()
+
+
+def test_config_local_endpoints(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test plain-http endpoints are accepted only for the local host."""
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "http://127.0.0.1:8080")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
+    monkeypatch.setenv("LOG_ANALYTICS_WORKSPACE_ID", "test-workspace-id")
+    monkeypatch.setenv("LOG_ANALYTICS_ENDPOINT", "http://localhost:8080/v1")
+
+    config = Config.from_environment()
+    config.validate()
+
+    assert config.log_analytics_endpoint == "http://localhost:8080/v1"
+
+    config.log_analytics_endpoint = "http://logs.example.com/v1"
+    with pytest.raises(ValueError, match="Log Analytics endpoint must start with https://"):
+        config.validate()
+
+
+def test_config_validation_chunk_hours() -> None:
+    """Test Log Analytics chunk size validation."""
+    config = Config(
+        azure_openai_endpoint="https://test.openai.azure.com",
+        azure_openai_deployment="gpt-4",
+        log_analytics_workspace_id="test-id",
+        log_analytics_chunk_hours=0,
+    )
+
+    with pytest.raises(ValueError, match="chunk hours"):
+        config.validate()
+
+
+def test_config_openai_quota_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test loading the OpenAI quota and retry settings."""
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://test.openai.azure.com")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
+    monkeypatch.setenv("LOG_ANALYTICS_WORKSPACE_ID", "test-workspace-id")
+    monkeypatch.setenv("OPENAI_TOKENS_PER_MINUTE", "120000")
+    monkeypatch.setenv("OPENAI_MAX_RETRIES", "3")
+    monkeypatch.delenv("OPENAI_REQUESTS_PER_MINUTE", raising=False)
+
+    config = Config.from_environment()
+
+    assert config.openai_requests_per_minute is None
+    assert config.openai_tokens_per_minute == 120000
+    assert config.openai_max_retries == 3
+
+    config.openai_requests_per_minute = 0
+    with pytest.raises(ValueError, match="requests per minute"):
+        config.validate()
+
+
+def test_config_validation_prompt_token_budget() -> None:
+    """Test prompt token budget validation."""
+    config = Config(
+        azure_openai_endpoint="https://test.openai.azure.com",
+        azure_openai_deployment="gpt-4",
+        log_analytics_workspace_id="test-id",
+        assessment_prompt_token_budget=10,
+    )
+
+    with pytest.raises(ValueError, match="prompt token budget"):
+        config.validate()
+
+
 def test_config_validation_success() -> None:
     """Test successful validation."""
     config = Config(
@@ -94,3 +200,23 @@ def test_config_validation_success() -> None:
 
     # Should not raise
     config.validate()
+
+
+def test_config_validation_trace_exporter() -> None:
+    """Test trace exporter validation."""
+    config = Config(
+        azure_openai_endpoint="https://test.openai.azure.com",
+        azure_openai_deployment="gpt-4",
+        log_analytics_workspace_id="test-id",
+        trace_exporter="jaeger",
+    )
+
+    with pytest.raises(ValueError, match="Invalid trace exporter"):
+        config.validate()
+
+    config.trace_exporter = "app_insights"
+    with pytest.raises(ValueError, match="APPLICATIONINSIGHTS_CONNECTION_STRING"):
+        config.validate()
+
+    config.app_insights_connection_string = "InstrumentationKey=test"
+    config.validate()
@@ -0,0 +1,69 @@
+"""Tests for the benchmark dataset generator and replay client."""
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.datagen import DatasetSpec, generate_dataset, load_dataset, write_dataset
+from benchmarks.replay import ReplayLogAnalyticsClient
+from pim_auto.core.activity_correlator import ActivityCorrelator
+from pim_auto.core.pim_detector import PIMDetector
+
+END = datetime(2026, 2, 10, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def test_generate_dataset_is_reproducible() -> None:
+    """Test the same seed produces the same dataset."""
+    spec = DatasetSpec(activation_count=50, seed=7, end=END)
+
+    first = generate_dataset(spec)
+    second = generate_dataset(spec)
+    other = generate_dataset(DatasetSpec(activation_count=50, seed=8, end=END))
+
+    assert first.activations == second.activations
+    assert first.activities == second.activities
+    assert first.activations != other.activations
+
+
+def test_generate_dataset_shape() -> None:
+    """Test activations stay in the period and activity volumes are skewed."""
+    spec = DatasetSpec(activation_count=500, seed=1, end=END, hours=24)
+
+    dataset = generate_dataset(spec)
+
+    assert len(dataset.activations) == 500
+    assert all(END - timedelta(hours=24) <= a["TimeGenerated"] <= END for a in dataset.activations)
+    assert all(e["EndedAt"] < END for e in dataset.endings)
+    assert all(a["TimeGenerated"] <= END for a in dataset.activities)
+    volumes = sorted(Counter(a["Caller"] for a in dataset.activities).values(), reverse=True)
+    top_decile = sum(volumes[: max(1, len(volumes) // 10)])
+    assert top_decile > 0.2 * sum(volumes)
+
+
+def test_write_and_load_dataset(tmp_path) -> None:
+    """Test datasets round-trip through JSON Lines files."""
+    dataset = generate_dataset(DatasetSpec(activation_count=20, seed=3, end=END))
+
+    write_dataset(dataset, tmp_path / "data")
+    loaded = load_dataset(tmp_path / "data")
+
+    assert loaded.activations == dataset.activations
+    assert loaded.endings == dataset.endings
+    assert loaded.activities == dataset.activities
+    assert loaded.latest_time() == dataset.latest_time()
+
+
+def test_replay_client_drives_detector_and_correlator() -> None:
+    """Test the replay client answers the detector and correlator queries."""
+    dataset = generate_dataset(DatasetSpec(activation_count=30, seed=5, end=END, hours=72))
+    client = ReplayLogAnalyticsClient(dataset, now=END)
+
+    activations = PIMDetector(client).detect_activations(hours=72)
+    chunked = PIMDetector(client, chunk_hours=24).detect_activations(hours=72)
+    batches = ActivityCorrelator(client).get_activities_for_activations(activations, END)
+
+    assert len(activations) == 30
+    assert [(a.record_id, a.end_time) for a in chunked] == [
+        (a.record_id, a.end_time) for a in activations
+    ]
+    assert sum(len(batch) for batch in batches) > 0
+    assert client.queries == 4
@@ -0,0 +1,138 @@
+"""Tests for fast-path classifier module."""
+
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from pim_auto.core.activity_correlator import ActivityEvent
+from pim_auto.core.fast_path import FastPathClassifier, FastPathRule, allow_list_rule
+from pim_auto.core.risk_assessor import AlignmentLevel, RiskAssessment, RiskAssessor
+
+
+def _event(operation: str, provider: str, display_name: str = "Azure operation") -> ActivityEvent:
+    return ActivityEvent(
+        timestamp=datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc),
+        operation_name=display_name,
+        resource_type=provider,
+        resource_name="resource",
+        status="Success",
+        resource_group="rg-prod",
+        subscription_id="sub-123",
+        operation_value=operation,
+    )
+
+
+def test_no_activities_is_aligned() -> None:
+    """Test elevations without activity are classified without the LLM."""
+    assessment = FastPathClassifier().classify("fix production issue", [])
+
+    assert assessment is not None
+    assert assessment.level == AlignmentLevel.ALIGNED
+    assert assessment.source == "fast_path:no_activities"
+
+
+def test_read_only_activities_are_aligned() -> None:
+    """Test read-only elevations are classified without the LLM."""
+    activities = [
+        _event("Microsoft.Compute/virtualMachines/read", "Microsoft.Compute"),
+        _event("Microsoft.Storage/storageAccounts/read", "Microsoft.Storage"),
+    ]
+
+    assessment = FastPathClassifier().classify("investigate outage", activities)
+
+    assert assessment is not None
+    assert assessment.source == "fast_path:read_only"
+
+
+def test_allow_list_matches_reason_keywords() -> None:
+    """Test writes to providers named by the reason are aligned."""
+    activities = [
+        _event("Microsoft.Storage/storageAccounts/write", "Microsoft.Storage/storageAccounts"),
+        _event("Microsoft.Compute/virtualMachines/read", "Microsoft.Compute"),
+    ]
+
+    assessment = FastPathClassifier().classify("Need to add a storage account.", activities)
+
+    assert assessment is not None
+    assert assessment.level == AlignmentLevel.ALIGNED
+    assert assessment.source == "fast_path:allow_list"
+    assert "storage" in assessment.explanation
+
+
+def test_read_only_matches_operation_value_not_display_name() -> None:
+    """Test reads are recognized by OperationNameValue, as AzureActivity records them."""
+    read = _event("MICROSOFT.STORAGE/STORAGEACCOUNTS/READ", "MICROSOFT.STORAGE", "List accounts")
+    misleading = _event("Microsoft.Storage/storageAccounts/delete", "Microsoft.Storage", "read x")
+
+    assert FastPathClassifier().classify("investigate", [read]).source == "fast_path:read_only"
+    assert FastPathClassifier().classify("investigate", [misleading]) is None
+
+
+def test_allow_list_falls_through_for_deletes_and_actions() -> None:
+    """Test destructive operations on an allow-listed provider need a full assessment."""
+    for operation in (
+        "MICROSOFT.COMPUTE/VIRTUALMACHINES/DELETE",
+        "Microsoft.Compute/disks/beginGetAccess/action",
+    ):
+        activities = [_event(operation, "MICROSOFT.COMPUTE", "Delete Virtual Machine")]
+
+        assert FastPathClassifier().classify("restart the vm", activities) is None
+
+
+def test_allow_list_falls_through_for_other_providers() -> None:
+    """Test writes outside the reason's providers need a full assessment."""
+    activities = [
+        _event("Microsoft.Storage/storageAccounts/write", "Microsoft.Storage"),
+        _event("Microsoft.Network/networkSecurityGroups/write", "Microsoft.Network"),
+    ]
+
+    assert FastPathClassifier().classify("storage maintenance", activities) is None
+    assert FastPathClassifier().classify("deploy something", activities) is None
+
+
+def test_allow_list_never_matches_role_assignments() -> None:
+    """Test sensitive providers always fall through to the LLM."""
+    allow_list = {"access": ("Microsoft.Authorization",)}
+    classifier = FastPathClassifier([FastPathRule("allow_list", allow_list_rule(allow_list))])
+    activities = [
+        _event("Microsoft.Authorization/roleAssignments/write", "Microsoft.Authorization")
+    ]
+
+    assert classifier.classify("grant access", activities) is None
+
+
+def test_custom_rules_and_failing_rules() -> None:
+    """Test rules are pluggable and a failing rule is skipped."""
+
+    def broken(pim_reason, activities):
+        raise RuntimeError("boom")
+
+    def always_unknown(pim_reason, activities):
+        return RiskAssessment(level=AlignmentLevel.UNKNOWN, explanation="custom")
+
+    classifier = FastPathClassifier(
+        [FastPathRule("broken", broken), FastPathRule("custom", always_unknown)]
+    )
+
+    assessment = classifier.classify("anything", [])
+
+    assert assessment is not None
+    assert assessment.source == "fast_path:custom"
+
+
+def test_risk_assessor_records_paths() -> None:
+    """Test the risk assessor skips OpenAI on a fast path and counts each path."""
+    mock_openai = Mock()
+    mock_openai.generate_completion.return_value = "NOT_ALIGNED: unexpected deletes."
+    assessor = RiskAssessor(mock_openai, fast_path=FastPathClassifier())
+
+    fast = assessor.assess_alignment("check logs", [])
+    slow = assessor.assess_alignment(
+        "check logs",
+        [_event("Microsoft.Sql/servers/delete", "Microsoft.Sql")],
+    )
+
+    assert fast.source == "fast_path:no_activities"
+    assert slow.source == "llm"
+    assert slow.level == AlignmentLevel.NOT_ALIGNED
+    mock_openai.generate_completion.assert_called_once()
+    assert assessor.path_counts == {"fast_path:no_activities": 1, "llm": 1}
@@ -1,11 +1,16 @@
 """Tests for health check functionality."""
 
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 from azure.core.credentials import AccessToken
 
-from pim_auto.monitoring.health import HealthCheck
+from pim_auto.monitoring.health import HealthCheck, main, run_health_check
 
 
 class TestHealthCheck:
@@ -84,6 +89,21 @@ class TestHealthCheck:
         assert components["log_analytics"]["status"] == "unhealthy"
         assert "invalid" in components["log_analytics"]["message"].lower()
 
+    def test_log_analytics_check_additional_workspaces(self):
+        """Test additional workspace IDs are validated too."""
+        mock_cred = MagicMock()
+        health_check = HealthCheck(
+            workspace_id="12345678-1234-1234-1234-123456789012",
+            credential=mock_cred,
+            openai_endpoint="https://test.openai.azure.com/",
+            additional_workspace_ids=["87654321-4321-4321-4321-210987654321", "bad"],
+        )
+
+        components = health_check._check_components()
+
+        assert components["log_analytics"]["status"] == "unhealthy"
+        assert "1 of 2" in components["log_analytics"]["message"]
+
     def test_log_analytics_check_missing_workspace_id(self):
         """Test Log Analytics check with missing workspace ID."""
         mock_cred = MagicMock()
@@ -119,6 +139,18 @@ class TestHealthCheck:
         assert components["openai"]["status"] == "unhealthy"
         assert "invalid" in components["openai"]["message"].lower()
 
+    def test_openai_check_local_endpoint(self):
+        """Test OpenAI check accepts a plain-http endpoint on the local host."""
+        health_check = HealthCheck(
+            workspace_id="12345678-1234-1234-1234-123456789012",
+            credential=MagicMock(),
+            openai_endpoint="http://127.0.0.1:8080",
+        )
+
+        components = health_check._check_components()
+
+        assert components["openai"]["status"] == "healthy"
+
     def test_openai_check_missing_endpoint(self):
         """Test OpenAI check with missing endpoint."""
         mock_cred = MagicMock()
@@ -173,3 +205,58 @@ class TestHealthCheck:
 
         assert result["uptime_seconds"] > 0
         assert result["uptime_seconds"] < 1  # Should be very small
+
+
+@pytest.fixture
+def health_environment(monkeypatch):
+    """Set the required configuration environment variables."""
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://test-openai.openai.azure.com/")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4")
+    monkeypatch.setenv("LOG_ANALYTICS_WORKSPACE_ID", "12345678-1234-1234-1234-123456789012")
+
+
+def test_run_health_check_prints_status(health_environment, capsys):
+    """Test the health probe reports healthy without creating a credential."""
+    with patch("pim_auto.azure.auth.get_azure_credential") as get_credential:
+        assert run_health_check() == 0
+
+    get_credential.assert_not_called()
+    assert json.loads(capsys.readouterr().out)["status"] == "healthy"
+
+
+def test_run_health_check_detailed_uses_credential(health_environment, capsys):
+    """Test the detailed probe checks authentication with a credential."""
+    credential = MagicMock()
+    credential.get_token.return_value = AccessToken(token="mock-token", expires_on=9999999999)
+
+    with patch("pim_auto.azure.auth.get_azure_credential", return_value=credential):
+        assert main(["--detailed"]) == 0
+
+    result = json.loads(capsys.readouterr().out)
+    assert result["components"]["authentication"]["status"] == "healthy"
+
+
+def test_run_health_check_unhealthy_without_configuration(monkeypatch, capsys):
+    """Test the probe fails when required configuration is missing."""
+    monkeypatch.delenv("LOG_ANALYTICS_WORKSPACE_ID", raising=False)
+
+    assert run_health_check() == 1
+    assert json.loads(capsys.readouterr().out)["status"] == "unhealthy"
+
+
+def test_health_probe_skips_heavy_imports(health_environment):
+    """Test the health module loads without the Azure SDKs, OpenAI or telemetry."""
+    code = (
+        "import sys, pim_auto.monitoring.health as health; health.main([]); "
+        "heavy = [m for m in ('azure', 'openai', 'opencensus', 'rich', 'httpx') "
+        "if m in sys.modules]; sys.exit(1 if heavy else 0)"
+    )
+    src = str(Path(__file__).resolve().parents[2] / "src")
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": src},
+        capture_output=True,
+        check=False,
+    )
+
+    assert result.returncode == 0, result.stderr
@@ -29,6 +29,10 @@ def mock_config():
     """Create mock config."""
     config = Mock(spec=Config)
     config.default_scan_hours = 24
+    config.log_analytics_chunk_hours = None
+    config.assessment_prompt_token_budget = 2000
+    config.assessment_fast_path = False
+    config.assessment_response_format = "text"
     return config
 
 
@@ -85,6 +89,7 @@ def test_cli_initialization(cli, mock_log_analytics, mock_openai_client, mock_co
     assert cli.console is not None
     assert cli.activations == []
     assert cli.current_user is None
+    assert cli.query_generator.timer is cli.timer
 
 
 def test_extract_user_email_valid(cli):
@@ -195,6 +200,19 @@ def test_handle_activity_query_success(cli, sample_activations, sample_activitie
     cli.activity_correlator.get_user_activities.assert_called_once()
 
 
+def test_handle_activity_query_uses_elevation_end(cli, sample_activations, sample_activities):
+    """Test that activity lookups stop at the recorded end of the elevation."""
+    end_time = datetime(2026, 2, 11, 11, 0, 0, tzinfo=timezone.utc)
+    sample_activations[0].end_time = end_time
+    cli.activations = sample_activations
+    cli.activity_correlator.get_user_activities = Mock(return_value=sample_activities)
+
+    cli._handle_activity_query("What did user1@example.com do?")
+
+    call_kwargs = cli.activity_correlator.get_user_activities.call_args.kwargs
+    assert call_kwargs["end_time"] == end_time
+
+
 def test_handle_alignment_query_without_user(cli):
     """Test handling alignment query without user."""
     cli.current_user = None
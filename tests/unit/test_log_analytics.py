@@ -1,12 +1,21 @@
 """Tests for Log Analytics client module."""
 
-from datetime import datetime, timezone
-from unittest.mock import Mock
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
 
 import pytest
-from azure.monitor.query import LogsQueryStatus
+from azure.core.exceptions import HttpResponseError
+from azure.monitor.query import LogsQueryError, LogsQueryPartialResult, LogsQueryStatus
 
-from src.pim_auto.azure.log_analytics import LogAnalyticsClient
+from src.pim_auto.azure.log_analytics import (
+    AsyncLogAnalyticsClient,
+    LogAnalyticsClient,
+    QueryResult,
+)
+from src.pim_auto.azure.rate_limiter import RetryPolicy
 
 
 @pytest.fixture
@@ -131,3 +140,390 @@ def test_execute_query_exception(
 
     with pytest.raises(Exception, match="API Error"):
         client.execute_query("test query")
+
+
+def _success_response() -> Mock:
+    """Build a successful query response with two rows."""
+    mock_table = Mock()
+    mock_table.columns = ["TimeGenerated", "UserEmail"]
+    mock_table.rows = [
+        [datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc), "test@example.com"],
+        [datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc), "user@example.com"],
+    ]
+
+    mock_response = Mock()
+    mock_response.status = LogsQueryStatus.SUCCESS
+    mock_response.tables = [mock_table]
+    return mock_response
+
+
+@pytest.fixture
+def mock_async_logs_client(monkeypatch: pytest.MonkeyPatch) -> Mock:
+    """Patch the aio LogsQueryClient and return its instance."""
+    mock_client_instance = Mock()
+    mock_client_instance.query_workspace = AsyncMock(return_value=_success_response())
+    mock_client_instance.close = AsyncMock()
+    mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
+
+    monkeypatch.setattr(
+        "src.pim_auto.azure.log_analytics.AsyncLogsQueryClient",
+        Mock(return_value=mock_client_instance),
+    )
+    return mock_client_instance
+
+
+@pytest.mark.asyncio
+async def test_async_execute_query_success(
+    mock_credential: Mock, mock_async_logs_client: Mock
+) -> None:
+    """Test async query execution returns the same row contract."""
+    client = AsyncLogAnalyticsClient(
+        workspace_id="test-workspace-id", credential=mock_credential
+    )
+    results = await client.execute_query("test query", timespan="PT12H")
+
+    assert len(results) == 2
+    assert results[0]["UserEmail"] == "test@example.com"
+    call_kwargs = mock_async_logs_client.query_workspace.call_args.kwargs
+    assert call_kwargs["workspace_id"] == "test-workspace-id"
+    assert call_kwargs["timespan"].total_seconds() == 12 * 3600
+
+
+@pytest.mark.asyncio
+async def test_async_execute_query_failure(
+    mock_credential: Mock, mock_async_logs_client: Mock
+) -> None:
+    """Test async query returns an empty list on failed status."""
+    mock_response = Mock()
+    mock_response.status = "FAILED"
+    mock_async_logs_client.query_workspace.return_value = mock_response
+
+    client = AsyncLogAnalyticsClient(
+        workspace_id="test-workspace-id", credential=mock_credential
+    )
+
+    assert await client.execute_query("test query") == []
+
+
+@pytest.mark.asyncio
+async def test_async_client_context_manager_closes(mock_async_logs_client: Mock) -> None:
+    """Test the async client opens once and closes its session, not a shared credential."""
+    mock_credential = AsyncMock()
+    async with AsyncLogAnalyticsClient(
+        workspace_id="test-workspace-id", credential=mock_credential
+    ) as client:
+        await client.execute_query("first query")
+        await client.execute_query("second query")
+
+    mock_async_logs_client.__aenter__.assert_awaited_once()
+    mock_async_logs_client.close.assert_awaited_once()
+    mock_credential.close.assert_not_awaited()
+    assert mock_async_logs_client.query_workspace.await_count == 2
+
+    async with AsyncLogAnalyticsClient(
+        workspace_id="test-workspace-id", credential=mock_credential, owns_credential=True
+    ):
+        pass
+
+    mock_credential.close.assert_awaited_once()
+
+
+@pytest.fixture
+def columnar_client(mock_credential: Mock, monkeypatch: pytest.MonkeyPatch) -> LogAnalyticsClient:
+    """Client whose LogsQueryClient returns a two-row success response."""
+    mock_client_instance = Mock()
+    mock_client_instance.query_workspace.return_value = _success_response()
+    monkeypatch.setattr(
+        "src.pim_auto.azure.log_analytics.LogsQueryClient",
+        Mock(return_value=mock_client_instance),
+    )
+    return LogAnalyticsClient(workspace_id="test-workspace-id", credential=mock_credential)
+
+
+def test_execute_query_columnar(columnar_client: LogAnalyticsClient) -> None:
+    """Test columnar results keep column names once and rows as tuples."""
+    result = columnar_client.execute_query_columnar("test query")
+
+    assert result.columns == ("TimeGenerated", "UserEmail")
+    assert len(result) == 2
+    assert result.rows[0] == (
+        datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc),
+        "test@example.com",
+    )
+    assert result.column("UserEmail") == ["test@example.com", "user@example.com"]
+    assert result.column_index("UserEmail") == 1
+    assert result.column_index("Missing") is None
+    assert result.to_dicts() == columnar_client.execute_query("test query")
+
+
+def test_stream_query(columnar_client: LogAnalyticsClient) -> None:
+    """Test streaming results yield tuples with a column index."""
+    stream = columnar_client.stream_query("test query")
+
+    email_index = stream.column_index("UserEmail")
+    assert [row[email_index] for row in stream] == ["test@example.com", "user@example.com"]
+
+
+def test_execute_query_columnar_failure(
+    mock_credential: Mock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test columnar mode returns an empty result on failed status."""
+    mock_response = Mock()
+    mock_response.status = "FAILED"
+    mock_client_instance = Mock()
+    mock_client_instance.query_workspace.return_value = mock_response
+    monkeypatch.setattr(
+        "src.pim_auto.azure.log_analytics.LogsQueryClient",
+        Mock(return_value=mock_client_instance),
+    )
+
+    client = LogAnalyticsClient(workspace_id="test-workspace-id", credential=mock_credential)
+
+    result = client.execute_query_columnar("test query")
+    assert isinstance(result, QueryResult)
+    assert len(result) == 0
+    assert list(client.stream_query("test query")) == []
+
+
+@pytest.mark.asyncio
+async def test_async_execute_query_columnar(
+    mock_credential: Mock, mock_async_logs_client: Mock
+) -> None:
+    """Test async columnar results."""
+    client = AsyncLogAnalyticsClient(
+        workspace_id="test-workspace-id", credential=mock_credential
+    )
+    result = await client.execute_query_columnar("test query")
+
+    assert result.column("UserEmail") == ["test@example.com", "user@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_async_stream_query(mock_credential: Mock, mock_async_logs_client: Mock) -> None:
+    """Test async streaming returns rows as tuples, like the sync client."""
+    client = AsyncLogAnalyticsClient(workspace_id="test-workspace-id", credential=mock_credential)
+    stream = await client.stream_query("test query")
+
+    email = stream.column_index("UserEmail")
+    assert [row[email] for row in stream] == ["test@example.com", "user@example.com"]
+
+
+def _table(rows: list) -> Mock:
+    table = Mock()
+    table.columns = ["TimeGenerated", "UserEmail"]
+    table.rows = rows
+    return table
+
+
+def _partial_response(rows: list, code: str, message: str) -> LogsQueryPartialResult:
+    return LogsQueryPartialResult(
+        partial_data=[_table(rows)],
+        partial_error=LogsQueryError(code=code, message=message),
+    )
+
+
+def _client_returning(monkeypatch: pytest.MonkeyPatch, side_effect: list, **kwargs) -> tuple:
+    mock_client_instance = Mock()
+    mock_client_instance.query_workspace.side_effect = side_effect
+    mock_client_class = Mock(return_value=mock_client_instance)
+    monkeypatch.setattr("src.pim_auto.azure.log_analytics.LogsQueryClient", mock_client_class)
+    client = LogAnalyticsClient(workspace_id="test-workspace-id", credential=Mock(), **kwargs)
+    return client, mock_client_instance, mock_client_class
+
+
+def test_partial_results_are_surfaced(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test partial results keep their rows and expose the error."""
+    row = [datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc), "test@example.com"]
+    client, _, _ = _client_returning(
+        monkeypatch,
+        [_partial_response([row], "PartialError", "Some shards failed")] * 2,
+    )
+
+    result = client.execute_query_columnar("test query")
+
+    assert result.rows == [tuple(row)]
+    assert result.partial_error.message == "Some shards failed"
+    rows = client.execute_query("test query")
+    assert rows == [{"TimeGenerated": row[0], "UserEmail": "test@example.com"}]
+    assert rows.partial_error.message == "Some shards failed"
+
+
+def test_partial_results_split_timespan_on_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a query hitting the result-size limit is re-run over two halves."""
+    start = datetime(2026, 2, 10, 0, 0, 0, tzinfo=timezone.utc)
+    end = start + timedelta(hours=8)
+    first = [start + timedelta(hours=1), "a@example.com"]
+    second = [start + timedelta(hours=5), "b@example.com"]
+    success_first = Mock(status=LogsQueryStatus.SUCCESS, tables=[_table([first])])
+    success_second = Mock(status=LogsQueryStatus.SUCCESS, tables=[_table([second])])
+    client, instance, _ = _client_returning(
+        monkeypatch,
+        [
+            _partial_response([first], "PartialError", "E_QUERY_RESULT_SET_TOO_LARGE"),
+            success_first,
+            success_second,
+        ],
+    )
+
+    stream = client.stream_query("test query", timespan=(start, end), split_on_limit=True)
+
+    assert [row[1] for row in stream] == ["a@example.com", "b@example.com"]
+    assert stream.partial_error is None
+    timespans = [call.kwargs["timespan"] for call in instance.query_workspace.call_args_list]
+    assert timespans == [
+        (start, end),
+        (start, start + timedelta(hours=4)),
+        (start + timedelta(hours=4), end),
+    ]
+
+
+def test_partial_results_not_split_without_opt_in(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test aggregating queries are not split unless requested."""
+    client, instance, _ = _client_returning(
+        monkeypatch, [_partial_response([], "PartialError", "Query exceeded the time limit")]
+    )
+
+    result = client.execute_query_columnar("test query", timespan="PT24H")
+
+    assert result.partial_error is not None
+    instance.query_workspace.assert_called_once()
+
+
+def test_throttled_queries_are_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test 429 responses are retried with backoff when a policy is set."""
+    throttled = HttpResponseError(message="Too many requests")
+    throttled.status_code = 429
+    sleeps: list = []
+    client, instance, client_class = _client_returning(
+        monkeypatch,
+        [throttled, _success_response()],
+        retry_policy=RetryPolicy(sleep=sleeps.append, random_fraction=lambda: 0.0),
+    )
+
+    results = client.execute_query("test query")
+
+    assert len(results) == 2
+    assert instance.query_workspace.call_count == 2
+    assert sleeps == [0.5]
+    assert client_class.call_args.kwargs == {"retry_total": 0}
+
+
+def test_non_retryable_errors_are_raised(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test bad requests are raised without retrying."""
+    bad_request = HttpResponseError(message="Bad query")
+    bad_request.status_code = 400
+    sleeps: list = []
+    client, instance, _ = _client_returning(
+        monkeypatch, [bad_request], retry_policy=RetryPolicy(sleep=sleeps.append)
+    )
+
+    with pytest.raises(HttpResponseError):
+        client.execute_query("test query")
+
+    assert sleeps == []
+    instance.query_workspace.assert_called_once()
+
+
+def test_chunked_query_adapts_chunk_size(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test long windows run as sub-windows that shrink for busy periods."""
+    start = datetime(2026, 2, 10, 0, 0, 0, tzinfo=timezone.utc)
+    end = start + timedelta(hours=24)
+
+    def query_workspace(workspace_id: str, query: str, timespan: tuple) -> Mock:
+        rows_per_window = 4 if timespan[0] < start + timedelta(hours=12) else 1
+        rows = [[timespan[0], "a@example.com"]] * rows_per_window
+        return Mock(status=LogsQueryStatus.SUCCESS, tables=[_table(rows)])
+
+    client, instance, _ = _client_returning(
+        monkeypatch,
+        query_workspace,
+        chunk_size=timedelta(hours=6),
+        max_chunk_workers=2,
+        target_chunk_rows=2,
+    )
+
+    result = client.execute_query_columnar("test query", timespan=(start, end), chunked=True)
+
+    timespans = sorted(call.kwargs["timespan"] for call in instance.query_workspace.call_args_list)
+    hours = [(s - start, e - start) for s, e in timespans]
+    assert hours == [
+        (timedelta(hours=0), timedelta(hours=6)),
+        (timedelta(hours=6), timedelta(hours=12)),
+        (timedelta(hours=12), timedelta(hours=15)),
+        (timedelta(hours=15), timedelta(hours=18)),
+        (timedelta(hours=18), timedelta(hours=24)),
+    ]
+    times = result.column("TimeGenerated")
+    assert len(times) == 11
+    assert times == sorted(times)
+
+
+def test_max_concurrent_queries_bounds_nested_chunk_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test chunked queries from several threads share one in-flight limit."""
+    start = datetime(2026, 2, 10, 0, 0, 0, tzinfo=timezone.utc)
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, peak
+
+    def query_workspace(workspace_id: str, query: str, timespan: tuple) -> Mock:
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        return Mock(status=LogsQueryStatus.SUCCESS, tables=[_table([])])
+
+    client, instance, _ = _client_returning(
+        monkeypatch,
+        query_workspace,
+        chunk_size=timedelta(hours=1),
+        max_chunk_workers=4,
+        max_concurrent_queries=2,
+    )
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(
+                client.execute_query,
+                "test query",
+                timespan=(start, start + timedelta(hours=8)),
+                chunked=True,
+            )
+            for _ in range(3)
+        ]
+        for future in futures:
+            future.result()
+
+    assert instance.query_workspace.call_count == 24
+    assert in_flight[1] == 2
+
+
+def test_chunked_query_short_window_runs_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test windows within the chunk size are queried as a single request."""
+    client, instance, _ = _client_returning(
+        monkeypatch, [_success_response()], chunk_size=timedelta(hours=24)
+    )
+
+    client.execute_query("test query", timespan="PT12H", chunked=True)
+
+    instance.query_workspace.assert_called_once()
+    assert instance.query_workspace.call_args.kwargs["timespan"] == timedelta(hours=12)
+
+
+def test_additional_workspaces_are_queried_together(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test additional workspaces are passed to the same query request."""
+    client, instance, _ = _client_returning(
+        monkeypatch,
+        [_success_response()],
+        additional_workspace_ids=["workspace-b", "workspace-c"],
+    )
+
+    results = client.execute_query("test query")
+
+    assert len(results) == 2
+    instance.query_workspace.assert_called_once()
+    kwargs = instance.query_workspace.call_args.kwargs
+    assert kwargs["workspace_id"] == "test-workspace-id"
+    assert kwargs["additional_workspaces"] == ["workspace-b", "workspace-c"]
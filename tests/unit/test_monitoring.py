@@ -3,7 +3,7 @@
 import os
 from unittest.mock import MagicMock, patch
 
-from pim_auto.monitoring.app_insights import ApplicationInsightsMonitor
+from pim_auto.monitoring.app_insights import ApplicationInsightsMonitor, measurement_logger
 
 
 class TestApplicationInsightsMonitor:
@@ -110,6 +110,46 @@ class TestApplicationInsightsMonitor:
             mock_mmap.measure_int_put.assert_called_once()
             mock_mmap.record.assert_called_once()
 
+    @patch("pim_auto.monitoring.app_insights.metrics_exporter")
+    def test_track_stage_and_openai_durations(self, mock_exporter):
+        """Test tracking stage and OpenAI call durations."""
+        conn_string = "InstrumentationKey=test-key"
+        monitor = ApplicationInsightsMonitor(connection_string=conn_string)
+
+        with patch.object(
+            monitor.stats_recorder, "new_measurement_map"
+        ) as mock_mmap_factory:
+            mock_mmap = MagicMock()
+            mock_mmap_factory.return_value = mock_mmap
+
+            monitor.track_stage_duration(250.0, "report")
+            monitor.track_openai_duration(800.0, "assessment", "failure")
+            monitor.track_openai_tokens(1200, 80, "assessment")
+
+            assert mock_mmap.measure_float_put.call_count == 2
+            assert mock_mmap.measure_int_put.call_count == 2
+            assert mock_mmap.record.call_count == 3
+
+    @patch("pim_auto.monitoring.app_insights.metrics_exporter")
+    def test_query_duration_histogram_is_tagged(self, mock_exporter):
+        """Test query durations are aggregated into tagged histogram buckets."""
+        conn_string = "InstrumentationKey=test-key"
+        monitor = ApplicationInsightsMonitor(connection_string=conn_string)
+
+        monitor.track_query_duration(40.0, "histogram_test")
+        monitor.track_query_duration(3000.0, "histogram_test")
+        monitor.track_query_duration(90.0, "histogram_test", "failure")
+
+        view_data = monitor.view_manager.get_view("query_duration_view")
+        aggregations = {
+            tuple(key): data
+            for key, data in view_data.tag_value_aggregation_data_map.items()
+        }
+        success = aggregations[("histogram_test", "success")]
+        assert success.count_data == 2
+        assert sum(1 for count in success.counts_per_bucket if count) == 2
+        assert aggregations[("histogram_test", "failure")].count_data == 1
+
     def test_get_log_handler_when_disabled(self):
         """Test log handler returns None when disabled."""
         monitor = ApplicationInsightsMonitor(connection_string=None)
@@ -139,6 +179,28 @@ class TestApplicationInsightsMonitor:
         )
         mock_handler.setLevel.assert_called_once()
 
+    @patch("pim_auto.monitoring.app_insights.metrics_exporter")
+    @patch("pim_auto.monitoring.app_insights.AzureLogHandler")
+    def test_get_log_handler_attaches_measurement_handler_once(
+        self, mock_handler_class, mock_exporter
+    ):
+        """Test repeated calls and monitors leave one handler for measurement traces."""
+        mock_handler_class.side_effect = lambda **kwargs: MagicMock()
+        first = ApplicationInsightsMonitor(connection_string="InstrumentationKey=test-key")
+        second = ApplicationInsightsMonitor(connection_string="InstrumentationKey=test-key")
+
+        try:
+            handler = first.get_log_handler()
+            assert first.get_log_handler() is handler
+            assert measurement_logger.handlers == [handler]
+
+            latest = second.get_log_handler()
+            assert measurement_logger.handlers == [latest]
+            assert mock_handler_class.call_count == 2
+        finally:
+            for attached in list(measurement_logger.handlers):
+                measurement_logger.removeHandler(attached)
+
     @patch("pim_auto.monitoring.app_insights.metrics_exporter")
     def test_track_exception(self, mock_exporter):
         """Test exception tracking."""
@@ -1,10 +1,25 @@
 """Tests for Azure OpenAI client module."""
 
-from unittest.mock import Mock
+import asyncio
+from unittest.mock import AsyncMock, Mock
 
+import httpx
+import openai
 import pytest
 
-from src.pim_auto.azure.openai_client import OpenAIClient
+from pim_auto.monitoring.timing import StageTimer
+from src.pim_auto.azure.openai_client import AsyncOpenAIClient, OpenAIClient
+from src.pim_auto.azure.rate_limiter import RateLimiter, RetryPolicy
+
+
+def _status_error(error_type: type, status_code: int, headers: dict) -> Exception:
+    """Build an OpenAI status error with the given response headers."""
+    response = httpx.Response(
+        status_code,
+        headers=headers,
+        request=httpx.Request("POST", "https://test.openai.azure.com"),
+    )
+    return error_type("error", response=response, body=None)
 
 
 @pytest.fixture
@@ -95,6 +110,144 @@ def test_generate_completion_success(
     )
 
 
+def test_generate_completion_response_format(
+    mock_credential: Mock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a response format is passed through for structured output."""
+    mock_client_instance = Mock()
+    mock_client_instance.chat.completions.create.return_value.choices = [
+        Mock(message=Mock(content='{"level": "ALIGNED"}'))
+    ]
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.get_bearer_token_provider", Mock()
+    )
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.AzureOpenAI",
+        Mock(return_value=mock_client_instance),
+    )
+
+    client = OpenAIClient(
+        endpoint="https://test.openai.azure.com",
+        deployment="gpt-4",
+        api_version="2024-08-01-preview",
+        credential=mock_credential,
+    )
+
+    messages = [{"role": "user", "content": "test message"}]
+    result = client.generate_completion(
+        messages, max_tokens=300, response_format={"type": "json_object"}
+    )
+
+    assert result == '{"level": "ALIGNED"}'
+    mock_client_instance.chat.completions.create.assert_called_once_with(
+        model="gpt-4",
+        messages=messages,
+        temperature=0.7,
+        max_tokens=300,
+        response_format={"type": "json_object"},
+    )
+
+
+def test_generate_completion_reports_token_usage(
+    mock_credential: Mock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test reported token usage reaches the enclosing timed OpenAI call."""
+    mock_client_instance = Mock()
+    mock_client_instance.chat.completions.create.return_value = Mock(
+        choices=[Mock(message=Mock(content="ALIGNED"))],
+        usage=Mock(prompt_tokens=420, completion_tokens=12),
+    )
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.get_bearer_token_provider", Mock()
+    )
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.AzureOpenAI",
+        Mock(return_value=mock_client_instance),
+    )
+    client = OpenAIClient(
+        endpoint="https://test.openai.azure.com",
+        deployment="gpt-4",
+        api_version="2024-08-01-preview",
+        credential=mock_credential,
+    )
+    monitor = Mock()
+
+    with StageTimer(monitor).openai_call("assessment"):
+        client.generate_completion([{"role": "user", "content": "test message"}])
+
+    monitor.track_openai_tokens.assert_called_once_with(420, 12, "assessment", "success")
+
+
+def test_generate_completion_retries_throttled_requests(
+    mock_credential: Mock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test 429 responses are retried after the requested delay."""
+    mock_client_instance = Mock()
+    success = Mock()
+    success.choices = [Mock(message=Mock(content="ALIGNED"))]
+    mock_client_instance.chat.completions.create.side_effect = [
+        _status_error(openai.RateLimitError, 429, {"retry-after": "3"}),
+        _status_error(openai.InternalServerError, 503, {}),
+        success,
+    ]
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.get_bearer_token_provider", Mock()
+    )
+    mock_azure_openai = Mock(return_value=mock_client_instance)
+    monkeypatch.setattr("src.pim_auto.azure.openai_client.AzureOpenAI", mock_azure_openai)
+
+    sleeps: list = []
+    limiter = Mock(spec=RateLimiter)
+    client = OpenAIClient(
+        endpoint="https://test.openai.azure.com",
+        deployment="gpt-4",
+        api_version="2024-02-15-preview",
+        credential=mock_credential,
+        rate_limiter=limiter,
+        retry_policy=RetryPolicy(sleep=sleeps.append, random_fraction=lambda: 0.0),
+    )
+
+    result = client.generate_completion([{"role": "user", "content": "test"}])
+
+    assert result == "ALIGNED"
+    assert mock_azure_openai.call_args[1]["max_retries"] == 0
+    assert mock_client_instance.chat.completions.create.call_count == 3
+    assert limiter.acquire.call_count == 3
+    # retry-after is honored and shared with queued requests, then exponential backoff
+    limiter.pause.assert_called_once_with(3.0)
+    assert sleeps == [3.0, 1.0]
+
+
+def test_generate_completion_does_not_retry_client_errors(
+    mock_credential: Mock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test non-retryable errors are raised immediately."""
+    mock_client_instance = Mock()
+    mock_client_instance.chat.completions.create.side_effect = _status_error(
+        openai.BadRequestError, 400, {}
+    )
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.get_bearer_token_provider", Mock()
+    )
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.AzureOpenAI", Mock(return_value=mock_client_instance)
+    )
+    sleeps: list = []
+    client = OpenAIClient(
+        endpoint="https://test.openai.azure.com",
+        deployment="gpt-4",
+        api_version="2024-02-15-preview",
+        credential=mock_credential,
+        retry_policy=RetryPolicy(sleep=sleeps.append),
+    )
+
+    with pytest.raises(openai.BadRequestError):
+        client.generate_completion([{"role": "user", "content": "test"}])
+
+    assert sleeps == []
+    mock_client_instance.chat.completions.create.assert_called_once()
+
+
 def test_generate_completion_exception(
     mock_credential: Mock, monkeypatch: pytest.MonkeyPatch
 ) -> None:
@@ -128,3 +281,107 @@ def test_generate_completion_exception(
 
     with pytest.raises(Exception, match="API Error"):
         client.generate_completion(messages)
+
+
+@pytest.fixture
+def mock_async_openai(monkeypatch: pytest.MonkeyPatch) -> Mock:
+    """Patch the async OpenAI SDK client and return its instance."""
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.get_async_bearer_token_provider",
+        Mock(return_value=AsyncMock()),
+    )
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.DefaultAsyncHttpxClient", Mock()
+    )
+
+    mock_client_instance = Mock()
+    mock_client_instance.close = AsyncMock()
+    monkeypatch.setattr(
+        "src.pim_auto.azure.openai_client.AsyncAzureOpenAI",
+        Mock(return_value=mock_client_instance),
+    )
+    return mock_client_instance
+
+
+def _completion(content: str) -> Mock:
+    mock_choice = Mock()
+    mock_choice.message.content = content
+    mock_response = Mock()
+    mock_response.choices = [mock_choice]
+    return mock_response
+
+
+@pytest.mark.asyncio
+async def test_async_generate_completion_success(
+    mock_credential: Mock, mock_async_openai: Mock
+) -> None:
+    """Test async completion keeps the same message/temperature interface."""
+    mock_async_openai.chat.completions.create = AsyncMock(
+        return_value=_completion("Generated response")
+    )
+
+    client = AsyncOpenAIClient(
+        endpoint="https://test.openai.azure.com",
+        deployment="gpt-4",
+        api_version="2024-02-15-preview",
+        credential=mock_credential,
+    )
+
+    messages = [{"role": "user", "content": "test message"}]
+    result = await client.generate_completion(messages, temperature=0.2, max_tokens=100)
+
+    assert result == "Generated response"
+    mock_async_openai.chat.completions.create.assert_awaited_once_with(
+        model="gpt-4", messages=messages, temperature=0.2, max_tokens=100
+    )
+
+
+@pytest.mark.asyncio
+async def test_async_generate_completion_limits_in_flight_requests(
+    mock_credential: Mock, mock_async_openai: Mock
+) -> None:
+    """Test that no more than max_concurrent_requests calls run at once."""
+    in_flight = 0
+    peak = 0
+
+    async def slow_create(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _completion("ok")
+
+    mock_async_openai.chat.completions.create = slow_create
+
+    client = AsyncOpenAIClient(
+        endpoint="https://test.openai.azure.com",
+        deployment="gpt-4",
+        api_version="2024-02-15-preview",
+        credential=mock_credential,
+        max_concurrent_requests=2,
+    )
+
+    messages = [{"role": "user", "content": "test message"}]
+    results = await asyncio.gather(
+        *(client.generate_completion(messages) for _ in range(6))
+    )
+
+    assert results == ["ok"] * 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_async_client_context_manager_closes(
+    mock_credential: Mock, mock_async_openai: Mock
+) -> None:
+    """Test the async client closes its connection pool on exit."""
+    async with AsyncOpenAIClient(
+        endpoint="https://test.openai.azure.com",
+        deployment="gpt-4",
+        api_version="2024-02-15-preview",
+        credential=mock_credential,
+    ):
+        pass
+
+    mock_async_openai.close.assert_awaited_once()
@@ -1,11 +1,13 @@
 """Tests for PIM detector module."""
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from unittest.mock import MagicMock, Mock
 
 import pytest
 
+from src.pim_auto.azure.log_analytics import QueryRows
 from src.pim_auto.core.pim_detector import PIMActivation, PIMDetector
+from src.pim_auto.core.scan_state import ScanWatermark
 
 
 @pytest.fixture
@@ -68,6 +70,194 @@ def test_detect_activations_query_format(mock_log_analytics: Mock) -> None:
     assert "AuditLogs" in query
 
 
+def test_detect_activations_since_watermark(mock_log_analytics: Mock) -> None:
+    """Test that a watermark restricts the query to newer records."""
+    mock_log_analytics.execute_query.return_value = [
+        {
+            "TimeGenerated": datetime(2026, 2, 10, 12, 0, 0, tzinfo=timezone.utc),
+            "RecordId": "record-9",
+            "UserEmail": "john.doe@contoso.com",
+            "RoleName": "Contributor",
+            "Reason": "need to add a storage account",
+        }
+    ]
+
+    detector = PIMDetector(mock_log_analytics)
+    watermark = ScanWatermark(
+        time_generated=datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc),
+        record_id="record-5",
+    )
+    activations = detector.detect_activations(hours=24, since=watermark)
+
+    query = mock_log_analytics.execute_query.call_args.kwargs["query"]
+    assert "TimeGenerated > datetime(2026-02-10T11:00:00+00:00)" in query
+    assert 'strcmp(Id, "record-5") > 0' in query
+    assert activations[0].record_id == "record-9"
+
+
+def test_detect_activations_since_watermark_with_overlap(mock_log_analytics: Mock) -> None:
+    """Test that an overlap re-scans behind the watermark for late-ingested records."""
+    detector = PIMDetector(mock_log_analytics)
+    watermark = ScanWatermark(
+        time_generated=datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc),
+        record_id="record-5",
+    )
+    detector.detect_activations(hours=24, since=watermark, overlap=timedelta(minutes=30))
+
+    query = mock_log_analytics.execute_query.call_args.kwargs["query"]
+    assert "TimeGenerated >= datetime(2026-02-10T10:30:00+00:00)" in query
+    assert "strcmp" not in query
+
+
+def test_detect_activations_without_watermark(mock_log_analytics: Mock) -> None:
+    """Test that a full scan has no watermark filter."""
+    detector = PIMDetector(mock_log_analytics)
+    activations = detector.detect_activations(hours=24)
+
+    query = mock_log_analytics.execute_query.call_args.kwargs["query"]
+    assert "strcmp" not in query
+    assert activations[0].record_id == ""
+
+
+def test_detect_activations_uses_recorded_end(mock_log_analytics: Mock) -> None:
+    """Test that the elevation end comes from deactivation or requested expiry."""
+    start = datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc)
+    mock_log_analytics.execute_query.return_value = [
+        {
+            "TimeGenerated": start,
+            "UserEmail": "deactivated@contoso.com",
+            "RoleName": "Owner",
+            "Reason": "quick fix",
+            "RequestedEnd": datetime(2026, 2, 10, 18, 0, 0, tzinfo=timezone.utc),
+            "DeactivatedAt": datetime(2026, 2, 10, 10, 40, 0, tzinfo=timezone.utc),
+        },
+        {
+            "TimeGenerated": start,
+            "UserEmail": "expiring@contoso.com",
+            "RoleName": "Contributor",
+            "Reason": "deploy",
+            "RequestedEnd": datetime(2026, 2, 10, 12, 30, 0, tzinfo=timezone.utc),
+            "DeactivatedAt": None,
+        },
+        {
+            "TimeGenerated": start,
+            "UserEmail": "unknown@contoso.com",
+            "RoleName": "Reader",
+            "Reason": "review",
+            "RequestedEnd": None,
+            "DeactivatedAt": None,
+        },
+    ]
+
+    detector = PIMDetector(mock_log_analytics)
+    deactivated, expiring, unknown = detector.detect_activations(hours=24)
+
+    assert deactivated.end_time == datetime(2026, 2, 10, 10, 40, 0, tzinfo=timezone.utc)
+    assert deactivated.duration_hours == 1
+    assert expiring.end_time == datetime(2026, 2, 10, 12, 30, 0, tzinfo=timezone.utc)
+    assert expiring.duration_hours == 3
+    assert unknown.end_time is None
+    assert unknown.duration_hours == 24
+
+    query = mock_log_analytics.execute_query.call_args.kwargs["query"]
+    assert "PIM activation expired" in query
+    assert "join kind=leftouter endings on UserEmail, RoleName" in query
+
+
+def test_detect_activations_chunked_joins_endings(mock_log_analytics: Mock) -> None:
+    """Test long windows query activations and endings separately and join them."""
+    start = datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc)
+    activation_rows = [
+        {
+            "TimeGenerated": start,
+            "RecordId": "record-1",
+            "UserEmail": "john.doe@contoso.com",
+            "RoleName": "Owner",
+            "Reason": "quick fix",
+            "RequestedEnd": datetime(2026, 2, 10, 18, 0, 0, tzinfo=timezone.utc),
+        },
+        {
+            "TimeGenerated": datetime(2026, 2, 12, 9, 0, 0, tzinfo=timezone.utc),
+            "RecordId": "record-2",
+            "UserEmail": "jane.smith@contoso.com",
+            "RoleName": "Contributor",
+            "Reason": "deploy",
+            "RequestedEnd": None,
+        },
+    ]
+    ending_rows = [
+        {
+            "EndedAt": datetime(2026, 2, 9, 8, 0, 0, tzinfo=timezone.utc),
+            "UserEmail": "john.doe@contoso.com",
+            "RoleName": "Owner",
+        },
+        {
+            "EndedAt": datetime(2026, 2, 10, 11, 30, 0, tzinfo=timezone.utc),
+            "UserEmail": "john.doe@contoso.com",
+            "RoleName": "Owner",
+        },
+    ]
+    mock_log_analytics.execute_query.side_effect = [activation_rows, ending_rows]
+
+    detector = PIMDetector(mock_log_analytics, chunk_hours=24)
+    jane, john = detector.detect_activations(hours=72)
+
+    assert jane.user_email == "jane.smith@contoso.com"
+    assert jane.end_time is None
+    assert john.end_time == datetime(2026, 2, 10, 11, 30, 0, tzinfo=timezone.utc)
+    assert john.duration_hours == 2
+    calls = mock_log_analytics.execute_query.call_args_list
+    assert len(calls) == 2
+    assert all(call.kwargs["chunked"] is True for call in calls)
+    assert "join" not in calls[0].kwargs["query"]
+    assert "PIM activation expired" in calls[1].kwargs["query"]
+
+
+def test_detect_activations_dedups_overlapping_workspaces(mock_log_analytics: Mock) -> None:
+    """Test records mirrored to several workspaces are collapsed by Id before the join."""
+    mock_log_analytics.execute_query.return_value = []
+    detector = PIMDetector(mock_log_analytics)
+    detector.detect_activations(hours=24)
+
+    query = mock_log_analytics.execute_query.call_args.kwargs["query"]
+    assert query.count("summarize arg_max(TimeGenerated, *) by Id") == 2
+    assert query.index("by Id") < query.index("join kind=leftouter")
+
+    mock_log_analytics.execute_query.reset_mock()
+    mock_log_analytics.execute_query.side_effect = [[], []]
+    PIMDetector(mock_log_analytics, chunk_hours=24).detect_activations(hours=72)
+
+    for call in mock_log_analytics.execute_query.call_args_list:
+        assert "summarize arg_max(TimeGenerated, *) by Id" in call.kwargs["query"]
+
+
+def test_detect_activations_records_partial_results(mock_log_analytics: Mock) -> None:
+    """Test a partial query result is kept and its error recorded for the caller."""
+    rows = mock_log_analytics.execute_query.return_value
+    mock_log_analytics.execute_query.return_value = QueryRows(rows, "Query exceeded the time limit")
+
+    detector = PIMDetector(mock_log_analytics)
+    activations = detector.detect_activations(hours=24)
+
+    assert len(activations) == 2
+    assert detector.partial_errors == ["pim_detection: Query exceeded the time limit"]
+
+
+def test_pim_activation_is_active_uses_end_time() -> None:
+    """Test that a recorded end time overrides the duration estimate."""
+    activation = PIMActivation(
+        user_email="test@example.com",
+        role_name="Contributor",
+        activation_reason="test reason",
+        activation_time=datetime(2026, 2, 10, 10, 0, 0, tzinfo=timezone.utc),
+        duration_hours=24,
+        end_time=datetime(2026, 2, 10, 11, 0, 0, tzinfo=timezone.utc),
+    )
+
+    assert activation.is_active(datetime(2026, 2, 10, 10, 30, 0, tzinfo=timezone.utc))
+    assert not activation.is_active(datetime(2026, 2, 10, 12, 0, 0, tzinfo=timezone.utc))
+
+
 def test_pim_activation_dataclass() -> None:
     """Test PIMActivation dataclass."""
     activation = PIMActivation(
@@ -5,6 +5,7 @@ from unittest.mock import Mock
 import pytest
 
 from src.pim_auto.core.query_generator import QueryGenerator
+from src.pim_auto.monitoring.timing import StageTimer
 
 
 @pytest.fixture
@@ -90,3 +91,18 @@ def test_generate_query_temperature(mock_openai: Mock) -> None:
 
     call_args = mock_openai.generate_completion.call_args
     assert call_args.kwargs["temperature"] == 0.3
+
+
+def test_generate_query_times_each_openai_call(mock_openai: Mock) -> None:
+    """Test every OpenAI request, including retries, is recorded by the timer."""
+    mock_openai.generate_completion.side_effect = [
+        "Sorry, I cannot help.",
+        "AuditLogs | where TimeGenerated > ago(24h)",
+    ]
+    monitor = Mock()
+
+    generator = QueryGenerator(mock_openai, timer=StageTimer(monitor))
+    generator.generate_query("test")
+
+    assert monitor.track_openai_call.call_count == 2
+    monitor.track_openai_call.assert_called_with("query_generation", "success")
@@ -0,0 +1,145 @@
+"""Tests for rate limiter module."""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from pim_auto.azure.rate_limiter import (
+    RateLimiter,
+    RetryPolicy,
+    TokenBucket,
+    estimate_request_tokens,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_estimate_request_tokens_counts_prompt_and_max_tokens() -> None:
+    """Test token estimation includes the requested output tokens."""
+    messages = [{"role": "system", "content": "a" * 40}, {"role": "user", "content": "b" * 2}]
+
+    assert estimate_request_tokens(messages, max_tokens=100) == 11 + 100
+
+
+def test_token_bucket_queues_reservations() -> None:
+    """Test reservations beyond the burst capacity wait for refill in order."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=60, burst_seconds=2, clock=clock)
+
+    assert bucket.capacity == 2
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+
+    clock.now = 10.0
+    assert bucket.reserve(1) == 0
+
+
+def test_rate_limiter_uses_the_tighter_quota() -> None:
+    """Test the limiter waits for whichever of RPM and TPM is exhausted."""
+    clock = FakeClock()
+    sleeps: list = []
+    limiter = RateLimiter(
+        requests_per_minute=600,
+        tokens_per_minute=6000,
+        burst_seconds=1,
+        clock=clock,
+        sleep=sleeps.append,
+    )
+
+    limiter.acquire(100)
+    limiter.acquire(100)
+
+    assert sleeps == [pytest.approx(1.0)]
+
+
+def test_token_bucket_charges_requests_above_capacity_in_full() -> None:
+    """Test a reservation larger than the burst capacity waits for its whole debt."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=600, burst_seconds=1, clock=clock)
+
+    assert bucket.capacity == 10
+    assert bucket.reserve(40) == pytest.approx(3.0)
+    assert bucket.reserve(10) == pytest.approx(4.0)
+
+
+def test_rate_limiter_refunds_request_slot_when_tokens_wait() -> None:
+    """Test a request held back by TPM does not also hold an RPM slot while it waits."""
+    clock = FakeClock()
+    limiter = RateLimiter(
+        requests_per_minute=120, tokens_per_minute=600, burst_seconds=1, clock=clock
+    )
+
+    assert limiter.reserve(10) == (0, False)
+    assert limiter.reserve(10) == (pytest.approx(1.0), True)
+    # Only the first request holds an RPM slot, so a third one is not delayed by RPM
+    assert limiter.requests is not None
+    assert limiter.requests.reserve(1) == 0
+
+
+def test_rate_limiter_charges_deferred_request_slot_on_release() -> None:
+    """Test a request released after a TPM wait still counts against RPM."""
+    clock = FakeClock()
+
+    def sleep(seconds: float) -> None:
+        clock.now += seconds
+
+    limiter = RateLimiter(
+        requests_per_minute=120, tokens_per_minute=600, burst_seconds=1, clock=clock, sleep=sleep
+    )
+
+    limiter.acquire(10)
+    limiter.acquire(10)
+
+    assert clock.now == pytest.approx(1.0)
+    # Both requests hold an RPM slot: one of the two refilled slots is left
+    assert limiter.requests is not None
+    assert limiter.requests.reserve(1) == 0
+    assert limiter.requests.reserve(1) == pytest.approx(0.5)
+
+
+def test_rate_limiter_pause_holds_requests() -> None:
+    """Test a retry-after pause delays every new request."""
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+
+    limiter.pause(5)
+    clock.now = 2.0
+
+    assert limiter.reserve(10) == (pytest.approx(3.0), False)
+
+
+def test_retry_after_seconds() -> None:
+    """Test retry-after header parsing."""
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds({}) is None
+    assert retry_after_seconds({"retry-after-ms": "1500"}) == 1.5
+    assert retry_after_seconds({"retry-after": "7"}) == 7.0
+    assert retry_after_seconds({"retry-after": "soon"}) is None
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = retry_after_seconds({"retry-after": format_datetime(later, usegmt=True)})
+    assert delay is not None and 25 < delay <= 30
+
+
+def test_retry_policy_backoff() -> None:
+    """Test jittered exponential backoff and retry-after handling."""
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0, random_fraction=lambda: 1.0)
+
+    assert [policy.backoff(attempt) for attempt in range(5)] == [1.0, 2.0, 4.0, 8.0, 8.0]
+    assert policy.backoff(3, retry_after=2.0) == 3.0
+
+    no_jitter = RetryPolicy(base_delay=1.0, random_fraction=lambda: 0.0)
+    assert no_jitter.backoff(2) == 2.0
+    assert no_jitter.backoff(2, retry_after=2.0) == 2.0
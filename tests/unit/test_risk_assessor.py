@@ -1,7 +1,8 @@
 """Tests for risk assessor module."""
 
+import json
 from datetime import datetime, timezone
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 
@@ -151,6 +152,25 @@ def test_assess_alignment_variations(mock_openai: Mock) -> None:
         assert assessment.level == expected_level
 
 
+@pytest.mark.asyncio
+async def test_assess_alignment_async() -> None:
+    """Test assessment with an async OpenAI client."""
+    mock_async_openai = Mock()
+    mock_async_openai.generate_completion = AsyncMock(
+        return_value="NOT_ALIGNED: Activities don't match the stated reason."
+    )
+
+    assessor = RiskAssessor(mock_async_openai)
+    assessment = await assessor.assess_alignment_async(
+        pim_reason="need to add a storage account", activities=[]
+    )
+
+    assert assessment.level == AlignmentLevel.NOT_ALIGNED
+    call_kwargs = mock_async_openai.generate_completion.call_args.kwargs
+    assert call_kwargs["temperature"] == 0.5
+    assert "need to add a storage account" in call_kwargs["messages"][1]["content"]
+
+
 def test_risk_assessment_dataclass() -> None:
     """Test RiskAssessment dataclass."""
     assessment = RiskAssessment(
@@ -160,3 +180,213 @@ def test_risk_assessment_dataclass() -> None:
 
     assert assessment.level == AlignmentLevel.ALIGNED
     assert assessment.explanation == "Test explanation"
+
+
+def test_assess_alignment_summarizes_large_activity_sets(mock_openai: Mock) -> None:
+    """Test the prompt stays within the activity token budget."""
+    mock_openai.generate_completion.return_value = "ALIGNED: deployment as stated."
+    activities = [
+        ActivityEvent(
+            timestamp=datetime(2026, 2, 10, 10, i % 60, tzinfo=timezone.utc),
+            operation_name="Microsoft.Resources/deployments/write",
+            resource_type="Microsoft.Resources",
+            resource_name=f"deployment{i}",
+            status="Succeeded",
+            resource_group="rg-prod",
+            subscription_id="sub-123",
+        )
+        for i in range(5000)
+    ]
+
+    assessor = RiskAssessor(mock_openai, activity_token_budget=500)
+    assessor.assess_alignment(pim_reason="run deployment script", activities=activities)
+
+    user_prompt = mock_openai.generate_completion.call_args[1]["messages"][1]["content"]
+    assert "5000 activities summarized into 1 groups:" in user_prompt
+    assert "deployment4999" not in user_prompt
+    assert len(user_prompt) < 500 * 4 + 500
+
+
+def _small_activities(operation: str) -> list:
+    return [
+        ActivityEvent(
+            timestamp=datetime(2026, 2, 10, 10, 30, tzinfo=timezone.utc),
+            operation_name=operation,
+            resource_type="Microsoft.Storage/storageAccounts",
+            resource_name="mystorageaccount",
+            status="Succeeded",
+            resource_group="rg-prod",
+            subscription_id="sub-123",
+        )
+    ]
+
+
+def test_assess_alignment_batch_packs_small_activations(mock_openai: Mock) -> None:
+    """Test several small activations are assessed in one request."""
+    mock_openai.generate_completion.return_value = (
+        '```json\n[{"id": 2, "level": "NOT_ALIGNED", "explanation": "Deleted data."},'
+        ' {"id": 1, "level": "ALIGNED", "explanation": "Created storage."}]\n```'
+    )
+    assessor = RiskAssessor(mock_openai)
+
+    assessments = assessor.assess_alignment_batch(
+        [
+            ("add a storage account", _small_activities("Create Storage Account")),
+            ("read some logs", _small_activities("Delete Storage Account")),
+        ]
+    )
+
+    mock_openai.generate_completion.assert_called_once()
+    prompt = mock_openai.generate_completion.call_args[1]["messages"][1]["content"]
+    assert "Activation 1:" in prompt and "Activation 2:" in prompt
+    assert [a.level for a in assessments] == [
+        AlignmentLevel.ALIGNED,
+        AlignmentLevel.NOT_ALIGNED,
+    ]
+    assert assessments[1].explanation == "NOT_ALIGNED: Deleted data."
+    assert assessor.path_counts == {"llm_batch": 2}
+
+
+def test_assess_alignment_batch_falls_back_to_single_requests(mock_openai: Mock) -> None:
+    """Test unparseable or incomplete batch answers fall back per activation."""
+    mock_openai.generate_completion.side_effect = [
+        '[{"id": 1, "level": "ALIGNED", "explanation": "ok"}]',
+        "PARTIALLY_ALIGNED: Some activities were unrelated.",
+    ]
+    assessor = RiskAssessor(mock_openai)
+
+    assessments = assessor.assess_alignment_batch(
+        [
+            ("add a storage account", _small_activities("Create Storage Account")),
+            ("add a storage account", _small_activities("Update Storage Account")),
+        ]
+    )
+
+    assert mock_openai.generate_completion.call_count == 2
+    assert [a.level for a in assessments] == [
+        AlignmentLevel.ALIGNED,
+        AlignmentLevel.PARTIALLY_ALIGNED,
+    ]
+    assert [a.source for a in assessments] == ["llm_batch", "llm"]
+
+    mock_openai.generate_completion.side_effect = ["not json at all", "ALIGNED", "ALIGNED"]
+    assessments = assessor.assess_alignment_batch(
+        [
+            ("add a storage account", _small_activities("Create Storage Account")),
+            ("add a storage account", _small_activities("Update Storage Account")),
+        ]
+    )
+    assert [a.source for a in assessments] == ["llm", "llm"]
+
+
+def test_assess_alignment_batch_structured_verdicts(mock_openai: Mock) -> None:
+    """Test batched requests use the configured structured response format."""
+    mock_openai.generate_completion.return_value = json.dumps(
+        {
+            "verdicts": [
+                {"id": 1, "level": "ALIGNED", "confidence": 0.9, "reasons": ["Created storage"]},
+                {"id": 2, "level": "NOT_ALIGNED", "confidence": 0.8, "reasons": ["Deleted a VM"]},
+            ]
+        }
+    )
+    assessor = RiskAssessor(mock_openai, response_format="json_schema")
+
+    assessments = assessor.assess_alignment_batch(
+        [
+            ("add a storage account", _small_activities("Create Storage Account")),
+            ("add a storage account", _small_activities("Delete Virtual Machine")),
+        ]
+    )
+
+    kwargs = mock_openai.generate_completion.call_args.kwargs
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert kwargs["response_format"]["json_schema"]["name"] == "pim_alignment_verdicts"
+    assert [a.level for a in assessments] == [AlignmentLevel.ALIGNED, AlignmentLevel.NOT_ALIGNED]
+    assert assessments[0].confidence == 0.9
+    assert assessments[1].reasons == ["Deleted a VM"]
+    assert {a.source for a in assessments} == {"llm_batch"}
+
+
+def test_assess_alignment_batch_isolates_failed_requests(mock_openai: Mock) -> None:
+    """Test a failed single request leaves only its own slot empty."""
+    mock_openai.generate_completion.side_effect = [
+        '[{"id": 1, "level": "ALIGNED", "explanation": "ok"}]',
+        RuntimeError("throttled"),
+    ]
+    assessor = RiskAssessor(mock_openai)
+
+    assessments = assessor.assess_alignment_batch(
+        [
+            ("add a storage account", _small_activities("Create Storage Account")),
+            ("add a storage account", _small_activities("Update Storage Account")),
+        ]
+    )
+
+    assert len(assessments) == 2
+    assert assessments[0] is not None and assessments[0].level == AlignmentLevel.ALIGNED
+    assert assessments[1] is None
+    assert assessor.path_counts == {"llm_batch": 1}
+
+
+def test_assess_alignment_batch_assesses_large_activations_alone(mock_openai: Mock) -> None:
+    """Test activations above the token threshold get their own request."""
+    mock_openai.generate_completion.return_value = "ALIGNED: fine."
+    assessor = RiskAssessor(mock_openai)
+
+    assessments = assessor.assess_alignment_batch(
+        [
+            ("add a storage account", _small_activities("Create Storage Account")),
+            ("add a storage account", _small_activities("Create Storage Account")),
+        ],
+        max_item_tokens=1,
+    )
+
+    assert mock_openai.generate_completion.call_count == 2
+    assert [a.source for a in assessments] == ["llm", "llm"]
+
+
+def test_assess_alignment_structured_output(mock_openai: Mock) -> None:
+    """Test structured verdicts are requested compactly and decoded directly."""
+    mock_openai.generate_completion.return_value = (
+        '{"level": "NOT_ALIGNED", "confidence": 0.9, "reasons": ["Deleted a storage account"]}'
+    )
+    assessor = RiskAssessor(mock_openai, response_format="json_schema")
+
+    assessment = assessor.assess_alignment(
+        "read logs", _small_activities("Delete Storage Account")
+    )
+
+    kwargs = mock_openai.generate_completion.call_args[1]
+    assert kwargs["max_tokens"] == 300
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert kwargs["response_format"]["json_schema"]["schema"]["required"] == [
+        "level",
+        "confidence",
+        "reasons",
+    ]
+    assert assessment.level == AlignmentLevel.NOT_ALIGNED
+    assert assessment.confidence == 0.9
+    assert assessment.reasons == ["Deleted a storage account"]
+    assert assessment.explanation == "Deleted a storage account (confidence 0.90)"
+
+
+def test_assess_alignment_structured_output_falls_back_to_text(mock_openai: Mock) -> None:
+    """Test an undecodable structured verdict is parsed as free text."""
+    mock_openai.generate_completion.return_value = "PARTIALLY_ALIGNED: mixed activity."
+    assessor = RiskAssessor(mock_openai, response_format="json_object")
+
+    assessment = assessor.assess_alignment(
+        "add storage", _small_activities("Create Storage Account")
+    )
+
+    assert mock_openai.generate_completion.call_args[1]["response_format"] == {
+        "type": "json_object"
+    }
+    assert assessment.level == AlignmentLevel.PARTIALLY_ALIGNED
+    assert assessment.confidence is None
+
+
+def test_invalid_response_format(mock_openai: Mock) -> None:
+    """Test unsupported response formats are rejected."""
+    with pytest.raises(ValueError, match="Unsupported response format"):
+        RiskAssessor(mock_openai, response_format="xml")
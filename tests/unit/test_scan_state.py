@@ -0,0 +1,94 @@
+"""Tests for incremental scan state module."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from pim_auto.core.pim_detector import PIMActivation
+from pim_auto.core.scan_state import ScanState, ScanStateStore, ScanWatermark
+
+
+def _activation(record_id: str, hour: int, duration_hours: int = 8) -> PIMActivation:
+    return PIMActivation(
+        user_email="user@example.com",
+        role_name="Contributor",
+        activation_reason="test reason",
+        activation_time=datetime(2026, 2, 10, hour, 0, 0, tzinfo=timezone.utc),
+        duration_hours=duration_hours,
+        record_id=record_id,
+    )
+
+
+def test_load_missing_file_returns_empty_state(tmp_path: Path) -> None:
+    """Test that a missing state file means a full scan."""
+    state = ScanStateStore(tmp_path / "state.json").load()
+
+    assert state.watermark is None
+    assert state.open_activations == []
+
+
+def test_load_corrupt_file_returns_empty_state(tmp_path: Path) -> None:
+    """Test that an unreadable state file is ignored."""
+    path = tmp_path / "state.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    state = ScanStateStore(path).load()
+
+    assert state.watermark is None
+
+
+def test_save_and_load_round_trip(tmp_path: Path) -> None:
+    """Test that watermark and open activations survive a round trip."""
+    store = ScanStateStore(tmp_path / "nested" / "state.json")
+    watermark = ScanWatermark(
+        time_generated=datetime(2026, 2, 10, 12, 0, 0, tzinfo=timezone.utc),
+        record_id="record-2",
+    )
+    ended = _activation("record-3", 11)
+    ended.end_time = datetime(2026, 2, 10, 13, 0, 0, tzinfo=timezone.utc)
+    recent = {"record-2": datetime(2026, 2, 10, 12, 0, 0, tzinfo=timezone.utc)}
+    store.save(
+        ScanState(
+            watermark=watermark,
+            open_activations=[_activation("record-1", 10), ended],
+            recent_records=recent,
+        )
+    )
+
+    state = store.load()
+
+    assert state.watermark == watermark
+    assert state.recent_records == recent
+    assert state.open_activations == [_activation("record-1", 10), ended]
+    assert not (tmp_path / "nested" / "state.json.tmp").exists()
+
+
+def test_watermark_latest_picks_newest_record() -> None:
+    """Test that the watermark advances to the newest (time, id) pair."""
+    previous = ScanWatermark(
+        time_generated=datetime(2026, 2, 10, 9, 0, 0, tzinfo=timezone.utc), record_id="a"
+    )
+    activations = [_activation("b", 11), _activation("c", 11), _activation("d", 10)]
+
+    latest = ScanWatermark.latest(activations, previous)
+
+    assert latest is not None
+    assert latest.time_generated.hour == 11
+    assert latest.record_id == "c"
+
+
+def test_watermark_latest_keeps_previous_without_new_records() -> None:
+    """Test that the watermark is unchanged when nothing new was found."""
+    previous = ScanWatermark(
+        time_generated=datetime(2026, 2, 10, 9, 0, 0, tzinfo=timezone.utc), record_id="a"
+    )
+
+    assert ScanWatermark.latest([], previous) is previous
+    assert ScanWatermark.latest([]) is None
+
+
+def test_activation_is_active() -> None:
+    """Test elevation window check."""
+    activation = _activation("a", 10, duration_hours=2)
+
+    assert activation.is_active(activation.activation_time + timedelta(hours=1))
+    assert not activation.is_active(activation.activation_time + timedelta(hours=2))
@@ -0,0 +1,79 @@
+"""Tests for pipeline timing instrumentation."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from pim_auto.core.pim_detector import PIMDetector
+from pim_auto.monitoring.timing import NullMonitor, StageTimer, record_openai_usage
+
+
+def test_stage_timer_records_to_monitor():
+    """Test each context manager records its duration and tag."""
+    monitor = Mock()
+    timer = StageTimer(monitor)
+
+    with timer.stage("detection"):
+        pass
+    with timer.query("pim_detection"):
+        pass
+    with timer.openai_call("assessment"):
+        record_openai_usage(120, 30)
+
+    monitor.track_stage_duration.assert_called_once()
+    assert monitor.track_stage_duration.call_args.args[1] == "detection"
+    monitor.track_query_duration.assert_called_once()
+    assert monitor.track_query_duration.call_args.args[1] == "pim_detection"
+    monitor.track_openai_call.assert_called_once_with("assessment", "success")
+    assert monitor.track_openai_duration.call_args.args[1:] == ("assessment", "success")
+    monitor.track_openai_tokens.assert_called_once_with(120, 30, "assessment", "success")
+    assert set(timer.totals) == {"stage:detection", "query:pim_detection", "openai:assessment"}
+
+
+def test_stage_timer_records_failures_and_decorates():
+    """Test failures are recorded with their outcome, and decorator use."""
+    monitor = Mock()
+    timer = StageTimer(monitor)
+
+    @timer.stage("report")
+    def render() -> str:
+        return "# Report"
+
+    with pytest.raises(RuntimeError):
+        with timer.query("activity_correlation"):
+            raise RuntimeError("query failed")
+    assert render() == "# Report"
+    assert render() == "# Report"
+
+    assert monitor.track_query_duration.call_args.args[1:] == ("activity_correlation", "failure")
+    assert monitor.track_stage_duration.call_args.args[1:] == ("report", "success")
+    assert timer.totals["query:activity_correlation"][0] == 1
+    assert timer.totals["stage:report"][0] == 2
+    assert "stage:report=" in timer.summary()
+
+
+def test_openai_usage_outside_a_call_is_ignored():
+    """Test usage reports outside an openai_call block, and summed usage inside one."""
+    monitor = Mock()
+    record_openai_usage(10, 5)
+
+    timer = StageTimer(monitor)
+    with timer.openai_call("assessment"):
+        record_openai_usage(10, 5)
+        record_openai_usage(1, 2)
+
+    monitor.track_openai_tokens.assert_called_once_with(11, 7, "assessment", "success")
+    assert isinstance(StageTimer().monitor, NullMonitor)
+
+
+def test_detector_queries_are_timed():
+    """Test PIMDetector tags its queries through the timer."""
+    monitor = Mock()
+    client = Mock()
+    client.execute_query.return_value = []
+
+    PIMDetector(client, timer=StageTimer(monitor)).detect_activations(hours=24)
+    PIMDetector(client, chunk_hours=12, timer=StageTimer(monitor)).detect_activations(hours=24)
+
+    query_types = [call.args[1] for call in monitor.track_query_duration.call_args_list]
+    assert query_types == ["pim_detection", "pim_activations", "pim_endings"]
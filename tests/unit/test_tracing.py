@@ -0,0 +1,136 @@
+"""Tests for batch run tracing."""
+
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Sequence
+
+import pytest
+
+from pim_auto.monitoring.tracing import (
+    KIND_CLIENT,
+    KIND_SERVER,
+    NOOP_SPAN,
+    Span,
+    Tracer,
+    create_tracer,
+    current_span,
+    increment_span_attribute,
+    set_span_attribute,
+)
+
+
+class CollectingExporter:
+    """Exporter keeping finished spans in memory."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self.spans.extend(spans)
+
+
+def test_spans_nest_and_share_trace_id():
+    """Test child spans record their parent and the root's trace ID."""
+    exporter = CollectingExporter()
+    tracer = Tracer(exporter)
+
+    with tracer.span("batch_run", KIND_SERVER, scan_hours=24) as root:
+        with tracer.span("query:pim_detection", KIND_CLIENT):
+            set_span_attribute("rows", 3)
+            increment_span_attribute("retries")
+            increment_span_attribute("retries")
+        assert current_span() is root
+
+    assert current_span() is None
+    child, finished_root = exporter.spans
+    assert finished_root is root
+    assert root.parent_id is None
+    assert root.attributes == {"scan_hours": 24}
+    assert child.parent_id == root.span_id
+    assert child.trace_id == root.trace_id
+    assert child.attributes == {"rows": 3, "retries": 2}
+    assert child.duration_ms is not None and child.duration_ms >= 0
+
+
+def test_span_propagates_into_thread_pool_with_copied_context():
+    """Test work run in a copied context joins the submitting span."""
+    exporter = CollectingExporter()
+    tracer = Tracer(exporter)
+
+    def work() -> None:
+        with tracer.span("activation"):
+            pass
+
+    with tracer.span("batch_run") as root:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, work) for _ in range(3)]
+            for future in futures:
+                future.result()
+
+    children = [span for span in exporter.spans if span.name == "activation"]
+    assert len(children) == 3
+    assert all(span.parent_id == root.span_id for span in children)
+
+
+def test_span_records_error():
+    """Test a span ended by an exception records it and re-raises."""
+    exporter = CollectingExporter()
+    tracer = Tracer(exporter)
+
+    with pytest.raises(RuntimeError):
+        with tracer.span("openai:assessment"):
+            raise RuntimeError("throttled")
+
+    assert exporter.spans[0].error == "RuntimeError: throttled"
+
+
+def test_disabled_tracer_is_noop():
+    """Test a tracer without exporter hands out the no-op span."""
+    tracer = Tracer()
+
+    with tracer.span("batch_run") as span:
+        span.set_attribute("rows", 1)
+        assert current_span() is None
+
+    assert not tracer.enabled
+    assert span is NOOP_SPAN
+    assert NOOP_SPAN.attributes == {}
+
+
+def test_export_failure_is_logged_not_raised(caplog):
+    """Test a failing exporter does not break the traced work."""
+
+    class FailingExporter:
+        def export(self, spans: Sequence[Span]) -> None:
+            raise OSError("disk full")
+
+    with Tracer(FailingExporter()).span("batch_run"):
+        pass
+
+    assert "Failed to export span batch_run" in caplog.text
+
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    """Test the file exporter appends one JSON object per span."""
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracer = create_tracer("file", file_path=path)
+
+    with tracer.span("batch_run", KIND_SERVER):
+        with tracer.span("stage:detection"):
+            pass
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["name"] for record in records] == ["stage:detection", "batch_run"]
+    assert records[0]["parent_id"] == records[1]["span_id"]
+    assert records[1]["kind"] == "server"
+
+
+def test_create_tracer_validates_exporter():
+    """Test exporter selection."""
+    assert not create_tracer(None).enabled
+
+    with pytest.raises(ValueError, match="connection string"):
+        create_tracer("app_insights")
+    with pytest.raises(ValueError, match="Unsupported trace exporter"):
+        create_tracer("jaeger")
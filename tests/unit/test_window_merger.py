@@ -0,0 +1,79 @@
+"""Tests for activation window merging module."""
+
+from datetime import datetime, timedelta, timezone
+
+from pim_auto.core.pim_detector import PIMActivation
+from pim_auto.core.window_merger import merge_activation_windows
+
+NOW = datetime(2026, 2, 10, 20, 0, 0, tzinfo=timezone.utc)
+
+
+def _activation(user_email: str, start_hour: int, end_hour: int | None) -> PIMActivation:
+    return PIMActivation(
+        user_email=user_email,
+        role_name="Contributor",
+        activation_reason="test reason",
+        activation_time=datetime(2026, 2, 10, start_hour, 0, 0, tzinfo=timezone.utc),
+        duration_hours=1,
+        end_time=(
+            datetime(2026, 2, 10, end_hour, 0, 0, tzinfo=timezone.utc)
+            if end_hour is not None
+            else None
+        ),
+    )
+
+
+def test_merge_overlapping_windows_for_same_user() -> None:
+    """Test that overlapping windows of one user collapse into one."""
+    activations = [
+        _activation("alice@example.com", 12, 14),
+        _activation("alice@example.com", 10, 13),
+        _activation("bob@example.com", 11, 12),
+    ]
+
+    windows = merge_activation_windows(activations, NOW)
+
+    assert len(windows) == 2
+    alice, bob = windows
+    assert alice.user_email == "alice@example.com"
+    assert alice.start_time.hour == 10
+    assert alice.end_time.hour == 14
+    assert alice.activation_indices == [1, 0]
+    assert bob.activation_indices == [2]
+
+
+def test_merge_adjacent_windows() -> None:
+    """Test that a window starting exactly at the previous end is merged."""
+    activations = [
+        _activation("alice@example.com", 10, 11),
+        _activation("alice@example.com", 11, 12),
+    ]
+
+    windows = merge_activation_windows(activations, NOW)
+
+    assert len(windows) == 1
+    assert windows[0].end_time.hour == 12
+
+
+def test_disjoint_windows_stay_separate() -> None:
+    """Test that windows with a gap are not merged unless the gap is allowed."""
+    activations = [
+        _activation("alice@example.com", 10, 11),
+        _activation("alice@example.com", 13, 14),
+    ]
+
+    assert len(merge_activation_windows(activations, NOW)) == 2
+    assert len(merge_activation_windows(activations, NOW, gap=timedelta(hours=2))) == 1
+
+
+def test_open_ended_windows_use_end_time() -> None:
+    """Test that activations without an end run to the supplied end time."""
+    activations = [
+        _activation("alice@example.com", 10, None),
+        _activation("alice@example.com", 15, 16),
+    ]
+
+    windows = merge_activation_windows(activations, NOW)
+
+    assert len(windows) == 1
+    assert windows[0].end_time == NOW